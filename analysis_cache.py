@@ -0,0 +1,219 @@
+"""
+Process-wide cache of what was worked out about a position.
+
+Entries are keyed by the position's Zobrist hash (chess.polyglot), so the
+same position reached again, by scrubbing through a game with
+prev/next, undoing a move or by a transposition, finds its engine
+evaluation, legal-move index and game-ending check in memory.  The hash
+covers pieces, side to move, castling rights and a capturable en passant
+square, which is everything these results depend on (move counters and
+repetitions are checked on the board itself).
+
+The cache is an LRU bounded by entry count and by an estimate of the
+memory it holds.  Evaluations, the only entries that are expensive to
+recompute, can be written to a JSON file and loaded at the next start.
+"""
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict, namedtuple
+import chess
+import chess.polyglot
+
+MAX_ENTRIES = 50000
+MAX_BYTES = 32 * 1024 * 1024
+MAX_SAVED = 5000  # evaluations written by save, most recently used first
+
+# Engine evaluation from white's point of view: centipawns (None for a
+# forced mate), moves to mate (positive when white mates), search depth,
+# principal variation as UCI strings
+Evaluation = namedtuple("Evaluation", ["score", "mate", "depth", "pv"])
+
+ENTRY_BYTES = 250  # key, per-position dict and LRU link
+MOVE_BYTES = 150  # one move in a MoveIndex
+PV_MOVE_BYTES = 60
+
+def position_key(board):
+    """Zobrist hash of ``board``; IndexedBoard keeps it between moves."""
+    key = getattr(board, "zobrist", None)
+    return key if key is not None else chess.polyglot.zobrist_hash(board)
+
+def evaluation_from_info(info):
+    """Evaluation from a chess.engine info dict with "score" and "pv", or None."""
+    score = info.get('score')
+    if score is None or not info.get('pv'):
+        return None
+    white = score.white()
+    return Evaluation(None if white.is_mate() else white.score(), white.mate(), info.get('depth', 0),
+                      tuple(move.uci() for move in info['pv']))
+
+def describe(board, evaluation, max_moves=8):
+    """The line as SAN with score and depth, e.g. "1. e4 e5 (+0.30, depth 12)"."""
+    moves = [chess.Move.from_uci(uci) for uci in evaluation.pv[:max_moves]]
+    text = board.variation_san(moves)
+    details = [f"mate {evaluation.mate}" if evaluation.mate is not None else f"{evaluation.score / 100:+.2f}"]
+    if evaluation.depth:
+        details.append(f"depth {evaluation.depth}")
+    return f"{text} ({', '.join(details)})"
+
+def position_outcome(board):
+    """Checkmate, stalemate or insufficient material as a chess.Outcome, else None."""
+    if board.is_checkmate():
+        return chess.Outcome(chess.Termination.CHECKMATE, not board.turn)
+    if board.is_stalemate():
+        return chess.Outcome(chess.Termination.STALEMATE, None)
+    if board.is_insufficient_material():
+        return chess.Outcome(chess.Termination.INSUFFICIENT_MATERIAL, None)
+    return None
+
+def _estimate(kind, value):
+    if kind == "moves":
+        return MOVE_BYTES * len(value)
+    if kind == "eval":
+        return PV_MOVE_BYTES * len(value.pv)
+    return 50
+
+class AnalysisCache:
+    """
+    LRU of ``{kind: value}`` per position.  Kinds used in the app: "eval"
+    (Evaluation), "moves" (MoveIndex) and "outcome".  Thread-safe, so
+    engine threads can store results directly.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES, path=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.path = path
+        self._entries = OrderedDict()  # key -> {kind: value}
+        self._sizes = {}  # key -> estimated bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        if path:
+            self.load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, board, kind, default=None):
+        return self._get(position_key(board), kind, default)
+
+    def _get(self, key, kind, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or kind not in entry:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[kind]
+
+    def put(self, board, kind, value):
+        self._put(position_key(board), kind, value)
+
+    def _put(self, key, kind, value):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = {}
+                self._sizes[key] = ENTRY_BYTES
+                self.bytes += ENTRY_BYTES
+            else:
+                self._entries.move_to_end(key)
+                if kind in entry:
+                    self._resize(key, -_estimate(kind, entry[kind]))
+            entry[kind] = value
+            self._resize(key, _estimate(kind, value))
+            if kind == "eval":
+                self._dirty = True
+            while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+                oldest, _ = self._entries.popitem(last=False)
+                self.bytes -= self._sizes.pop(oldest)
+
+    def _resize(self, key, delta):
+        self._sizes[key] += delta
+        self.bytes += delta
+
+    def get_or_compute(self, board, kind, compute):
+        """The cached ``kind`` of ``board``, computing it with ``compute(board)`` on a miss."""
+        key = position_key(board)
+        value = self._get(key, kind, self._MISSING)
+        if value is self._MISSING:
+            value = compute(board)
+            self._put(key, kind, value)
+        return value
+
+    def evaluation(self, board, min_depth=0):
+        evaluation = self.get(board, "eval")
+        if evaluation is None or evaluation.depth < min_depth:
+            return None
+        return evaluation
+
+    def store_evaluation(self, board, evaluation):
+        """Keep ``evaluation`` unless a deeper one is cached already."""
+        key = position_key(board)
+        with self._lock:
+            current = self._entries.get(key, {}).get("eval")
+        if current is None or evaluation.depth >= current.depth:
+            self._put(key, "eval", evaluation)
+
+    def outcome(self, board):
+        """``position_outcome(board)``, cached."""
+        return self.get_or_compute(board, "outcome", position_outcome)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.bytes = 0
+
+    def persist_to(self, path):
+        """Load evaluations from ``path`` and write them back there on ``save``."""
+        self.path = path
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.debug(f"No analysis cache loaded from {self.path}: {e}")
+            return
+        loaded = 0
+        for key, score, mate, depth, pv in data.get('evaluations', []):
+            self._put(int(key, 16), "eval", Evaluation(score, mate, depth, tuple(pv)))
+            loaded += 1
+        self._dirty = False
+        logging.debug(f"Loaded {loaded} cached evaluations")
+
+    def save(self):
+        """Write the most recently used evaluations; a failed write only loses the cache."""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            saved = []
+            for key in reversed(self._entries):
+                evaluation = self._entries[key].get("eval")
+                if evaluation is not None:
+                    saved.append([f"{key:016x}", *evaluation[:3], list(evaluation.pv)])
+                    if len(saved) >= MAX_SAVED:
+                        break
+            self._dirty = False
+        saved.reverse()  # oldest first, so loading rebuilds the LRU order
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            temp = self.path + ".tmp"
+            with open(temp, 'w') as f:
+                json.dump({'evaluations': saved}, f)
+            os.replace(temp, self.path)
+        except OSError as e:
+            logging.debug(f"Could not write analysis cache: {e}")
+
+shared = AnalysisCache()
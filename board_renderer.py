@@ -0,0 +1,141 @@
+from PyQt6.QtGui import QPainter, QPixmap, QColor, QRegion
+from PyQt6.QtCore import QRect
+import chess
+import logging
+
+class BoardRenderer:
+    """
+    Layered painter shared by the board widgets.
+
+    The board is drawn as three layers: a cached background pixmap (one per
+    size/flip combination), the pieces from a PieceAtlas, and a highlight
+    overlay.  The renderer remembers what it last put on each square so that
+    callers only invalidate the squares that actually changed instead of
+    repainting all 64.
+    """
+
+    def __init__(self, widget, light_color, dark_color, atlas):
+        self.widget = widget
+        self.atlas = atlas
+        self.light_color = QColor(light_color)
+        self.dark_color = QColor(dark_color)
+        self._backgrounds = {}  # (square_size, flip) -> QPixmap
+        self._known_pieces = {}  # square -> piece symbol as last synced
+        self._overlay = {}  # square -> QColor
+        self._flip = False
+        self._synced = False
+        # Repaint counters, useful when tuning e-ink refreshes
+        self.last_repaint_squares = 0
+        self.total_repaint_squares = 0
+        self.repaint_count = 0
+
+    def square_size(self):
+        return self.widget.width() // 8
+
+    def square_rect(self, square, flip=False):
+        size = self.square_size()
+        file = chess.square_file(square)
+        row = 7 - chess.square_rank(square)
+        if flip:
+            file = 7 - file
+            row = 7 - row
+        return QRect(file * size, row * size, size, size)
+
+    def square_at(self, pos, flip=False):
+        size = self.square_size()
+        if size <= 0:
+            return None
+        file = int(pos.x()) // size
+        row = int(pos.y()) // size
+        if not (0 <= file < 8 and 0 <= row < 8):
+            return None
+        if flip:
+            file = 7 - file
+            row = 7 - row
+        return chess.square(file, 7 - row)
+
+    @staticmethod
+    def is_dark_square(square):
+        return (chess.square_file(square) + chess.square_rank(square)) % 2 == 0
+
+    def background(self, flip=False):
+        """Return the cached background pixmap for the current size and orientation."""
+        size = self.square_size()
+        key = (size, flip)
+        pixmap = self._backgrounds.get(key)
+        if pixmap is None:
+            pixmap = QPixmap(max(1, size * 8), max(1, size * 8))
+            painter = QPainter(pixmap)
+            for square in chess.SQUARES:
+                color = self.dark_color if self.is_dark_square(square) else self.light_color
+                painter.fillRect(self.square_rect(square, flip), color)
+            painter.end()
+            self._backgrounds[key] = pixmap
+        return pixmap
+
+    def clear_cache(self):
+        """Drop cached backgrounds (e.g. after a palette change)."""
+        self._backgrounds.clear()
+        self._synced = False
+
+    def sync(self, board, flip=False):
+        """
+        Compare the board with what was last synced and return the set of
+        squares whose content changed.  Returns all squares after a flip or
+        on the first call.
+        """
+        pieces = {square: piece.symbol() for square, piece in board.piece_map().items()}
+        if not self._synced or flip != self._flip:
+            dirty = set(chess.SQUARES)
+        else:
+            dirty = {square for square in set(pieces) | set(self._known_pieces)
+                     if pieces.get(square) != self._known_pieces.get(square)}
+        self._known_pieces = pieces
+        self._flip = flip
+        self._synced = True
+        return dirty
+
+    def set_overlay(self, overlay):
+        """Replace the highlight overlay and return the squares that changed."""
+        dirty = {square for square in set(overlay) | set(self._overlay)
+                 if overlay.get(square) != self._overlay.get(square)}
+        self._overlay = dict(overlay)
+        return dirty
+
+    def paint(self, painter, board, region, flip=False):
+        """Paint the squares that intersect ``region``."""
+        background = self.background(flip)
+        self.atlas.ensure(self.square_size(), self.widget.devicePixelRatioF())
+        touched = 0
+        for square in chess.SQUARES:
+            rect = self.square_rect(square, flip)
+            if not region.intersects(rect):
+                continue
+            touched += 1
+            painter.drawPixmap(rect, background, rect)
+            piece = board.piece_at(square)
+            if piece:
+                painter.drawPixmap(rect.topLeft(), self.atlas.sprite(piece))
+            color = self._overlay.get(square)
+            if color is not None:
+                painter.fillRect(rect, color)
+
+        if QRegion(self.widget.rect()).subtracted(region).isEmpty():
+            # A full repaint brings the snapshot up to date as well
+            self._known_pieces = {square: piece.symbol() for square, piece in board.piece_map().items()}
+            self._flip = flip
+            self._synced = True
+
+        self.last_repaint_squares = touched
+        self.total_repaint_squares += touched
+        self.repaint_count += 1
+        logging.debug(f"Board repaint #{self.repaint_count} touched {touched} squares")
+
+    def invalidate(self, squares, flip=False):
+        """Schedule a repaint of the given squares on the widget."""
+        scheduler = getattr(self.widget, 'scheduler', None)
+        for square in squares:
+            if scheduler:
+                scheduler.invalidate(self.widget, self.square_rect(square, flip))
+            else:
+                self.widget.update(self.square_rect(square, flip))
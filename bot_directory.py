@@ -0,0 +1,169 @@
+"""
+Cached directory of the bots online on Lichess.
+
+``/api/bot/online`` streams one bot per NDJSON line.  ``BotDirectory``
+reads the stream as it arrives into a new ``BotIndex`` and swaps it in
+when complete, so readers always see a consistent snapshot.  The snapshot
+is served from memory; once it is older than the TTL, the next lookup
+returns it anyway and schedules a refresh in the background.
+
+An index groups bots by title and keeps, per rating category (blitz,
+rapid, ...), a list sorted by rating.  A bot is taken to play a time
+control if it has rated games in that category.  Rating ranges are
+bisected, so filtering is a lookup, not a scan or a request.
+"""
+import bisect
+import logging
+import threading
+import time
+
+PERFS = ('ultraBullet', 'bullet', 'blitz', 'rapid', 'classical', 'correspondence')
+
+def perf_for(time_control):
+    """Lichess rating category of a "minutes+increment" time control."""
+    minutes, increment = map(float, time_control.split('+'))
+    estimate = minutes * 60 + 40 * increment
+    if estimate < 30:
+        return 'ultraBullet'
+    if estimate < 180:
+        return 'bullet'
+    if estimate < 480:
+        return 'blitz'
+    if estimate < 1500:
+        return 'rapid'
+    return 'classical'
+
+def bot_rating(bot, perf):
+    """The bot's rating in ``perf``, or None if it has no games there."""
+    stats = (bot.get('perfs') or {}).get(perf) or {}
+    if not stats.get('games') or 'rating' not in stats:
+        return None
+    return stats['rating']
+
+def describe(bot):
+    """One line for listings: name, title and the ratings it has games in."""
+    ratings = ", ".join(f"{perf} {bot_rating(bot, perf)}" for perf in PERFS if bot_rating(bot, perf))
+    title = f" ({bot['title']})" if bot.get('title') else ""
+    return f"{bot.get('username', bot.get('id'))}{title}{': ' + ratings if ratings else ''}"
+
+class BotIndex:
+    """An immutable snapshot of the online bots with lookup indexes."""
+
+    def __init__(self, bots=(), fetched=None):
+        self.fetched = fetched
+        self.bots = {}  # lower-case username -> bot dict
+        self.by_title = {}  # title -> set of usernames
+        self.by_perf = {perf: [] for perf in PERFS}  # perf -> sorted [(rating, username)]
+        for bot in bots:
+            self.add(bot)
+
+    def add(self, bot):
+        """Index one bot; only used while the snapshot is being built."""
+        name = (bot.get('username') or bot.get('id') or "").lower()
+        if not name or name in self.bots:
+            return
+        self.bots[name] = bot
+        self.by_title.setdefault(bot.get('title') or "", set()).add(name)
+        for perf in PERFS:
+            rating = bot_rating(bot, perf)
+            if rating is not None:
+                bisect.insort(self.by_perf[perf], (rating, name))
+
+    def __len__(self):
+        return len(self.bots)
+
+    def get(self, username):
+        return self.bots.get(username.lower())
+
+    def find(self, time_control=None, perf=None, min_rating=None, max_rating=None, title=None):
+        """Bots matching every given filter; sorted by rating when a category is given, else by name."""
+        perf = perf or (perf_for(time_control) if time_control else None)
+        if perf:
+            ranked = self.by_perf.get(perf, [])
+            low = 0 if min_rating is None else bisect.bisect_left(ranked, min_rating, key=lambda e: e[0])
+            high = len(ranked) if max_rating is None else bisect.bisect_right(ranked, max_rating, key=lambda e: e[0])
+            names = [name for _, name in ranked[low:high]]
+        else:
+            names = sorted(self.bots)
+        if title is not None:
+            titled = self.by_title.get(title, set())
+            names = [name for name in names if name in titled]
+        return [self.bots[name] for name in names]
+
+    def closest(self, time_control, rating):
+        """The bot whose rating for ``time_control`` is nearest ``rating``, or None."""
+        ranked = self.by_perf.get(perf_for(time_control), [])
+        if not ranked:
+            return None
+        i = bisect.bisect_left(ranked, rating, key=lambda e: e[0])
+        candidates = ranked[max(0, i - 1):i + 1]
+        _, name = min(candidates, key=lambda entry: abs(entry[0] - rating))
+        return self.bots[name]
+
+class BotDirectory:
+    """
+    TTL cache of the online bots.
+
+    ``fetch()`` returns an iterator of bot dicts (``LichessHandler.stream_online_bots``).
+    ``submit(call)`` runs a refresh in the background; by default on a
+    daemon thread, in the app on the Lichess worker.
+    """
+
+    def __init__(self, fetch, ttl=300, submit=None, clock=time.monotonic, retry_after=30):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.retry_after = retry_after  # after a failed refresh, e.g. while offline
+        self.submit = submit or self._run_in_thread
+        self.clock = clock
+        self._index = BotIndex()
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._failed_at = None
+
+    def _run_in_thread(self, call):
+        threading.Thread(target=call, name="bot-directory", daemon=True).start()
+
+    def stale(self):
+        fetched = self._index.fetched
+        return fetched is None or self.clock() - fetched >= self.ttl
+
+    def refresh(self):
+        """Read the online bots into a new index; the old one stays on failure."""
+        index = BotIndex()
+        try:
+            for bot in self.fetch():
+                index.add(bot)
+        except Exception as e:
+            logging.error(f"Failed to refresh online bots: {e}")
+            self._failed_at = self.clock()
+            return False
+        finally:
+            with self._lock:
+                self._refreshing = False
+        index.fetched = self.clock()
+        self._index = index
+        self._failed_at = None
+        logging.debug(f"Bot directory refreshed: {len(index)} bots online")
+        return True
+
+    def refresh_async(self):
+        """Schedule a refresh unless one is already pending."""
+        with self._lock:
+            if self._refreshing:
+                return
+            if self._failed_at is not None and self.clock() - self._failed_at < self.retry_after:
+                return
+            self._refreshing = True
+        self.submit(self.refresh)
+
+    def index(self):
+        """The current snapshot, without waiting; a stale one triggers a background refresh."""
+        if self.stale():
+            self.refresh_async()
+        return self._index
+
+    def find(self, **filters):
+        return self.index().find(**filters)
+
+    def closest(self, time_control, rating):
+        return self.index().closest(time_control, rating)
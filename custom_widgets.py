@@ -1,57 +1,95 @@
-from PyQt6.QtWidgets import QLabel
-from PyQt6.QtGui import QPainter, QPen, QFont, QColor
-from PyQt6.QtCore import Qt, QRect, QTimer, pyqtSignal
-import time
+from PyQt6.QtWidgets import QLabel, QDialog, QHBoxLayout, QPushButton
+from PyQt6.QtGui import QPainter, QPen, QFont, QFontMetrics, QPixmap, QIcon
+from PyQt6.QtCore import Qt, QSize, pyqtSignal
+import chess
+from game_clock import GameClock
 
 class ClockWidget(QLabel):
     time_expired = pyqtSignal()
+    _glyphs = {}  # (char, font key, color) -> QPixmap, shared by all clocks
 
     def __init__(self, is_white=True, parent=None):
         super().__init__(parent)
         self.is_white = is_white
-        self.seconds_remaining = 300  # 5 minutes
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_time)
+        self.color = chess.WHITE if is_white else chess.BLACK
         self.setFixedSize(250, 120)
-        self.setFont(QFont("Palatino", 32))
+        self.clock_font = QFont("Palatino", 32)
+        self.setFont(self.clock_font)
         self.time_format = "mm:ss"
-        self._active = False
-        self.last_update = None
+        self.scheduler = None  # Optional FrameScheduler batching repaints
+        self.clock = None
+        self._painted_text = None
+        # A standalone clock owns its model; MainWindow binds both clocks to a shared one
+        self.bind(GameClock(parent=self), self.color)
+
+    def bind(self, clock, color):
+        """Display ``color``'s time from the given GameClock."""
+        if self.clock is not None:
+            self.clock.changed.disconnect(self._on_clock_changed)
+            self.clock.flagged.disconnect(self._on_clock_flagged)
+        self.clock = clock
+        self.color = color
+        self.timer = clock.ticker
+        clock.changed.connect(self._on_clock_changed)
+        clock.flagged.connect(self._on_clock_flagged)
+        self.request_update()
+
+    @property
+    def _active(self):
+        return self.clock.running == self.color
+
+    @property
+    def seconds_remaining(self):
+        return self.clock.remaining(self.color)
+
+    @seconds_remaining.setter
+    def seconds_remaining(self, seconds):
+        self.clock.set_remaining(self.color, seconds)
 
     def start(self):
-        self._active = True
-        self.last_update = time.time()
-        self.timer.start(100)  # Update more frequently for accuracy
+        self.clock.start(self.color)
 
     def stop(self):
-        self._active = False
-        self.timer.stop()
-        self.last_update = None
+        if self._active:
+            self.clock.stop()
 
     def reset(self, seconds=300):
-        self.seconds_remaining = seconds
-        self.update()
-
-    def update_time(self):
-        if self._active and self.seconds_remaining > 0:
-            current_time = time.time()
-            if self.last_update:
-                elapsed = current_time - self.last_update
-                self.seconds_remaining = max(0, self.seconds_remaining - elapsed)
-            self.last_update = current_time
+        self.clock.set_remaining(self.color, seconds)
+        self.request_update()
+
+    def request_update(self):
+        if self.scheduler:
+            self.scheduler.invalidate(self)
+        else:
             self.update()
 
-            if self.seconds_remaining <= 0:
-                self.stop()
-                self.time_expired.emit()
+    def _on_clock_changed(self, color):
+        if color == self.color and self.time_str != self._painted_text:
+            self.request_update()
+
+    def _on_clock_flagged(self, color):
+        if color == self.color:
+            self.time_expired.emit()
 
     @property
     def time_str(self):
-        if self.seconds_remaining <= 0:
-            return "00:00"
-        minutes = int(self.seconds_remaining // 60)
-        seconds = int(self.seconds_remaining % 60)
-        return f"{minutes:02d}:{seconds:02d}"  # Changed format to always show 2 digits
+        return self.clock.display(self.color)
+
+    def glyph(self, char, color):
+        key = (char, self.clock_font.key(), color)
+        pixmap = self._glyphs.get(key)
+        if pixmap is None:
+            metrics = QFontMetrics(self.clock_font)
+            pixmap = QPixmap(max(1, metrics.horizontalAdvance(char)), max(1, metrics.height()))
+            pixmap.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.setFont(self.clock_font)
+            painter.setPen(color)
+            painter.drawText(0, metrics.ascent(), char)
+            painter.end()
+            self._glyphs[key] = pixmap
+        return pixmap
 
     def paintEvent(self, event):
         painter = QPainter(self)
@@ -66,11 +104,50 @@ class ClockWidget(QLabel):
         painter.setPen(QPen(border_color, 2))
         painter.drawRect(self.rect().adjusted(1, 1, -1, -1))
 
-        # Set text color
+        # Draw time from cached glyphs
         text_color = Qt.GlobalColor.black if self.is_white else Qt.GlobalColor.white
-        painter.setPen(text_color)
+        text = self.time_str
+        glyphs = [self.glyph(char, text_color) for char in text]
+        width = sum(glyph.width() for glyph in glyphs)
+        height = max(glyph.height() for glyph in glyphs)
+        x = (self.width() - width) // 2
+        y = (self.height() - height) // 2
+        for glyph in glyphs:
+            painter.drawPixmap(x, y, glyph)
+            x += glyph.width()
+        self._painted_text = text
+
+
+class PromotionPicker(QDialog):
+    """Modal picker offering the promotion variants of a pawn move."""
+    ORDER = [chess.QUEEN, chess.ROOK, chess.BISHOP, chess.KNIGHT]
+
+    def __init__(self, moves, color, atlas=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Promote to")
+        self.setModal(True)
+        self.selected_move = None
+
+        layout = QHBoxLayout()
+        layout.setSpacing(20)
+        self.buttons = {}
+        for move in sorted(moves, key=lambda m: self.ORDER.index(m.promotion)):
+            piece = chess.Piece(move.promotion, color)
+            button = QPushButton()
+            button.setFixedSize(100, 100)
+            button.setStyleSheet("border: 2px dashed black; background-color: white;")
+            sprite = atlas.sprite(piece) if atlas else None
+            if sprite is not None and not sprite.isNull():
+                button.setIcon(QIcon(sprite))
+                button.setIconSize(QSize(80, 80))
+            else:
+                button.setText(piece.unicode_symbol())
+                button.setFont(QFont("Palatino", 32))
+            button.clicked.connect(lambda checked=False, m=move: self.choose(m))
+            self.buttons[move.promotion] = button
+            layout.addWidget(button)
+        self.setLayout(layout)
 
-        # Draw time
-        font = QFont("Palatino", 32)
-        painter.setFont(font)
-        painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, self.time_str)
+    def choose(self, move):
+        self.selected_move = move
+        self.accept()
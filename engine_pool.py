@@ -0,0 +1,177 @@
+"""
+Pool of local UCI engines for hints and analysis.
+
+``EnginePool`` runs ``size`` worker threads, each owning one engine
+subprocess (chess.engine.SimpleEngine), started on its first request.
+``analyse`` queues a request and returns at once; workers call
+``on_info`` with every new principal variation and ``on_done`` when the
+search ends, both on the worker thread.  A request can be cancelled at any
+time, which stops its search immediately, and a new request with the same
+``key`` cancels the previous one, so asking again after the position
+changed never waits for a stale search.
+
+chess.engine (and asyncio with it) is imported on first use, so creating
+a pool costs nothing at startup.
+"""
+import logging
+import queue
+import threading
+from analysis_cache import describe, evaluation_from_info
+
+class AnalysisRequest:
+    """One queued search; ``info`` holds the latest line once it has run."""
+
+    def __init__(self, board, limit, on_info=None, on_done=None, key=None):
+        # Copy: the caller's board keeps changing while the engine thinks
+        self.board = board.copy()
+        self.fen = board.fen()
+        self.limit = limit
+        self.on_info = on_info
+        self.on_done = on_done
+        self.key = key
+        self.info = None
+        self.error = None
+        self._cancelled = threading.Event()
+        self._analysis = None
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+        with self._lock:
+            if self._analysis is not None:
+                self._analysis.stop()
+
+    def best_move(self):
+        pv = (self.info or {}).get('pv')
+        return pv[0] if pv else None
+
+    def evaluation(self):
+        """The latest line as an analysis_cache.Evaluation, or None."""
+        return evaluation_from_info(self.info) if self.info else None
+
+    def line(self, max_moves=8):
+        """The best line so far as SAN with score and depth, e.g. "1. e4 e5 (+0.30, depth 12)"."""
+        if not self.info or not self.info.get('pv'):
+            return ""
+        evaluation = self.evaluation()
+        if evaluation is None:  # a line without a score
+            return self.board.variation_san(self.info['pv'][:max_moves])
+        return describe(self.board, evaluation, max_moves)
+
+class EnginePool:
+    """
+    ``command`` is the engine executable (or argv list); ``options`` are
+    UCI options applied to every engine, e.g. {"Threads": 1, "Hash": 64}.
+    """
+
+    def __init__(self, command, size=1, options=None, timeout=10.0):
+        self.command = command
+        self.size = size
+        self.options = dict(options or {})
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._threads = []
+        self._keyed = {}  # key -> latest request with that key
+        self._lock = threading.Lock()
+
+    def start(self):
+        while len(self._threads) < self.size:
+            thread = threading.Thread(target=self._run, name=f"engine-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+        return self
+
+    def stop(self):
+        """Cancel everything and shut the engines down."""
+        with self._lock:
+            for request in self._keyed.values():
+                request.cancel()
+            self._keyed.clear()
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(self.timeout)
+        self._threads = []
+
+    def analyse(self, board, time=None, nodes=None, depth=None, on_info=None, on_done=None, key=None):
+        """Queue a search of ``board`` limited by seconds, nodes and/or depth."""
+        from chess.engine import Limit
+        request = AnalysisRequest(board, Limit(time=time, nodes=nodes, depth=depth), on_info, on_done, key)
+        if key is not None:
+            with self._lock:
+                previous = self._keyed.get(key)
+                self._keyed[key] = request
+            if previous is not None:
+                previous.cancel()
+        self._queue.put(request)
+        return request
+
+    def cancel(self, key):
+        with self._lock:
+            request = self._keyed.pop(key, None)
+        if request is not None:
+            request.cancel()
+
+    def _open(self):
+        from chess.engine import SimpleEngine
+        engine = SimpleEngine.popen_uci(self.command, timeout=self.timeout)
+        if self.options:
+            engine.configure(self.options)
+        return engine
+
+    def _run(self):
+        engine = None
+        while True:
+            request = self._queue.get()
+            if request is None:
+                break
+            from chess.engine import EngineError, EngineTerminatedError
+            try:
+                if not request.cancelled:
+                    engine = engine or self._open()
+                    self._search(engine, request)
+            except (EngineError, EngineTerminatedError, OSError) as e:
+                # Start a fresh engine for the next request
+                logging.error(f"Engine failed: {e}")
+                request.error = e
+                engine = self._close(engine)
+            finally:
+                with self._lock:
+                    if self._keyed.get(request.key) is request:
+                        del self._keyed[request.key]
+                if request.on_done:
+                    request.on_done(request)
+        self._close(engine)
+
+    def _search(self, engine, request):
+        try:
+            with engine.analysis(request.board, request.limit) as analysis:
+                with request._lock:
+                    request._analysis = analysis
+                if request.cancelled:
+                    analysis.stop()
+                for info in analysis:
+                    if request.cancelled:
+                        break
+                    if info.get('pv'):
+                        request.info = info
+                        if request.on_info:
+                            request.on_info(request, info)
+                # Let the engine finish with "bestmove" before the next search
+                analysis.wait()
+        finally:
+            with request._lock:
+                request._analysis = None
+
+    def _close(self, engine):
+        if engine is not None:
+            try:
+                engine.quit()
+            except Exception as e:
+                logging.debug(f"Engine did not quit cleanly: {e}")
+                engine.close()
+        return None
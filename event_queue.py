@@ -0,0 +1,77 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+import threading
+import time
+
+class GameEventQueue(QObject):
+    """
+    Thread-safe hand-off of Lichess stream events to the GUI thread.
+
+    Stream threads ``put`` events; the GUI ``drain``s them all at once,
+    normally once per frame.  ``ready`` is emitted only when the queue goes
+    from empty to non-empty, so a burst of events costs one wakeup.
+
+    A ``gameState`` carries the full state of its game, so a pending one is
+    replaced in place by the next ``gameState`` of the same game.  Every
+    other event (``gameFull``, ``chatLine``, ...) is delivered in order, and
+    a ``gameFull`` ends coalescing for its game so no state can overtake it.
+    """
+    ready = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._items = []  # [game id, event, enqueued at]
+        self._pending_state = {}  # game id -> index of its queued gameState
+        self.received = 0
+        self.delivered = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self.last_lag_ms = 0.0
+        self.max_lag_ms = 0.0
+
+    def put(self, game_id, event):
+        now = time.monotonic()
+        kind = event.get('type')
+        with self._lock:
+            self.received += 1
+            index = self._pending_state.get(game_id)
+            if kind == 'gameState' and index is not None:
+                # Keep the slot's enqueue time so lag covers the oldest update
+                self._items[index][1] = event
+                self.coalesced += 1
+                return
+            was_empty = not self._items
+            if kind == 'gameState':
+                self._pending_state[game_id] = len(self._items)
+            elif kind == 'gameFull':
+                self._pending_state.pop(game_id, None)
+            self._items.append([game_id, event, now])
+            self.max_depth = max(self.max_depth, len(self._items))
+        if was_empty:
+            self.ready.emit()
+
+    def drain(self):
+        """Take every queued event as a list of (game id, event), oldest first."""
+        with self._lock:
+            items, self._items = self._items, []
+            self._pending_state = {}
+        if items:
+            self.last_lag_ms = (time.monotonic() - items[0][2]) * 1000
+            self.max_lag_ms = max(self.max_lag_ms, self.last_lag_ms)
+            self.delivered += len(items)
+        return [(game_id, event) for game_id, event, _ in items]
+
+    def depth(self):
+        with self._lock:
+            return len(self._items)
+
+    def stats(self):
+        return {
+            'depth': self.depth(),
+            'max_depth': self.max_depth,
+            'received': self.received,
+            'delivered': self.delivered,
+            'coalesced': self.coalesced,
+            'last_lag_ms': self.last_lag_ms,
+            'max_lag_ms': self.max_lag_ms,
+        }
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the parts of the Lichess API the app uses.
+
+Serves the same HTTP/NDJSON endpoints berserk calls (account, AI and bot
+challenges, bot game and event streams, moves, puzzles, online bots), with
+configurable latency, injected errors (429/5xx responses, dropped streams)
+and a scripted opponent.  Point the app at it with a base URL:
+
+    python3 fake_lichess.py --port 9000 --latency 0.05 --error-rate 0.05
+    LICHESS_BASE_URL=http://127.0.0.1:9000 python3 qt.py
+"""
+import argparse
+import itertools
+import json
+import logging
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import chess
+
+DAILY_PUZZLE = {
+    'game': {
+        'id': 'fake0001',
+        'pgn': "e4 e5 Nf3 Nc6 Bc4 Nd4 Nxe5 Qg5",
+        'clock': '5+0',
+        'players': [{'name': 'White', 'color': 'white'}, {'name': 'Black', 'color': 'black'}],
+    },
+    'puzzle': {
+        'id': 'Fk001',
+        'initialPly': 7,
+        'rating': 1400,
+        'plays': 1000,
+        'solution': ['e5f7', 'g5g2', 'h1f1', 'g2e4', 'c4e2', 'd4f3'],
+        'themes': ['fork', 'short'],
+    },
+}
+
+ONLINE_BOTS = [
+    {'id': 'chessosity', 'username': 'chessosity', 'title': 'BOT',
+     'perfs': {'blitz': {'games': 5210, 'rating': 2105, 'rd': 45}, 'rapid': {'games': 880, 'rating': 2190, 'rd': 60}}},
+    {'id': 'fakebot', 'username': 'FakeBot', 'title': 'BOT',
+     'perfs': {'bullet': {'games': 120, 'rating': 1520, 'rd': 70}, 'blitz': {'games': 340, 'rating': 1480, 'rd': 50}}},
+]
+
+class FakeGame:
+    """One game between the account and the scripted opponent."""
+
+    def __init__(self, game_id, player, opponent, player_color=chess.WHITE, clock=(300, 0)):
+        self.id = game_id
+        self.player = player
+        self.opponent = opponent
+        self.player_color = player_color
+        self.clock = clock
+        self.board = chess.Board()
+        self.status = 'started'
+        self.winner = None
+        self.changed = threading.Condition()
+        self.version = 0
+
+    def state(self):
+        initial, increment = self.clock
+        state = {
+            'type': 'gameState',
+            'moves': ' '.join(move.uci() for move in self.board.move_stack),
+            'wtime': initial * 1000, 'btime': initial * 1000,
+            'winc': increment * 1000, 'binc': increment * 1000,
+            'status': self.status,
+        }
+        if self.winner:
+            state['winner'] = self.winner
+        return state
+
+    def full(self):
+        white, black = (self.player, self.opponent) if self.player_color == chess.WHITE else (self.opponent, self.player)
+        initial, increment = self.clock
+        return {
+            'type': 'gameFull', 'id': self.id, 'rated': False,
+            'variant': {'key': 'standard'}, 'speed': 'blitz',
+            'clock': {'initial': initial * 1000, 'increment': increment * 1000},
+            'white': white, 'black': black,
+            'initialFen': 'startpos', 'state': self.state(),
+        }
+
+    def push(self, move):
+        with self.changed:
+            self.board.push(move)
+            outcome = self.board.outcome(claim_draw=True)
+            if outcome:
+                self.status = 'mate' if outcome.termination == chess.Termination.CHECKMATE else 'draw'
+                if outcome.winner is not None:
+                    self.winner = 'white' if outcome.winner else 'black'
+            self.version += 1
+            self.changed.notify_all()
+
+    @property
+    def finished(self):
+        return self.status != 'started'
+
+
+class FakeLichess:
+    """
+    The fake server and its game state.
+
+    ``latency`` (+ up to ``jitter``) seconds are added to every request.
+    Requests fail with one of ``error_codes`` at ``error_rate``, and
+    ``fail_next`` queues specific statuses for the next requests.  Game
+    streams are cut without a proper end after ``drop_stream_after``
+    events.  The opponent answers after ``opponent_delay`` seconds with the
+    next of ``opponent_moves`` if it is legal, else its first legal move.
+    ``/api/puzzle/next`` cycles through ``puzzle_pool`` copies of the daily
+    puzzle with distinct ids, so repeats come back after a full cycle.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 error_codes=(429, 500, 502, 503), drop_stream_after=None, opponent_moves=(),
+                 opponent_delay=0.05, username='tester', puzzle_pool=20, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_codes = tuple(error_codes)
+        self.drop_stream_after = drop_stream_after
+        self.opponent_moves = list(opponent_moves)
+        self.opponent_delay = opponent_delay
+        self.username = username
+        self.puzzle_pool = puzzle_pool
+        self._puzzle_ids = itertools.cycle(range(1, puzzle_pool + 1))
+        self.random = random.Random(seed)
+        self.games = {}
+        self.requests = {}  # route name -> count
+        self._failures = []
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._events = threading.Condition()
+        self._incoming = []  # account events, in order
+        self._stopping = threading.Event()
+        self.httpd = _Server((host, port), _Handler)
+        self.httpd.lichess = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05},
+                                        name="fake-lichess", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping.set()
+        with self._events:
+            self._events.notify_all()
+        for game in list(self.games.values()):
+            with game.changed:
+                game.changed.notify_all()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def fail_next(self, *statuses):
+        """Answer the next requests with these HTTP statuses, in order."""
+        with self._lock:
+            self._failures.extend(statuses)
+
+    def injected_error(self):
+        with self._lock:
+            if self._failures:
+                return self._failures.pop(0)
+        if self.error_rate and self.random.random() < self.error_rate:
+            return self.random.choice(self.error_codes)
+        return None
+
+    def delay(self):
+        pause = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+        if pause:
+            time.sleep(pause)
+
+    def count(self, route):
+        with self._lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+
+    def next_puzzle(self):
+        with self._lock:
+            number = next(self._puzzle_ids)
+        puzzle = json.loads(json.dumps(DAILY_PUZZLE))
+        puzzle['puzzle']['id'] = f"Fk{number:03d}"
+        return puzzle
+
+    # Game handling
+
+    def create_game(self, opponent, color=None, clock=(300, 0)):
+        game_id = f"fake{next(self._ids):04d}"
+        player_color = chess.BLACK if color == 'black' else chess.WHITE
+        player = {'id': self.username, 'name': self.username, 'rating': 1500}
+        game = FakeGame(game_id, player, opponent, player_color, clock)
+        self.games[game_id] = game
+        with self._events:
+            self._incoming.append({'type': 'gameStart', 'game': {'gameId': game_id, 'id': game_id}})
+            self._events.notify_all()
+        if player_color == chess.BLACK:
+            self._schedule_reply(game)
+        return game
+
+    def play(self, game, uci):
+        """Apply the account's move; returns an error message or None."""
+        with game.changed:
+            if game.finished:
+                return "Game is over"
+            if game.board.turn != game.player_color:
+                return "Not your turn"
+            try:
+                move = chess.Move.from_uci(uci)
+            except ValueError:
+                return f"Invalid move: {uci}"
+            if move not in game.board.legal_moves:
+                return f"Illegal move: {uci}"
+            game.push(move)
+        if not game.finished:
+            self._schedule_reply(game)
+        return None
+
+    def _schedule_reply(self, game):
+        timer = threading.Timer(self.opponent_delay, self._reply, args=(game,))
+        timer.daemon = True
+        timer.start()
+
+    def _reply(self, game):
+        with game.changed:
+            if game.finished or game.board.turn == game.player_color:
+                return
+            move = None
+            ply = len(game.board.move_stack)
+            if ply // 2 < len(self.opponent_moves):
+                scripted = chess.Move.from_uci(self.opponent_moves[ply // 2])
+                if scripted in game.board.legal_moves:
+                    move = scripted
+            if move is None:
+                move = min(game.board.legal_moves, key=lambda m: m.uci())
+            game.push(move)
+
+
+ROUTES = [
+    ('GET', re.compile(r'^/api/account$'), 'account'),
+    ('POST', re.compile(r'^/api/challenge/ai$'), 'challenge_ai'),
+    ('POST', re.compile(r'^/api/challenge/(?P<username>[\w-]+)$'), 'challenge'),
+    ('GET', re.compile(r'^/api/bot/game/stream/(?P<game_id>\w+)$'), 'game_stream'),
+    ('GET', re.compile(r'^/api/board/game/stream/(?P<game_id>\w+)$'), 'game_stream'),
+    ('POST', re.compile(r'^/api/bot/game/(?P<game_id>\w+)/move/(?P<uci>\w+)$'), 'move'),
+    ('POST', re.compile(r'^/api/board/game/(?P<game_id>\w+)/move/(?P<uci>\w+)$'), 'move'),
+    ('GET', re.compile(r'^/api/stream/event$'), 'events'),
+    ('GET', re.compile(r'^/api/puzzle/daily$'), 'puzzle'),
+    ('GET', re.compile(r'^/api/puzzle/next$'), 'puzzle_next'),
+    ('GET', re.compile(r'^/api/bot/online$'), 'online_bots'),
+]
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up on a stream are expected, not worth a traceback
+        logging.debug(f"Fake Lichess connection from {client_address} closed with an error")
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def lichess(self):
+        return self.server.lichess
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def _dispatch(self, method):
+        path = self.path.split('?', 1)[0]
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        for route_method, pattern, name in ROUTES:
+            match = pattern.match(path)
+            if route_method == method and match:
+                break
+        else:
+            self._json(404, {'error': 'Not found'})
+            return
+        self.lichess.count(name)
+        self.lichess.delay()
+        status = self.lichess.injected_error()
+        if status:
+            self._json(status, {'error': f'Injected {status}'})
+            return
+        getattr(self, f'_{name}')(body=body, **match.groupdict())
+
+    def _json(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _start_stream(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+    def _chunk(self, line):
+        data = line.encode()
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _end_stream(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _drop_stream(self):
+        # Close mid-stream without the terminating chunk, like a lost connection
+        self.close_connection = True
+        self.connection.shutdown(2)
+
+    # Endpoints
+
+    def _account(self, body):
+        self._json(200, {'id': self.lichess.username, 'username': self.lichess.username})
+
+    def _clock(self, body):
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            payload = {}
+        return (payload.get('clock.limit') or 300, payload.get('clock.increment') or 0), payload
+
+    def _challenge_ai(self, body):
+        clock, payload = self._clock(body)
+        opponent = {'aiLevel': payload.get('level') or 3}
+        game = self.lichess.create_game(opponent, payload.get('color'), clock)
+        self._json(201, {'id': game.id, 'status': 'started', 'player': 'white'})
+
+    def _challenge(self, body, username):
+        clock, payload = self._clock(body)
+        opponent = {'id': username.lower(), 'name': username, 'title': 'BOT', 'rating': 2000}
+        game = self.lichess.create_game(opponent, payload.get('color'), clock)
+        self._json(200, {'id': game.id, 'status': 'created', 'challenger': {'id': self.lichess.username}})
+
+    def _move(self, body, game_id, uci):
+        game = self.lichess.games.get(game_id)
+        if game is None:
+            self._json(404, {'error': 'No such game'})
+            return
+        error = self.lichess.play(game, uci)
+        if error:
+            self._json(400, {'error': error})
+        else:
+            self._json(200, {'ok': True})
+
+    def _game_stream(self, body, game_id):
+        game = self.lichess.games.get(game_id)
+        if game is None:
+            self._json(404, {'error': 'No such game'})
+            return
+        self._start_stream()
+        sent = 0
+        with game.changed:
+            version = game.version
+            event = game.full()
+        while True:
+            if event is not None:
+                self._chunk(json.dumps(event) + "\n")
+                sent += 1
+                if game.finished:
+                    self._end_stream()
+                    return
+                if self.lichess.drop_stream_after is not None and sent >= self.lichess.drop_stream_after:
+                    self._drop_stream()
+                    return
+            with game.changed:
+                if game.version == version and not self.lichess._stopping.is_set():
+                    game.changed.wait(1.0)
+                if self.lichess._stopping.is_set():
+                    self._end_stream()
+                    return
+                if game.version == version:
+                    event = None
+                    self._chunk("\n")  # keep-alive, as Lichess sends
+                    continue
+                version = game.version
+                event = game.state()
+
+    def _events(self, body):
+        lichess = self.lichess
+        self._start_stream()
+        position = 0
+        while not lichess._stopping.is_set():
+            with lichess._events:
+                if position == len(lichess._incoming):
+                    lichess._events.wait(1.0)
+                pending = lichess._incoming[position:]
+                position += len(pending)
+            for event in pending:
+                self._chunk(json.dumps(event) + "\n")
+            if not pending:
+                self._chunk("\n")
+        self._end_stream()
+
+    def _puzzle(self, body):
+        self._json(200, DAILY_PUZZLE)
+
+    def _puzzle_next(self, body):
+        self._json(200, self.lichess.next_puzzle())
+
+    def _online_bots(self, body):
+        self._start_stream()
+        for bot in ONLINE_BOTS:
+            self._chunk(json.dumps(bot) + "\n")
+        self._end_stream()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Lichess API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9000)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument('--jitter', type=float, default=0.0, help="random extra latency, up to this many seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with 429/5xx")
+    parser.add_argument('--drop-stream-after', type=int, default=None, help="cut game streams after N events")
+    parser.add_argument('--opponent-delay', type=float, default=0.5)
+    parser.add_argument('--opponent-moves', default='', help="space separated UCI moves for the opponent")
+    args = parser.parse_args()
+    server = FakeLichess(args.host, args.port, latency=args.latency, jitter=args.jitter,
+                         error_rate=args.error_rate, drop_stream_after=args.drop_stream_after,
+                         opponent_moves=args.opponent_moves.split(), opponent_delay=args.opponent_delay)
+    print(f"Fake Lichess listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from PyQt6.QtGui import QRegion
+from collections import deque, namedtuple
+import time
+import logging
+
+PARTIAL = "partial"
+FULL = "full"
+
+FrameStats = namedtuple("FrameStats", [
+    "frame",        # running frame number
+    "mode",         # PARTIAL or FULL e-ink refresh
+    "widgets",      # widgets repainted in this frame
+    "requests",     # invalidations/callbacks folded into this frame
+    "latency_ms",   # time from the first request to the frame
+    "duration_ms",  # time spent building the frame
+])
+
+class FrameScheduler(QObject):
+    """
+    Central refresh scheduler for e-ink panels.
+
+    Widgets and UI updates register pending work with ``invalidate`` and
+    ``post`` instead of repainting straight away.  Everything that arrives
+    before the next frame is folded into one batch, and frames are issued at
+    most ``max_fps`` times per second.  Every ``full_refresh_every`` partial
+    frames a full refresh is forced to clear ghosting.
+    """
+    frameCommitted = pyqtSignal(object)  # FrameStats
+
+    def __init__(self, max_fps=4, full_refresh_every=10, root=None, history=100, parent=None):
+        super().__init__(parent)
+        self.max_fps = max_fps
+        self.full_refresh_every = full_refresh_every
+        self.root = root
+        self.frame = 0
+        self.partial_since_full = 0
+        self.history = deque(maxlen=history)
+        self._regions = {}  # widget -> QRegion, or None for the whole widget
+        self._callbacks = {}  # key -> callback, in post order; unkeyed posts get a key of their own
+        self._requests = 0
+        self._first_request = None
+        self._force_full = False
+        self._last_frame = 0.0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.flush)
+
+    def invalidate(self, widget, rect=None):
+        """Mark ``widget`` (or ``rect`` inside it) for repaint in the next frame."""
+        if rect is None or self._regions.get(widget, QRegion()) is None:
+            self._regions[widget] = None
+        else:
+            self._regions[widget] = self._regions.get(widget, QRegion()).united(rect)
+        self._request()
+
+    def post(self, callback, key=None):
+        """
+        Run ``callback`` right before the next frame.  Callbacks sharing a
+        ``key`` are coalesced so only the latest one runs, in the position
+        of its latest post.
+        """
+        if key is None:
+            key = object()
+        self._callbacks.pop(key, None)
+        self._callbacks[key] = callback
+        self._request()
+
+    def request_full_refresh(self):
+        """Make the next frame a full e-ink refresh."""
+        self._force_full = True
+        self._request()
+
+    def pending(self):
+        return bool(self._regions or self._callbacks or self._force_full)
+
+    def _request(self):
+        self._requests += 1
+        if self._first_request is None:
+            self._first_request = time.monotonic()
+        if not self._timer.isActive():
+            interval = 1.0 / self.max_fps if self.max_fps else 0.0
+            wait = max(0.0, self._last_frame + interval - time.monotonic())
+            self._timer.start(int(wait * 1000))
+
+    def flush(self):
+        """Build a frame from everything pending now."""
+        self._timer.stop()
+        if not self.pending():
+            return None
+        started = time.monotonic()
+        first_request, self._first_request = self._first_request, None
+        requests, self._requests = self._requests, 0
+
+        # Callbacks may invalidate widgets themselves; they land in this frame.
+        callbacks, self._callbacks = self._callbacks, {}
+        for callback in callbacks.values():
+            try:
+                callback()
+            except Exception as e:
+                logging.error(f"Frame callback failed: {e}")
+
+        regions, self._regions = self._regions, {}
+        if not self.pending():
+            # Only invalidations came from the callbacks, and they are in this frame
+            self._timer.stop()
+            self._first_request = None
+            self._requests = 0
+        if self._force_full or (self.full_refresh_every and
+                                self.partial_since_full + 1 >= self.full_refresh_every):
+            mode = FULL
+            self.partial_since_full = 0
+        else:
+            mode = PARTIAL
+            self.partial_since_full += 1
+
+        if mode == FULL and self.root is not None:
+            self.root.update()
+        else:
+            for widget, region in regions.items():
+                if region is None:
+                    widget.update()
+                else:
+                    widget.update(region)
+
+        self.frame += 1
+        stats = FrameStats(
+            frame=self.frame,
+            mode=mode,
+            widgets=len(regions),
+            requests=requests,
+            latency_ms=(started - (first_request or started)) * 1000,
+            duration_ms=(time.monotonic() - started) * 1000,
+        )
+        self.history.append(stats)
+        self._force_full = False
+        self._last_frame = time.monotonic()
+        logging.debug(f"Frame {stats.frame}: {stats.mode}, {stats.widgets} widgets, {stats.requests} requests")
+        self.frameCommitted.emit(stats)
+        return stats
+
+    def stats(self):
+        """Return the recorded FrameStats, oldest first."""
+        return list(self.history)
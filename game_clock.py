@@ -0,0 +1,117 @@
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+import chess
+import math
+import time
+
+def format_clock(seconds):
+    if seconds <= 0:
+        return "00:00"
+    minutes = int(seconds // 60)
+    seconds = int(seconds % 60)
+    return f"{minutes:02d}:{seconds:02d}"
+
+class GameClock(QObject):
+    """
+    Authoritative chess clock for both sides.
+
+    Remaining time is derived from ``time.monotonic()`` when it is read, so
+    the two sides cannot drift apart.  A single ticker is scheduled for the
+    moment the running side's displayed text changes next, which means at
+    most one wakeup per second instead of fixed-rate polling.
+    """
+    changed = pyqtSignal(bool)  # color whose displayed time changed
+    flagged = pyqtSignal(bool)  # color that ran out of time
+
+    def __init__(self, seconds=300, increment=0, parent=None):
+        super().__init__(parent)
+        self.ticker = QTimer(self)
+        self.ticker.setSingleShot(True)
+        self.ticker.timeout.connect(self._tick)
+        self.reset(seconds, increment)
+
+    def reset(self, seconds=300, increment=0):
+        self.ticker.stop()
+        self.increment = increment
+        self._remaining = {chess.WHITE: float(seconds), chess.BLACK: float(seconds)}
+        self._running = None
+        self._started_at = None
+        self._shown = {}
+        self._emit_changes()
+
+    @property
+    def running(self):
+        """Color whose clock is running, or None."""
+        return self._running
+
+    def remaining(self, color):
+        remaining = self._remaining[color]
+        if color == self._running:
+            remaining -= time.monotonic() - self._started_at
+        return max(0.0, remaining)
+
+    def set_remaining(self, color, seconds):
+        if color == self._running:
+            self._started_at = time.monotonic()
+        self._remaining[color] = float(seconds)
+        self._emit_changes()
+        self._schedule()
+
+    def display(self, color):
+        return format_clock(self.remaining(color))
+
+    def start(self, color):
+        """Start ``color``'s clock, stopping the other side without increment."""
+        self._halt()
+        if self._remaining[color] <= 0:
+            return
+        self._running = color
+        self._started_at = time.monotonic()
+        self._schedule()
+
+    def switch(self, color):
+        """Hand the move to ``color``: the side that just moved gets its increment."""
+        moved = self._running
+        self._halt()
+        if moved is not None and moved != color:
+            self._remaining[moved] += self.increment
+        self._emit_changes()
+        self.start(color)
+
+    def stop(self):
+        self._halt()
+        self._emit_changes()
+
+    def _halt(self):
+        self.ticker.stop()
+        if self._running is not None:
+            self._remaining[self._running] = self.remaining(self._running)
+        self._running = None
+        self._started_at = None
+
+    def _schedule(self):
+        if self._running is None:
+            return
+        remaining = self.remaining(self._running)
+        # Wake up just after the displayed whole second rolls over; on a
+        # whole second (300.0 at the start) that is right away
+        fraction = remaining - math.floor(remaining)
+        self.ticker.start(int(fraction * 1000) + 5)
+
+    def _tick(self):
+        color = self._running
+        if color is None:
+            return
+        self._emit_changes()
+        if self.remaining(color) <= 0:
+            self._halt()
+            self._remaining[color] = 0.0
+            self.flagged.emit(color)
+        else:
+            self._schedule()
+
+    def _emit_changes(self):
+        for color in (chess.WHITE, chess.BLACK):
+            text = self.display(color)
+            if self._shown.get(color) != text:
+                self._shown[color] = text
+                self.changed.emit(color)
@@ -0,0 +1,44 @@
+"""
+Incremental application of Lichess game states.
+
+Every ``gameState`` event carries the complete move list of the game.
+Instead of replaying it, the list is compared with the moves already on
+the board and only the new tail is pushed.
+"""
+import chess
+
+def normalize_fen(fen):
+    """Lichess uses "startpos" for the standard starting position."""
+    if not fen or fen == "startpos":
+        return chess.STARTING_FEN
+    return fen
+
+def diff_moves(applied, server_moves, confirmed=0):
+    """
+    Compare the moves on the board (``board.move_stack``) with the server's
+    UCI move list.  Returns ``(diverged_at, new_moves)``:
+
+    * ``(None, tail)`` when the board is consistent with the server; ``tail``
+      holds the server moves that still have to be pushed (possibly none,
+      e.g. while a locally played move is not confirmed yet).
+    * ``(ply, tail)`` when they disagree from ``ply`` on; moves from ``ply``
+      must be taken back before ``tail`` is pushed.
+
+    The first ``confirmed`` plies were matched by an earlier event and are
+    not compared again, so a normal update only looks at the newest moves.
+    A list shorter than ``confirmed`` means moves were taken back; then the
+    whole list is compared.
+    """
+    taken_back = len(server_moves) < confirmed
+    start = 0 if taken_back else confirmed
+    shared = min(len(applied), len(server_moves))
+    for ply in range(min(start, shared), shared):
+        if applied[ply].uci() != server_moves[ply]:
+            return ply, server_moves[ply:]
+    if taken_back and len(applied) > len(server_moves):
+        return len(server_moves), []
+    return None, server_moves[len(applied):]
+
+def follows(board, initial_fen):
+    """True if ``board`` was played from ``initial_fen``."""
+    return board.root().fen() == normalize_fen(initial_fen)
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Compile the SVG mockups in ``layouts/`` into layout profiles.
+
+Each ``layout_<W>x<H>_<orientation>.svg`` is parsed once into the compact
+profile format used by LayoutManager (window, board, history, button and
+clock sizes plus margins).  Results are cached in ``layouts/profiles.json``
+together with the size, mtime and hash of each source, so the SVGs are only
+parsed again when one of them changes.  Run this file directly to rebuild
+the cache.
+"""
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import xml.etree.ElementTree as ET
+
+LAYOUTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "layouts")
+CACHE_FILE = os.path.join(LAYOUTS_DIR, "profiles.json")
+CACHE_VERSION = 3
+DEFAULT_PROFILE = "layout_1920x1440_horizontal"
+NAME_PATTERN = re.compile(r"^layout_(\d+)x(\d+)_(horizontal|vertical)$")
+
+# Hand-tuned profiles; they win over a mockup of the same resolution, so
+# editing a placeholder mockup cannot silently change a shipped layout
+BUILTIN_PROFILES = {
+    'layout_1920x1440_horizontal': {
+        'window_size': (1920, 1440),
+        'board_size': (1300, 1300),
+        'history_size': (520, 1000),
+        'button_size': (250, 80),
+        'clock_size': (250, 120),
+        'margin': (20, 80, 20, 20),
+        'top_bar_visible': True,  # Top menu is visible
+        'orientation': 'horizontal',
+    },
+    'layout_1920x1080_horizontal': {
+        'window_size': (1920, 1080),
+        'board_size': (1000, 1000),
+        'history_size': (800, 600),
+        'button_size': (400, 80),
+        'clock_size': (400, 120),
+        'margin': (20, 40, 20, 20),
+        'top_bar_visible': False,
+        'orientation': 'horizontal',
+    },
+    'layout_1440x1920_vertical': {
+        'window_size': (1440, 1920),
+        'board_size': (1300, 1300),
+        'history_size': (640, 380),
+        'button_size': (310, 80),
+        'clock_size': (600, 220),
+        'margin': (20, 80, 20, 20),
+        'top_bar_visible': True,
+        'orientation': 'vertical',
+    },
+    'layout_2220x1080_horizontal': {
+        'window_size': (2220, 1080),
+        'board_size': (960, 960),
+        'history_size': (1160, 600),
+        'button_size': (250, 60),
+        'clock_size': (560, 200),
+        'margin': (20, 10, 20, 20),
+        'top_bar_visible': True,
+        'orientation': 'horizontal',
+    },
+    'layout_1080x2220_vertical': {
+        'window_size': (1080, 2220),
+        'board_size': (1000, 1000),
+        'history_size': (1000, 400),
+        'button_size': (250, 45),
+        'clock_size': (480, 180),
+        'margin': (20, 10, 20, 20),
+        'top_bar_visible': True,
+        'orientation': 'vertical',
+    },
+}
+
+# Text labels in the mockups and the role of the rectangle they sit in
+LABEL_ROLES = {
+    'new game': 'menu_button',
+    'play vs bot': 'menu_button',
+    'puzzles': 'menu_button',
+    'settings': 'menu_button',
+    'previous': 'nav_button',
+    'next': 'nav_button',
+    'ask for hint': 'nav_button',
+    'chat': 'chat',
+    'move history': 'history',
+    'player info': 'player_info',
+    '05:00': 'clock',
+}
+
+# Comment keywords for rectangles without a label
+COMMENT_ROLES = [
+    ('menu bar', 'top_bar'),
+    ('board', 'board'),
+    ('timer', 'clock'),
+    ('clock', 'clock'),
+    ('panel', 'panel'),
+]
+
+class LayoutCompileError(Exception):
+    pass
+
+def _local(tag):
+    return tag.rsplit('}', 1)[-1]
+
+def _number(value):
+    return float(value or 0)
+
+def parse_svg(path):
+    """Return (width, height, rects, labels) found in a mockup."""
+    parser = ET.XMLParser(target=ET.TreeBuilder(insert_comments=True))
+    root = ET.parse(path, parser=parser).getroot()
+    width, height = _number(root.get('width')), _number(root.get('height'))
+    rects, labels = [], []
+    comment = ''
+    for element in root.iter():
+        if element.tag is ET.Comment:
+            comment = (element.text or '').strip().lower()
+            continue
+        tag = _local(element.tag)
+        if tag == 'rect':
+            rects.append({
+                'rect': tuple(_number(element.get(k)) for k in ('x', 'y', 'width', 'height')),
+                'comment': comment,
+                'role': None,
+            })
+        elif tag == 'text':
+            labels.append((_number(element.get('x')), _number(element.get('y')),
+                           ''.join(element.itertext()).strip().lower()))
+    return width, height, rects, labels
+
+def _contains(rect, x, y):
+    rx, ry, rw, rh = rect
+    return rx <= x <= rx + rw and ry <= y <= ry + rh
+
+def classify(rects, labels):
+    """Assign a role to each rectangle, from its label or the preceding comment."""
+    for x, y, text in labels:
+        role = LABEL_ROLES.get(text)
+        if role is None and text.startswith('white:'):
+            role = 'player_info'
+        if role is None:
+            continue
+        inside = [r for r in rects if _contains(r['rect'], x, y)]
+        if inside:
+            smallest = min(inside, key=lambda r: r['rect'][2] * r['rect'][3])
+            smallest['role'] = role
+            smallest['label'] = text
+    for r in rects:
+        if r['role'] is None:
+            for keyword, role in COMMENT_ROLES:
+                if keyword in r['comment']:
+                    r['role'] = role
+                    break
+    return rects
+
+def compile_svg(path):
+    """Compile one mockup into a profile dict."""
+    name = os.path.splitext(os.path.basename(path))[0]
+    match = NAME_PATTERN.match(name)
+    if not match:
+        raise LayoutCompileError(f"{name}: not a layout_<W>x<H>_<orientation> mockup")
+    orientation = match.group(3)
+    width, height, rects, labels = parse_svg(path)
+    if (int(width), int(height)) != (int(match.group(1)), int(match.group(2))) or \
+            (height > width) != (orientation == 'vertical'):
+        raise LayoutCompileError(f"{name}: canvas {int(width)}x{int(height)} does not match its name")
+
+    by_role = {}
+    for r in classify(rects, labels):
+        by_role.setdefault(r['role'], []).append(r)
+
+    def first(role):
+        items = by_role.get(role)
+        if not items:
+            raise LayoutCompileError(f"{name}: no {role} rectangle")
+        return items[0]['rect']
+
+    board = first('board')
+    history = first('history')
+    clock = first('clock')
+    nav = [r for r in by_role.get('nav_button', []) if r.get('label') == 'previous'] or by_role.get('nav_button')
+    if not nav:
+        raise LayoutCompileError(f"{name}: no navigation button")
+    button = nav[0]['rect']
+
+    top_bar = by_role.get('top_bar')
+    content = [r['rect'] for r in rects if r['role'] not in (None, 'top_bar', 'menu_button')]
+    right = max(x + w for x, y, w, h in content)
+    bottom = max(y + h for x, y, w, h in content)
+    top = top_bar[0]['rect'][3] if top_bar else board[1]
+
+    return {
+        'window_size': (int(width), int(height)),
+        'board_size': (int(min(board[2], board[3])),) * 2,
+        'history_size': (int(history[2]), int(history[3])),
+        'button_size': (int(button[2]), int(button[3])),
+        'clock_size': (int(clock[2]), int(clock[3])),
+        'margin': (int(board[0]), int(top), max(0, int(width - right)), max(0, int(height - bottom))),
+        'top_bar_visible': bool(top_bar),
+        'orientation': orientation,
+    }
+
+def _sources(layouts_dir):
+    return sorted(f for f in os.listdir(layouts_dir)
+                  if f.endswith('.svg') and NAME_PATTERN.match(f[:-4]))
+
+def _sha1(path):
+    with open(path, 'rb') as source:
+        return hashlib.sha1(source.read()).hexdigest()
+
+def fingerprint(layouts_dir=LAYOUTS_DIR, known=None):
+    """
+    ``{file: [size, mtime_ns, sha1]}`` of each mockup.  Only files whose
+    size or mtime differ from ``known``, an earlier fingerprint, are read
+    and hashed; a checkout changes the mtimes but keeps the hashes.
+    """
+    known = known or {}
+    sources = {}
+    for f in _sources(layouts_dir):
+        path = os.path.join(layouts_dir, f)
+        stat = os.stat(path)
+        entry = [stat.st_size, stat.st_mtime_ns]
+        previous = known.get(f)
+        sources[f] = previous if previous and previous[:2] == entry else entry + [_sha1(path)]
+    return sources
+
+def _hashes(sources):
+    return {f: entry[2] for f, entry in sources.items()}
+
+def compile_all(layouts_dir=LAYOUTS_DIR):
+    profiles = {name: dict(profile) for name, profile in BUILTIN_PROFILES.items()}
+    for filename in _sources(layouts_dir):
+        name = filename[:-4]
+        try:
+            profile = compile_svg(os.path.join(layouts_dir, filename))
+        except (LayoutCompileError, ET.ParseError) as e:
+            logging.warning(f"Skipping layout mockup: {e}")
+            continue
+        if name in BUILTIN_PROFILES:
+            if profile != BUILTIN_PROFILES[name]:
+                logging.debug(f"{name}: mockup differs from the built-in profile, keeping the built-in one")
+            continue
+        profiles[name] = profile
+    return profiles
+
+def write_cache(profiles, layouts_dir=LAYOUTS_DIR, cache_file=CACHE_FILE, sources=None):
+    data = {'version': CACHE_VERSION, 'sources': sources or fingerprint(layouts_dir), 'profiles': profiles}
+    with open(cache_file, 'w') as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+
+def _tuples(profile):
+    return {k: tuple(v) if isinstance(v, list) else v for k, v in profile.items()}
+
+class ProfileStore:
+    """
+    Lazily loaded layout profiles.
+
+    Nothing is read until a profile is first needed; then the JSON cache is
+    used if its fingerprint still matches the mockups, otherwise the SVGs are
+    compiled again.  The cache is rewritten, when the directory is writable,
+    whenever a source changed, even if only its mtime did.
+    """
+
+    def __init__(self, layouts_dir=LAYOUTS_DIR, cache_file=None):
+        self.layouts_dir = layouts_dir
+        self.cache_file = cache_file or os.path.join(layouts_dir, "profiles.json")
+        self._profiles = None
+
+    def _load(self):
+        if self._profiles is not None:
+            return self._profiles
+        profiles = None
+        cached = {}
+        try:
+            with open(self.cache_file) as f:
+                data = json.load(f)
+            if data.get('version') == CACHE_VERSION:
+                cached = data['sources']
+                profiles = data['profiles']
+        except (OSError, ValueError, KeyError):
+            pass
+        # Normally only stats the mockups; see fingerprint
+        sources = fingerprint(self.layouts_dir, cached)
+        if profiles is None or _hashes(sources) != _hashes(cached):
+            profiles = compile_all(self.layouts_dir)
+        if sources != cached:
+            try:
+                write_cache(profiles, self.layouts_dir, self.cache_file, sources)
+            except OSError as e:
+                logging.debug(f"Could not write layout cache: {e}")
+        self._profiles = {name: _tuples(profile) for name, profile in profiles.items()}
+        return self._profiles
+
+    def names(self):
+        """Profile names, default first and the rest by orientation and size."""
+        profiles = self._load()
+        others = sorted((n for n in profiles if n != DEFAULT_PROFILE),
+                        key=lambda n: (profiles[n]['orientation'], -profiles[n]['window_size'][0] * profiles[n]['window_size'][1], n))
+        return ([DEFAULT_PROFILE] if DEFAULT_PROFILE in profiles else []) + others
+
+    def __contains__(self, name):
+        return name in self._load()
+
+    def __getitem__(self, name):
+        return self._load()[name]
+
+    def get(self, name, default=None):
+        return self._load().get(name, default)
+
+    def nearest(self, width, height):
+        """Name of the profile closest to a screen: same orientation, then aspect ratio, then size."""
+        profiles = self._load()
+        orientation = 'vertical' if height > width else 'horizontal'
+
+        def distance(name):
+            w, h = profiles[name]['window_size']
+            return (profiles[name]['orientation'] != orientation,
+                    abs(math.log((w / h) / (width / height))),
+                    abs(math.log((w * h) / (width * height))))
+
+        if not profiles or not width or not height:
+            return DEFAULT_PROFILE
+        return min(profiles, key=distance)
+
+def describe(name, profile):
+    """Human readable label for pickers, e.g. "Tablet/Portrait (1440x1920)"."""
+    match = NAME_PATTERN.match(name)
+    w, h = (match.group(1), match.group(2)) if match else profile['window_size']
+    kind = "Tablet/Portrait" if profile['orientation'] == 'vertical' else "Desktop"
+    return f"{kind} ({w}x{h})"
+
+_default_store = None
+
+def default_store():
+    """Process-wide ProfileStore shared by the layout manager and pickers."""
+    global _default_store
+    if _default_store is None:
+        _default_store = ProfileStore()
+    return _default_store
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    compiled = compile_all()
+    write_cache(compiled)
+    for profile_name in sorted(compiled):
+        print(f"{profile_name}: {compiled[profile_name]}")
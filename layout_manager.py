@@ -1,6 +1,8 @@
 from PyQt6.QtCore import Qt, QSize
-from PyQt6.QtWidgets import QVBoxLayout, QHBoxLayout, QWidget, QPushButton, QLabel, QScrollArea, QSizePolicy
+from PyQt6.QtWidgets import QVBoxLayout, QHBoxLayout, QWidget, QPushButton, QLabel, QScrollArea, QSizePolicy, QStackedWidget
 from PyQt6.QtGui import QScreen, QGuiApplication, QFont
+import logging
+from layout_compiler import default_store, DEFAULT_PROFILE
 
 class LayoutManager:
     def __init__(self, main_window):
@@ -11,90 +13,34 @@ class LayoutManager:
         self.play_vs_bot_button = None
         self.puzzles_button = None
         self.next_puzzle_button = None
-        # Define your layout profiles (others omitted for brevity)
-        self.layouts = {
-            'layout_1920x1440_horizontal': {
-                'window_size': (1920, 1440),
-                'board_size': (1300, 1300),
-                'history_size': (520, 1000),
-                'button_size': (250, 80),
-                'clock_size': (250, 120),
-                'margin': (20, 80, 20, 20),
-                'top_bar_visible': True,  # Top menu is visible
-                'create_layout': self.create_horizontal_layout
-            },
-            'layout_1920x1080_horizontal': {
-                'window_size': (1920, 1080),
-                'board_size': (1000, 1000),
-                'history_size': (800, 600),
-                'button_size': (400, 80),
-                'clock_size': (400, 120),
-                'margin': (20, 40, 20, 20),
-                'top_bar_visible': False,
-                'create_layout': self.create_horizontal_layout
-            },
-            'layout_1440x1920_vertical': {
-                'window_size': (1440, 1920),
-                'board_size': (1300, 1300),
-                'history_size': (640, 380),
-                'button_size': (310, 80),
-                'clock_size': (600, 220),
-                'margin': (20, 80, 20, 20),
-                'top_bar_visible': True,
-                'create_layout': self.create_vertical_layout
-            },
-            'layout_2220x1080_horizontal': {
-                'window_size': (2220, 1080),
-                'board_size': (960, 960),
-                'history_size': (1160, 600),
-                'button_size': (250, 60),
-                'clock_size': (560, 200),
-                'margin': (20, 10, 20, 20),
-                'top_bar_visible': True,
-                'create_layout': self.create_horizontal_layout
-            },
-            'layout_1080x2220_vertical': {
-                'window_size': (1080, 2220),
-                'board_size': (1000, 1000),
-                'history_size': (1000, 400),
-                'button_size': (250, 45),
-                'clock_size': (480, 180),
-                'margin': (20, 10, 20, 20),
-                'top_bar_visible': True,
-                'create_layout': self.create_vertical_layout
-            }
-        }
+        self.applied_key = None  # (profile, screen width, screen height) last applied
+        self.stack = None  # QStackedWidget holding one retained page per profile
+        self.pages = {}  # profile name -> (page index, widget slots)
+        self.scaled_geometry = {}  # (profile, screen width, screen height) -> scaled sizes
+        self._slots = []  # slots recorded while a page is being built
+        # Layout profiles compiled from layouts/*.svg, loaded on first use
+        self.layouts = default_store()
 
     def apply_layout(self, profile_name):
+        """
+        Apply a layout profile scaled to the primary screen.  Returns False
+        without touching any widget when the resolved profile and screen
+        geometry are the same as last time.
+        """
         # Use default layout if detected profile is not defined.
         if profile_name not in self.layouts:
-            profile = self.layouts["layout_1920x1440_horizontal"]
-            self.current_profile = "layout_1920x1440_horizontal"
-        else:
-            profile = self.layouts[profile_name]
-            self.current_profile = profile_name
+            profile_name = DEFAULT_PROFILE
 
-        # Compute relative scale factor
-        from PyQt6.QtGui import QGuiApplication
         screen = QGuiApplication.primaryScreen()
-        if screen:
-            geometry = screen.geometry()
-            scale_factor = min(
-                geometry.width() / profile['window_size'][0],
-                geometry.height() / profile['window_size'][1]
-            )
-        else:
-            scale_factor = 1.0
-
-        # Apply scaled sizes
-        ws = tuple(int(dim * scale_factor) for dim in profile['window_size'])
-        bs = tuple(int(dim * scale_factor) for dim in profile['board_size'])
-        hs = tuple(int(dim * scale_factor) for dim in profile['history_size'])
-        btn = tuple(int(dim * scale_factor) for dim in profile['button_size'])
-        clk = tuple(int(dim * scale_factor) for dim in profile['clock_size'])
-        margin = tuple(max(20, int(m * scale_factor)) for m in profile['margin'])
-
-        self.main_window.resize(*ws)
+        geometry = screen.geometry() if screen else None
+        key = (profile_name, geometry.width(), geometry.height()) if geometry else (profile_name, None, None)
+        if key == self.applied_key:
+            return False
+        self.applied_key = key
+        self.current_profile = profile_name
+
+        sizes = self.scaled_sizes(key)
+        self.main_window.resize(*sizes['window_size'])
         # Respect the current window mode setting:
         if self.main_window.isFullScreen():
             self.main_window.showFullScreen()
@@ -102,22 +48,84 @@ class LayoutManager:
             self.main_window.showNormal()
 
         if hasattr(self.main_window.board_widget, "setFixedSize"):
-            self.main_window.board_widget.setFixedSize(*bs)
+            self.main_window.board_widget.setFixedSize(*sizes['board_size'])
         else:
             logging.warning("board_widget does not support setFixedSize")
 
-        self.main_window.move_history.setFixedSize(*hs)
+        self.main_window.move_history.setFixedSize(*sizes['history_size'])
 
         for btn_widget in [self.main_window.prev_button, self.main_window.hint_button]:
-            btn_widget.setFixedSize(*btn)
+            btn_widget.setFixedSize(*sizes['button_size'])
 
-        self.main_window.white_clock.setFixedSize(*clk)
-        self.main_window.black_clock.setFixedSize(*clk)
+        self.main_window.white_clock.setFixedSize(*sizes['clock_size'])
+        self.main_window.black_clock.setFixedSize(*sizes['clock_size'])
 
-        if self.current_profile.endswith('vertical'):
-            self.create_vertical_layout()
-        else:
-            self.create_horizontal_layout()
+        self.show_page(profile_name)
+        return True
+
+    def scaled_sizes(self, key):
+        """Profile sizes scaled to a screen, computed once per (profile, screen size)."""
+        sizes = self.scaled_geometry.get(key)
+        if sizes is None:
+            profile_name, width, height = key
+            profile = self.layouts[profile_name]
+            if width and height:
+                scale_factor = min(width / profile['window_size'][0], height / profile['window_size'][1])
+            else:
+                scale_factor = 1.0
+            sizes = {
+                name: tuple(int(dim * scale_factor) for dim in profile[name])
+                for name in ('window_size', 'board_size', 'history_size', 'button_size', 'clock_size')
+            }
+            sizes['margin'] = tuple(max(20, int(m * scale_factor)) for m in profile['margin'])
+            self.scaled_geometry[key] = sizes
+        return sizes
+
+    def show_page(self, profile_name):
+        """
+        Flip the central stacked widget to the page of ``profile_name``,
+        building it on first use.  Pages are kept, only the shared widgets
+        move between them.
+        """
+        if self.stack is None:
+            self.stack = QStackedWidget()
+            self.main_window.setCentralWidget(self.stack)
+        if profile_name not in self.pages:
+            self._detach()
+            self._slots = []
+            if profile_name.endswith('vertical'):
+                page = self.create_vertical_layout()
+            else:
+                page = self.create_horizontal_layout()
+            self.pages[profile_name] = (self.stack.addWidget(page), self._slots)
+        index, slots = self.pages[profile_name]
+        if self.stack.currentIndex() != index or not self._attached(slots):
+            self._attach(slots)
+        self.stack.setCurrentIndex(index)
+
+    def _place(self, layout, widget, stretch=0, fixed_size=None):
+        """Add a shared widget to a page layout and remember where it goes."""
+        self._slots.append((layout, layout.count(), widget, stretch, fixed_size))
+        layout.addWidget(widget, stretch=stretch)
+        if fixed_size:
+            widget.setFixedSize(*fixed_size)
+
+    def _attached(self, slots):
+        return all(layout.indexOf(widget) >= 0 for layout, _, widget, _, _ in slots)
+
+    def _detach(self):
+        """Pull the shared widgets out of whatever page currently holds them."""
+        for _, slots in self.pages.values():
+            for layout, _, widget, _, _ in slots:
+                layout.removeWidget(widget)
+
+    def _attach(self, slots):
+        self._detach()
+        # Put the shared widgets back into this page's slots in their original order
+        for layout, position, widget, stretch, fixed_size in sorted(slots, key=lambda slot: slot[1]):
+            layout.insertWidget(position, widget, stretch=stretch)
+            if fixed_size:
+                widget.setFixedSize(*fixed_size)
 
     def create_top_buttons(self):
         buttons = []
@@ -184,7 +192,7 @@ class LayoutManager:
 
         # Left panel: Chess board only.
         left_panel = QVBoxLayout()
-        left_panel.addWidget(self.main_window.board_widget)
+        self._place(left_panel, self.main_window.board_widget)
         main_wrapper.addLayout(left_panel, stretch=2)
 
         # Right panel: Contains top menu, then move history with navigation buttons and chat & info.
@@ -194,46 +202,44 @@ class LayoutManager:
         menu_layout = QHBoxLayout()
         # Exclude prev/next buttons from top menu now.
         for btn in self.create_top_buttons()[2:]:
-            menu_layout.addWidget(btn)
+            self._place(menu_layout, btn)
         right_panel.addLayout(menu_layout)
 
         # --- Move History with Navigation Buttons ---
         history_container = QHBoxLayout()
         # Move History widget takes available horizontal space.
-        history_container.addWidget(self.main_window.move_history, stretch=1)
+        self._place(history_container, self.main_window.move_history, stretch=1)
 
         # Navigation buttons container (square buttons)
         nav_buttons = QVBoxLayout()
         # Set fixed square size (example: 80x80)
-        self.main_window.prev_button.setFixedSize(80, 80)
-        self.main_window.next_button.setFixedSize(80, 80)
-        nav_buttons.addWidget(self.main_window.prev_button)
-        nav_buttons.addWidget(self.main_window.next_button)
+        self._place(nav_buttons, self.main_window.prev_button, fixed_size=(80, 80))
+        self._place(nav_buttons, self.main_window.next_button, fixed_size=(80, 80))
         history_container.addLayout(nav_buttons)
         right_panel.addLayout(history_container)
 
         # --- Chat Box (below move history) ---
-        right_panel.addWidget(self.main_window.chat_box, stretch=0)
+        self._place(right_panel, self.main_window.chat_box, stretch=0)
 
         # --- Player Info ---
-        right_panel.addWidget(self.main_window.player_info)
+        self._place(right_panel, self.main_window.player_info)
 
         # --- Clocks at Bottom (flat layout) ---
         clocks_layout = QHBoxLayout()
         clocks_layout.setSpacing(20)
-        clocks_layout.addWidget(self.main_window.white_clock)
-        clocks_layout.addWidget(self.main_window.black_clock)
+        self._place(clocks_layout, self.main_window.white_clock)
+        self._place(clocks_layout, self.main_window.black_clock)
         right_panel.addLayout(clocks_layout)
 
         # Add Next Puzzle button at bottom right
         button_container = QHBoxLayout()
         button_container.addStretch()
-        button_container.addWidget(self.next_puzzle_button)
+        self._place(button_container, self.next_puzzle_button)
         right_panel.addLayout(button_container)
 
         main_wrapper.addLayout(right_panel, stretch=1)
         container.setLayout(main_wrapper)
-        self.main_window.setCentralWidget(container)
+        return container
 
     def create_vertical_layout(self):
         container = QWidget()
@@ -243,7 +249,7 @@ class LayoutManager:
         main_wrapper.setSpacing(20)
 
         # Chess board on top.
-        main_wrapper.addWidget(self.main_window.board_widget, stretch=2)
+        self._place(main_wrapper, self.main_window.board_widget, stretch=2)
 
         # Middle section with horizontal split.
         middle_layout = QHBoxLayout()
@@ -251,8 +257,8 @@ class LayoutManager:
 
         # Left column: Move history and chat.
         text_container = QVBoxLayout()
-        text_container.addWidget(self.main_window.move_history)
-        text_container.addWidget(self.main_window.chat_box)
+        self._place(text_container, self.main_window.move_history)
+        self._place(text_container, self.main_window.chat_box)
         middle_layout.addLayout(text_container, stretch=2)
 
         # Right column: Top menu, player info, then clocks.
@@ -260,22 +266,22 @@ class LayoutManager:
         menu_layout = QHBoxLayout()
         menu_layout.addStretch()
         for btn in self.create_top_buttons():
-            menu_layout.addWidget(btn)
+            self._place(menu_layout, btn)
         right_column.addLayout(menu_layout)
-        right_column.addWidget(self.main_window.player_info)
+        self._place(right_column, self.main_window.player_info)
         clocks_layout = QHBoxLayout()
-        clocks_layout.addWidget(self.main_window.white_clock)
-        clocks_layout.addWidget(self.main_window.black_clock)
+        self._place(clocks_layout, self.main_window.white_clock)
+        self._place(clocks_layout, self.main_window.black_clock)
         right_column.addLayout(clocks_layout)
 
         # Add Next Puzzle button at bottom right
         button_container = QHBoxLayout()
         button_container.addStretch()
-        button_container.addWidget(self.next_puzzle_button)
+        self._place(button_container, self.next_puzzle_button)
         right_column.addLayout(button_container)
 
         middle_layout.addLayout(right_column, stretch=1)
         main_wrapper.addLayout(middle_layout, stretch=1)
 
         container.setLayout(main_wrapper)
-        self.main_window.setCentralWidget(container)
+        return container
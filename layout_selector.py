@@ -1,6 +1,7 @@
 from PyQt6.QtWidgets import QDialog, QVBoxLayout, QRadioButton, QPushButton, QLabel
 from PyQt6.QtGui import QFont
 from PyQt6.QtCore import Qt
+from layout_compiler import default_store, describe, DEFAULT_PROFILE
 
 class LayoutSelector(QDialog):
     def __init__(self, parent=None):
@@ -16,14 +17,9 @@ class LayoutSelector(QDialog):
         header.setFont(QFont("Palatino", 14))
         layout.addWidget(header)
 
-        # Layout options with clear descriptions
-        self.layouts = {
-            "Desktop (1920x1440)": "layout_1920x1440_horizontal",
-            "Widescreen (1920x1080)": "layout_1920x1080_horizontal",
-            "Tablet/Portrait (1440x1920)": "layout_1440x1920_vertical",
-            "Desktop (2220x1080)": "layout_2220x1080_horizontal",
-            "Tablet/Portrait (1080x2220)": "layout_1080x2220_vertical"
-        }
+        # Layout options with clear descriptions, one per compiled profile
+        store = default_store()
+        self.layouts = {describe(name, store[name]): name for name in store.names()}
 
         self.radio_buttons = {}
         for label, layout_id in self.layouts.items():
@@ -33,7 +29,7 @@ class LayoutSelector(QDialog):
             layout.addWidget(rb)
 
         # Default selection
-        self.radio_buttons["layout_1920x1440_horizontal"].setChecked(True)
+        self.radio_buttons[DEFAULT_PROFILE].setChecked(True)
 
         # Confirm button
         confirm_btn = QPushButton("Start Game")
@@ -47,4 +43,4 @@ class LayoutSelector(QDialog):
         for layout_id, button in self.radio_buttons.items():
             if button.isChecked():
                 return layout_id
-        return "layout_1920x1440_horizontal"
+        return DEFAULT_PROFILE
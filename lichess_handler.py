@@ -1,19 +1,84 @@
-import berserk
+import asyncio
+import json
 import logging
+import threading
 import time
 import traceback
+from urllib.parse import urlsplit
 import chess
+from move_submission import LatencyHistogram, backoff_delays, is_transient
 
 logging.basicConfig(level=logging.DEBUG)
 
+LICHESS_URL = "https://lichess.org"
+
+class StreamError(Exception):
+    """Lichess answered a streaming request with an error status."""
+
+    def __init__(self, status_code, reason=""):
+        super().__init__(f"HTTP {status_code} {reason}".rstrip())
+        self.status_code = status_code
+
+async def _read_lines(reader, chunked):
+    """Lines of a response body, chunked or ending with the connection."""
+    if not chunked:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            yield line
+    pending = b""
+    while True:
+        header = await reader.readline()
+        if not header:
+            raise ConnectionResetError("stream cut before its last chunk")
+        size = int(header.split(b";")[0], 16)
+        if size == 0:
+            return
+        pending += await reader.readexactly(size)
+        await reader.readexactly(2)
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line
+
 class LichessHandler:
-    def __init__(self, token):
-        self.session = berserk.TokenSession(token)
-        self.client = berserk.Client(self.session)
+    def __init__(self, token, base_url=None):
+        self.token = token
+        self.base_url = base_url  # None for lichess.org, or e.g. a fake_lichess server
+        self.session = None
+        self._client = None
+        self._client_lock = threading.Lock()
         self.game_id = None
-        self.stream = None
         self._user_id = None
+        self.connected = False
+        self.max_move_attempts = 5
+        self.move_latency = LatencyHistogram()
+        self._accepted_moves = {}  # game_id -> {ply: uci}, until forget_game
+        self.pool_size = 16  # HTTP connections kept per host
+        self._ssl_context = None
+
+    @property
+    def client(self):
+        """berserk client, imported and created on first use."""
+        with self._client_lock:
+            if self._client is None:
+                import berserk
+                from requests.adapters import HTTPAdapter
+                self.session = berserk.TokenSession(self.token)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                self.session.mount("https://", adapter)
+                self.session.mount("http://", adapter)
+                self._client = berserk.Client(self.session, base_url=self.base_url)
+            return self._client
+
+    def connect(self):
+        """
+        Authenticate against Lichess. Blocks on the network, so call it off
+        the GUI thread. Returns True when the account could be fetched.
+        """
         self._fetch_account_info()
+        self.connected = self._user_id is not None
+        return self.connected
 
     def _fetch_account_info(self):
         """Fetch and store the user's account information."""
@@ -29,70 +94,111 @@ class LichessHandler:
         """Get the authenticated user's ID."""
         return self._user_id
 
-    def create_bot_game(self, bot_username, time_control='5+0', rated=False):
+    def create_bot_game(self, bot_username, time_control='5+0', rated=False, level=3):
+        """Start a game against the Lichess AI (Stockfish) at ``level`` 1-8."""
         clock_limit, clock_increment = self.parse_time_control(time_control)
-        logging.debug(f"Creating bot game with {bot_username}, time control: {time_control}, rated: {rated}")
+        logging.debug(f"Creating bot game with {bot_username}, time control: {time_control}, rated: {rated}, level: {level}")
         response = self.client.challenges.create_ai(
-            level=3, clock_limit=clock_limit, clock_increment=clock_increment
+            level=level, clock_limit=clock_limit, clock_increment=clock_increment
         )
         self.game_id = response['id']
         logging.debug(f"Created bot game with ID: {self.game_id}")
-        # Retry mechanism to ensure the game is fully created
-        for attempt in range(5):
-            try:
-                logging.debug(f"Attempting to stream game state for game ID: {self.game_id}, attempt: {attempt + 1}")
-                self.stream = self.client.bots.stream_game_state(self.game_id)
-                logging.debug(f"Successfully started streaming game state for game ID: {self.game_id}")
-                break
-            except berserk.exceptions.ResponseError as e:
-                logging.error(f"Failed to stream game state for game ID: {self.game_id} - {e}")
-                time.sleep(1)
         return self.game_id
 
-    def make_move_bot(self, move):
-        if self.game_id:
-            move_uci = move.uci() if isinstance(move, chess.Move) else str(move)
-            
-            for attempt in range(5):
-                try:
-                    logging.debug(f"Attempting move: {move_uci} in game {self.game_id} (attempt {attempt+1}/5)")
-                    start_time = time.time()
-                    self.client.bots.make_move(self.game_id, move_uci)
-                    latency = int((time.time() - start_time) * 1000)
-                    logging.debug(f"Successfully made move {move_uci} in {latency}ms")
-                    return True
-                except berserk.exceptions.ResponseError as e:
-                    error_details = {
-                        'status_code': e.status_code,
-                        'message': str(e),
-                        'response': getattr(e, 'response', None),
-                        'attempt': attempt+1,
-                        'game_id': self.game_id,
-                        'move': move_uci
-                    }
-                    logging.error("Move failed:\n" + "\n".join(
-                        f"{k}: {v}" for k,v in error_details.items()
-                    ))
-                    logging.debug("Full traceback:\n%s", traceback.format_exc())
-                    if attempt < 4:  # Don't sleep on last attempt
-                        time.sleep(1)
-            
-            logging.error(f"Permanently failed to make move {move_uci} after 5 attempts")
-            return False
-        else:
+    def open_game_stream(self, game_id):
+        """Async event iterator for one game; the request is made on first iteration."""
+        return self._stream(f"/api/bot/game/stream/{game_id}")
+
+    def stream_incoming_events(self):
+        """Async account-wide event iterator (gameStart, gameFinish, challenges)."""
+        return self._stream("/api/stream/event")
+
+    async def _stream(self, path):
+        """
+        Events of an ndjson stream, read on the caller's event loop.  Each
+        stream holds its own connection, outside the berserk session, so
+        any number of them can be read by one thread.
+        """
+        url = urlsplit((self.base_url or LICHESS_URL).rstrip("/") + path)
+        secure = url.scheme == "https"
+        if secure and self._ssl_context is None:
+            import ssl
+            import certifi
+            self._ssl_context = ssl.create_default_context(cafile=certifi.where())
+        reader, writer = await asyncio.open_connection(url.hostname, url.port or (443 if secure else 80),
+                                                       ssl=self._ssl_context if secure else None)
+        try:
+            writer.write((f"GET {url.path} HTTP/1.1\r\nHost: {url.netloc}\r\n"
+                          f"Authorization: Bearer {self.token}\r\nAccept: application/x-ndjson\r\n"
+                          f"Connection: close\r\n\r\n").encode())
+            await writer.drain()
+            status = (await reader.readline()).decode("latin-1").split(None, 2)  # HTTP/1.1 200 OK
+            code = int(status[1]) if len(status) > 1 and status[1].isdigit() else 0
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip().lower()
+            if not 200 <= code < 300:
+                raise StreamError(code, status[2].strip() if len(status) > 2 else "")
+            async for line in _read_lines(reader, headers.get("transfer-encoding") == "chunked"):
+                if line.strip():  # Lichess sends empty lines as keep-alives
+                    yield json.loads(line)
+        finally:
+            writer.close()
+
+    def make_move_bot(self, move, game_id=None, ply=None):
+        """
+        Send a move and return True once Lichess accepted it.
+
+        Transient failures are retried with exponential backoff and jitter;
+        a rejected move returns False straight away.  With ``ply`` given, a
+        resend of a move that was already accepted for that ply is skipped.
+        """
+        game_id = game_id or self.game_id
+        if not game_id:
             logging.error("No active game ID - cannot make move")
             return False
+        move_uci = move.uci() if isinstance(move, chess.Move) else str(move)
+        accepted = self._accepted_moves.get(game_id, {})
+        if ply is not None and accepted.get(ply) == move_uci:
+            logging.debug(f"Move {move_uci} for ply {ply} already accepted, not resending")
+            return True
+
+        delays = backoff_delays(self.max_move_attempts)
+        for attempt in range(1, self.max_move_attempts + 1):
+            logging.debug(f"Attempting move: {move_uci} in game {game_id} (attempt {attempt}/{self.max_move_attempts})")
+            start_time = time.monotonic()
+            try:
+                self.client.bots.make_move(game_id, move_uci)
+            except Exception as e:
+                transient = is_transient(e)
+                logging.error(f"Move {move_uci} failed in game {game_id} "
+                              f"(status {getattr(e, 'status_code', None)}, "
+                              f"{'transient' if transient else 'rejected'}): {e}")
+                logging.debug("Full traceback:\n%s", traceback.format_exc())
+                if not transient:
+                    return False
+                delay = next(delays, None)
+                if delay is None:
+                    break
+                time.sleep(delay)
+                continue
+            latency = (time.monotonic() - start_time) * 1000
+            self.move_latency.record(latency)
+            if ply is not None:
+                self._accepted_moves.setdefault(game_id, {})[ply] = move_uci
+            logging.debug(f"Successfully made move {move_uci} in {latency:.0f}ms")
+            return True
 
-    def get_game_state(self):
-        if self.stream:
-            for event in self.stream:
-                if event['type'] == 'gameFull':
-                    logging.debug(f"Received gameFull event for game ID: {self.game_id}")
-                    return event['state']
-                elif event['type'] == 'gameState':
-                    logging.debug(f"Received gameState event for game ID: {self.game_id}")
-                    return event
-        return None
+        logging.error(f"Permanently failed to make move {move_uci} after {self.max_move_attempts} attempts")
+        return False
+
+    def forget_game(self, game_id):
+        """Drop the accepted moves of a finished game; none of them will be resent."""
+        self._accepted_moves.pop(game_id, None)
 
     def fetch_daily_puzzle(self):
         puzzle = self.client.puzzles.get_daily()
@@ -103,18 +209,21 @@ class LichessHandler:
         minutes, increment = map(int, time_control.split('+'))
         return minutes * 60, increment
 
+    def stream_online_bots(self, limit=None):
+        """Online bots (user dicts with perfs), read line by line as Lichess sends them."""
+        return self.client.bots.get_online_bots(limit)
+
     def get_online_bots(self):
         try:
-            online_bots = self.client.bots.online()
-            return [bot['username'] for bot in online_bots]
+            return [bot['username'] for bot in self.stream_online_bots()]
         except Exception as e:
             logging.error(f"Failed to get online bots: {e}")
             return []
 
     def get_next_puzzle(self):
         try:
-            # Correct method for /api/puzzle/next endpoint
-            return self.client.puzzles.get_daily()
+            # /api/puzzle/next; when authenticated Lichess skips puzzles already seen
+            return self.client.puzzles.get_next()
         except Exception as e:
             logging.error(f"Failed to fetch next puzzle: {e}")
             return None
@@ -131,27 +240,4 @@ class LichessHandler:
         )
         self.game_id = response['id']
         logging.debug(f"Challenge created with game ID: {self.game_id}")
-        # Attempt to start streaming game state
-        for attempt in range(5):
-            try:
-                logging.debug(f"Attempting to stream game state for game ID: {self.game_id}, attempt: {attempt + 1}")
-                self.stream = self.client.bots.stream_game_state(self.game_id)
-                logging.debug(f"Successfully started streaming game state for game ID: {self.game_id}")
-                break
-            except Exception as e:
-                logging.error(f"Error streaming game state for game ID: {self.game_id} - {e}")
-                time.sleep(1)
         return self.game_id
-
-    def run_game_stream(self, callback):
-        """
-        Launch a background thread that continuously reads events from the game stream
-        and passes each event to the provided callback.
-        """
-        import threading
-        def stream_loop():
-            for event in self.stream:
-                logging.debug(f"Game event received: {event}")
-                callback(event)
-        t = threading.Thread(target=stream_loop, daemon=True)
-        t.start()
@@ -0,0 +1,109 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+import itertools
+import logging
+import queue
+import threading
+import chess
+
+# Request priorities, lower runs first; equal priorities run in submission order
+MOVE = 0
+CONNECT = 1
+CHALLENGE = 2
+PUZZLE = 3
+PREFETCH = 4  # background puzzle refills, behind everything the user waits for
+STOP = 99
+
+class LichessWorker(QObject):
+    """
+    One long-lived thread for all Lichess I/O.
+
+    Requests are queued with a priority and executed one at a time by the
+    thread, which is the only user of the handler's berserk session; the
+    event streams are read on their own connections by the StreamManager.
+    Moves jump ahead of challenges and puzzle fetches but keep their own
+    order.
+    Results are delivered through signals, which Qt queues to the GUI thread.
+    """
+    connected = pyqtSignal(bool)
+    moveSent = pyqtSignal(str, int, bool)  # uci, ply (-1 if unknown), accepted by Lichess
+    gameCreated = pyqtSignal(object)  # game id, or None on failure
+    puzzleLoaded = pyqtSignal(object)  # puzzle dict, or None on failure
+    failed = pyqtSignal(str)  # error message of a request that raised
+
+    def __init__(self, handler, parent=None, puzzles=None):
+        super().__init__(parent)
+        self.handler = handler
+        self.puzzles = puzzles  # optional PuzzleProvider
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            # Daemon thread: a hanging HTTP call must not keep the app alive on exit
+            self._thread = threading.Thread(target=self._run, name="lichess-io", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Finish the queued requests, then end the thread."""
+        self.submit(STOP, None)
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def submit(self, priority, call, done=None):
+        """Queue ``call()``; ``done`` receives its result (None if it raised)."""
+        self._queue.put((priority, next(self._sequence), call, done))
+
+    def connect_account(self):
+        self.submit(CONNECT, self.handler.connect, self.connected.emit)
+
+    def send_move(self, move, game_id=None, ply=None):
+        uci = move.uci() if isinstance(move, chess.Move) else str(move)
+        # Bind the game now so a move can never land in a newer game
+        game_id = game_id or self.handler.game_id
+        self.submit(MOVE, lambda: self.handler.make_move_bot(uci, game_id, ply),
+                    lambda ok: self.moveSent.emit(uci, -1 if ply is None else ply, bool(ok)))
+
+    def create_bot_game(self, bot_username, time_control='5+0', rated=False, level=3):
+        self.submit(CHALLENGE, lambda: self.handler.create_bot_game(bot_username, time_control, rated, level),
+                    self.gameCreated.emit)
+
+    def challenge_bot(self, bot_username, time_control='5+0', rated=False):
+        """Challenge a Lichess bot account; the game starts once it accepts."""
+        self.submit(CHALLENGE, lambda: self.handler.challenge_bot(bot_username, time_control, rated),
+                    self.gameCreated.emit)
+
+    def fetch_puzzle(self, daily=False):
+        if self.puzzles is None:
+            call = self.handler.fetch_daily_puzzle if daily else self.handler.get_next_puzzle
+            self.submit(PUZZLE, call, self.puzzleLoaded.emit)
+        elif daily:
+            self.submit(PUZZLE, self.puzzles.daily, self.puzzleLoaded.emit)
+        else:
+            puzzle = self.puzzles.take()
+            if puzzle is not None:
+                # Served from the store without a round trip
+                self.puzzleLoaded.emit(puzzle)
+            else:
+                self.submit(PUZZLE, self.puzzles.fetch, self.puzzleLoaded.emit)
+            self.prefetch_puzzles()
+
+    def prefetch_puzzles(self):
+        """Top up the puzzle store once nothing more urgent is queued."""
+        if self.puzzles is not None:
+            self.submit(PREFETCH, self.puzzles.refill)
+
+    def _run(self):
+        while True:
+            priority, _, call, done = self._queue.get()
+            if priority == STOP:
+                break
+            try:
+                result = call()
+            except Exception as e:
+                logging.error(f"Lichess request failed: {e}")
+                self.failed.emit(str(e))
+                result = None
+            if done is not None:
+                done(result)
@@ -0,0 +1,125 @@
+import chess
+import chess.polyglot
+import analysis_cache
+
+class MoveIndex:
+    """
+    Legal moves of a single position, grouped by origin square.
+
+    Built once per position so that highlighting and click validation are
+    dictionary lookups instead of walks over ``board.legal_moves``.
+    Promotions are kept as separate moves for the same (from, to) pair.
+    """
+
+    def __init__(self, board):
+        self._moves = {}  # (from_square, to_square) -> [chess.Move, ...]
+        self._targets = {}  # from_square -> set of to_squares
+        for move in board.legal_moves:
+            self._moves.setdefault((move.from_square, move.to_square), []).append(move)
+            self._targets.setdefault(move.from_square, set()).add(move.to_square)
+
+    def destinations(self, from_square):
+        return self._targets.get(from_square, set())
+
+    def has_moves_from(self, from_square):
+        return from_square in self._targets
+
+    def moves_between(self, from_square, to_square):
+        """All legal moves from one square to another (several for promotions)."""
+        return self._moves.get((from_square, to_square), [])
+
+    def promotions(self, from_square, to_square):
+        return [move.promotion for move in self.moves_between(from_square, to_square) if move.promotion]
+
+    def is_legal(self, move):
+        return move in self._moves.get((move.from_square, move.to_square), ())
+
+    def __len__(self):
+        return sum(len(moves) for moves in self._moves.values())
+
+
+class IndexedBoard(chess.Board):
+    """
+    chess.Board that caches a MoveIndex for its current position.
+
+    The index and the position's Zobrist hash are dropped on every method
+    that changes the position (push, pop, set_fen, ...) and looked up again
+    lazily; indexes are shared through ``analysis_cache.shared``, so going
+    back to an earlier position does not rebuild its index.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._move_index = None
+        self._zobrist = None
+        super().__init__(*args, **kwargs)
+
+    @classmethod
+    def from_board(cls, board):
+        """Copy a plain chess.Board, including its move stack."""
+        indexed = cls(board.root().fen(), chess960=board.chess960)
+        for move in board.move_stack:
+            indexed.push(move)
+        return indexed
+
+    @property
+    def zobrist(self):
+        if self._zobrist is None:
+            self._zobrist = chess.polyglot.zobrist_hash(self)
+        return self._zobrist
+
+    @property
+    def move_index(self):
+        if self._move_index is None:
+            self._move_index = analysis_cache.shared.get_or_compute(self, "moves", MoveIndex)
+        return self._move_index
+
+    def _invalidate(self):
+        self._move_index = None
+        self._zobrist = None
+
+    def push(self, move):
+        self._invalidate()
+        super().push(move)
+
+    def pop(self):
+        self._invalidate()
+        return super().pop()
+
+    def reset(self):
+        self._invalidate()
+        super().reset()
+
+    def clear(self):
+        self._invalidate()
+        super().clear()
+
+    def set_fen(self, fen):
+        self._invalidate()
+        super().set_fen(fen)
+
+    def set_board_fen(self, fen):
+        self._invalidate()
+        super().set_board_fen(fen)
+
+    def set_piece_map(self, pieces):
+        self._invalidate()
+        super().set_piece_map(pieces)
+
+    def set_piece_at(self, square, piece, promoted=False):
+        self._invalidate()
+        super().set_piece_at(square, piece, promoted)
+
+    def remove_piece_at(self, square):
+        self._invalidate()
+        return super().remove_piece_at(square)
+
+    def set_castling_fen(self, castling_fen):
+        self._invalidate()
+        super().set_castling_fen(castling_fen)
+
+
+def index_for(board):
+    """Return the MoveIndex of ``board``, cached when it is an IndexedBoard."""
+    if isinstance(board, IndexedBoard):
+        return board.move_index
+    return MoveIndex(board)
@@ -0,0 +1,69 @@
+"""
+Helpers for sending moves to Lichess.
+
+Moves are applied on the local board straight away and confirmed by the
+server afterwards.  Only transient failures (rate limiting, server errors,
+dropped connections) are retried, with exponential backoff and full
+jitter; a rejected move (illegal, game over) fails at once so the board
+can be rolled back.
+"""
+import bisect
+import random
+
+# HTTP statuses worth retrying; any other 4xx means the move can never succeed
+TRANSIENT_STATUS_CODES = {408, 425, 429}
+
+def is_transient(error):
+    """True if a failed request may succeed when retried."""
+    status = getattr(error, 'status_code', None)
+    if status is not None:
+        return status in TRANSIENT_STATUS_CODES or status >= 500
+    # requests' connection errors and timeouts derive from OSError; berserk
+    # wraps the ones raised while sending a request in ApiError(error)
+    return isinstance(error, OSError) or isinstance(getattr(error, 'error', None), OSError)
+
+def backoff_delays(attempts, base=0.25, cap=4.0, rng=random):
+    """Sleep before each retry: uniform in [0, min(cap, base * 2**n)]."""
+    for n in range(attempts - 1):
+        yield rng.uniform(0, min(cap, base * 2 ** n))
+
+class LatencyHistogram:
+    """Round-trip times in milliseconds, counted into fixed buckets."""
+
+    def __init__(self, bounds=(50, 100, 200, 500, 1000, 2000, 5000)):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last bucket is overflow
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms):
+        self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+        self.total += 1
+        self.sum_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def mean(self):
+        return self.sum_ms / self.total if self.total else 0.0
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile (0-100)."""
+        if not self.total:
+            return 0.0
+        rank = p / 100 * self.total
+        seen = 0
+        for bound, count in zip(self.bounds + [self.max_ms], self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def summary(self):
+        buckets = []
+        lower = 0
+        for bound, count in zip(self.bounds, self.counts):
+            buckets.append(f"<{bound}ms: {count}")
+            lower = bound
+        buckets.append(f">={lower}ms: {self.counts[-1]}")
+        return (f"{self.total} moves, mean {self.mean():.0f}ms, p50 {self.percentile(50):.0f}ms, "
+                f"p95 {self.percentile(95):.0f}ms ({', '.join(buckets)})")
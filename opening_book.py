@@ -0,0 +1,164 @@
+"""
+Polyglot opening books and opening names.
+
+A Polyglot book (.bin) is a file of 16-byte entries sorted by Zobrist
+key.  ``OpeningBook`` memory-maps it (chess.polyglot.MemoryMappedReader),
+so a probe is a binary search over the mapping: it touches a handful of
+pages and the book takes no heap memory, however large it is.
+
+Opening names come from the Lichess chess-openings TSV files (columns
+eco, name, pgn; https://github.com/lichess-org/chess-openings).  Running
+
+    python3 opening_book.py a.tsv b.tsv c.tsv d.tsv e.tsv
+
+replays every line once and writes a Zobrist key -> (ECO, name) index to
+``~/.cache/szaszki-chess/openings.json``, which ``OpeningNames`` loads
+without replaying anything.  A position is named after the deepest
+position of its game that has a name, so transpositions into a known
+line are named too.
+"""
+import csv
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import chess
+import chess.polyglot
+from analysis_cache import position_key
+from puzzle_provider import CACHE_DIR
+
+BOOK_FILE = os.path.join(CACHE_DIR, "book.bin")
+NAMES_FILE = os.path.join(CACHE_DIR, "openings.json")
+MAX_NAMED_PLY = 40  # no named line in the Lichess files is longer
+
+class OpeningBook:
+    """A memory-mapped Polyglot book; thread-safe for lookups."""
+
+    def __init__(self, path=BOOK_FILE):
+        self.path = path
+        self._reader = chess.polyglot.open_reader(path)
+
+    @classmethod
+    def open_if_present(cls, path=BOOK_FILE):
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            return cls(path)
+        except (OSError, ValueError) as e:
+            logging.error(f"Could not open opening book {path}: {e}")
+            return None
+
+    def __len__(self):
+        return len(self._reader)
+
+    def moves(self, board):
+        """Legal book moves of ``board`` with their weights, best first."""
+        entries = sorted(self._reader.find_all(board), key=lambda entry: entry.weight, reverse=True)
+        return [(entry.move, entry.weight) for entry in entries]
+
+    def choose(self, board, rng=random):
+        """A book move picked with probability proportional to its weight, or None."""
+        try:
+            return self._reader.weighted_choice(board, random=rng).move
+        except IndexError:
+            return None
+
+    def close(self):
+        self._reader.close()
+
+def _replay(pgn):
+    """Board after the moves of "1. e4 e5 2. Nf3"; raises ValueError on an illegal move."""
+    board = chess.Board()
+    for token in pgn.split():
+        if not token[0].isdigit():  # skip move numbers
+            board.push_san(token)
+    return board
+
+def read_openings(lines):
+    """``(key, eco, name)`` for each row of a chess-openings TSV file."""
+    for row in csv.DictReader(lines, delimiter="\t"):
+        try:
+            # Newer releases carry the position; older ones only the moves
+            board = chess.Board(row['epd']) if row.get('epd') else _replay(row['pgn'])
+        except (KeyError, ValueError) as e:
+            logging.debug(f"Skipping opening {row.get('name')}: {e}")
+            continue
+        yield chess.polyglot.zobrist_hash(board), row['eco'], row['name']
+
+class OpeningNames:
+    """Zobrist key -> (ECO code, name)."""
+
+    def __init__(self, names=None):
+        self._names = names or {}
+
+    @classmethod
+    def from_tsv(cls, paths):
+        names = {}
+        for path in paths:
+            with open(path, newline="") as f:
+                for key, eco, name in read_openings(f):
+                    # The first (most common) name of a position wins
+                    names.setdefault(key, (eco, name))
+        return cls(names)
+
+    @classmethod
+    def open_if_present(cls, path=NAMES_FILE):
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.debug(f"No opening names loaded from {path}: {e}")
+            return None
+        return cls({int(key, 16): tuple(value) for key, value in data.items()})
+
+    def save(self, path=NAMES_FILE):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp = path + ".tmp"
+        with open(temp, 'w') as f:
+            json.dump({f"{key:016x}": list(value) for key, value in self._names.items()}, f)
+        os.replace(temp, path)
+
+    def __len__(self):
+        return len(self._names)
+
+    def lookup(self, board):
+        """``(eco, name)`` of exactly this position, or None."""
+        return self._names.get(position_key(board))
+
+    def name(self, board):
+        """``(eco, name)`` of the deepest named position the game went through, or None."""
+        if not self._names:
+            return None
+        board = board.copy()
+        while len(board.move_stack) > MAX_NAMED_PLY:
+            board.pop()
+        while True:
+            found = self._names.get(chess.polyglot.zobrist_hash(board))
+            if found is not None or not board.move_stack:
+                return found
+            board.pop()
+
+_names = None
+_names_lock = threading.Lock()
+
+def opening_names(path=NAMES_FILE):
+    """The imported ``OpeningNames``, loaded on first use (empty if not imported)."""
+    global _names
+    with _names_lock:
+        if _names is None:
+            _names = OpeningNames.open_if_present(path) or OpeningNames()
+        return _names
+
+def main():
+    if len(sys.argv) < 2:
+        print(f"Usage: {sys.argv[0]} a.tsv [b.tsv ...]")
+        return 1
+    names = OpeningNames.from_tsv(sys.argv[1:])
+    names.save()
+    print(f"Indexed {len(names)} opening positions into {NAMES_FILE}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+from PyQt6.QtGui import QPixmap
+from PyQt6.QtCore import Qt
+import os
+import logging
+
+PIECE_NAMES = {
+    'p': 'pawn', 'r': 'rook', 'n': 'knight', 'b': 'bishop', 'q': 'queen', 'k': 'king',
+    'P': 'pawn', 'R': 'rook', 'N': 'knight', 'B': 'bishop', 'Q': 'queen', 'K': 'king'
+}
+
+class PieceAtlas:
+    """
+    Piece sprites pre-scaled to the current square size and device pixel ratio.
+
+    The full-resolution PNGs are loaded once per process.  Sprites are only
+    rebuilt when the (square size, device pixel ratio) key changes, so a paint
+    costs one unscaled blit per piece.
+    """
+    _sources = None
+
+    def __init__(self):
+        self.key = None
+        self.sprites = {}
+        self.rebuild_count = 0
+
+    @classmethod
+    def load_sources(cls):
+        if cls._sources is None:
+            current_dir = os.path.dirname(os.path.abspath(__file__))
+            pieces_dir = os.path.join(current_dir, "pieces")
+            cls._sources = {}
+            for piece, name in PIECE_NAMES.items():
+                color = 'white' if piece.isupper() else 'black'
+                piece_path = os.path.join(pieces_dir, f"{color}-{name}.png")
+                pixmap = QPixmap(piece_path)
+                if pixmap.isNull():
+                    print(f"Failed to load piece image: {piece_path}")
+                cls._sources[piece] = pixmap
+        return cls._sources
+
+    def ensure(self, square_size, device_pixel_ratio=1.0):
+        """Rebuild the sprites if the size or pixel ratio changed. Returns True on rebuild."""
+        key = (square_size, device_pixel_ratio)
+        if key == self.key:
+            return False
+        self.rebuild(square_size, device_pixel_ratio)
+        return True
+
+    def rebuild(self, square_size, device_pixel_ratio=1.0):
+        self.key = (square_size, device_pixel_ratio)
+        self.sprites = {}
+        pixel_size = max(1, round(square_size * device_pixel_ratio))
+        for symbol, source in self.load_sources().items():
+            self.sprites[symbol] = self._scaled(source, pixel_size, device_pixel_ratio)
+        self.rebuild_count += 1
+        logging.debug(f"Piece atlas rebuilt for square size {square_size} @ {device_pixel_ratio}x")
+
+    def sprite(self, piece):
+        return self.sprites.get(piece.symbol())
+
+    def _scaled(self, source, pixel_size, device_pixel_ratio):
+        if source.isNull():
+            sprite = QPixmap(pixel_size, pixel_size)
+            sprite.fill(Qt.GlobalColor.transparent)
+        else:
+            sprite = source.scaled(pixel_size, pixel_size,
+                                   Qt.AspectRatioMode.IgnoreAspectRatio,
+                                   Qt.TransformationMode.SmoothTransformation)
+        sprite.setDevicePixelRatio(device_pixel_ratio)
+        return sprite
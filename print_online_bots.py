@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import sys
 import berserk
+from bot_directory import describe
 from config import lichess_token
 
 def print_online_bots(api_token: str, limit: int | None = None) -> None:
@@ -8,6 +9,9 @@ def print_online_bots(api_token: str, limit: int | None = None) -> None:
     Print available bots (online) to the terminal using Lichess Bot Online API.
     This calls the /api/bot/online endpoint via the berserk client.
 
+    Bots are printed as the NDJSON stream delivers them, so the first lines
+    appear before the whole list has been downloaded.
+
     :param api_token: Your Lichess API token.
     :param limit: Optional limit for the number of bots (parameter 'nb').
     """
@@ -15,24 +19,17 @@ def print_online_bots(api_token: str, limit: int | None = None) -> None:
     session = berserk.TokenSession(api_token)
     client = berserk.Client(session=session)
 
-    # Get the online bots (each bot is returned as a dict with user details)
-    online_bots = client.bots.get_online_bots(limit)
-
-    # Convert the iterator into a list so we can check if there are any bots
-    online_bots = list(online_bots)
-    if not online_bots:
+    # Each bot is returned as a dict with user details, including its ratings
+    count = 0
+    for bot in client.bots.get_online_bots(limit):
+        if not count:
+            print("Online Bots:")
+        count += 1
+        print(f" - {describe(bot)}", flush=True)
+    if not count:
         print("No bots online.")
-        return
-
-    print("Online Bots:")
-    for bot in online_bots:
-        # Assuming the bot data has keys: id, username, and possibly title.
-        bot_id = bot.get("id", "N/A")
-        username = bot.get("username", bot_id)
-        title = bot.get("title", "")
-        print(f" - {username} (ID: {bot_id}) {('- ' + title) if title else ''}")
 
 if __name__ == "__main__":
     token = lichess_token
 
-    print_online_bots(token)
\ No newline at end of file
+    print_online_bots(token, int(sys.argv[1]) if len(sys.argv) > 1 else None)
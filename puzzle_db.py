@@ -0,0 +1,225 @@
+"""
+Offline puzzle database built from the public Lichess puzzle dump.
+
+The dump (https://database.lichess.org/#puzzles) is a CSV with one puzzle
+per row::
+
+    PuzzleId,FEN,Moves,Rating,RatingDeviation,Popularity,NbPlays,Themes,GameUrl,OpeningTags
+
+``import_csv`` streams it into SQLite in fixed-size batches, so memory use
+does not grow with the number of rows, and builds the indexes once at the
+end.  Puzzles are looked up through B-tree indexes on (rating, popularity)
+and (theme, rating), so ``PuzzleDatabase.pick`` reads a handful of rows
+however large the file is.  Run this file to import a dump::
+
+    python3 puzzle_db.py lichess_db_puzzle.csv.zst
+    zstdcat lichess_db_puzzle.csv.zst | python3 puzzle_db.py -
+"""
+import bz2
+import csv
+import gzip
+import io
+import itertools
+import logging
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+import chess
+from puzzle_provider import CACHE_DIR
+
+DB_FILE = os.path.join(CACHE_DIR, "puzzles.sqlite")
+BATCH_SIZE = 10000
+
+SCHEMA = """
+CREATE TABLE puzzles (
+    id TEXT PRIMARY KEY,
+    fen TEXT NOT NULL,
+    moves TEXT NOT NULL,
+    rating INTEGER NOT NULL,
+    popularity INTEGER NOT NULL,
+    plays INTEGER NOT NULL,
+    themes TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE puzzle_themes (
+    theme TEXT NOT NULL,
+    rating INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    PRIMARY KEY (theme, rating, id)
+) WITHOUT ROWID;
+"""
+INDEXES = """
+CREATE INDEX puzzles_rating ON puzzles (rating, popularity);
+"""
+
+def open_dump(path):
+    """Text stream over a plain, gzip, bzip2 or zstd compressed CSV ('-' for stdin)."""
+    if path == "-":
+        return io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rt", encoding="utf-8", newline="")
+    if path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("Reading .zst needs the zstandard package; "
+                               "alternatively pipe the dump through zstdcat and import '-'")
+        raw = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        return io.TextIOWrapper(raw, encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+def parse_rows(lines):
+    """Yield (id, fen, moves, rating, popularity, plays, themes) tuples from CSV lines."""
+    reader = csv.reader(lines)
+    for row in reader:
+        if not row or row[0] == "PuzzleId":
+            continue
+        try:
+            yield (row[0], row[1], row[2], int(row[3]), int(row[5]), int(row[6]), row[7])
+        except (IndexError, ValueError):
+            logging.debug(f"Skipping malformed puzzle row {reader.line_num}")
+
+def import_csv(lines, db_path=DB_FILE, batch_size=BATCH_SIZE, progress=None):
+    """
+    Build a fresh database at ``db_path`` from the dump's CSV ``lines``.
+
+    The database is written next to ``db_path`` and moved into place when
+    complete, so an interrupted import leaves the previous one intact.
+    ``progress(count)`` is called after every batch.  Returns the number of
+    puzzles imported.
+    """
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    temp = db_path + ".importing"
+    if os.path.exists(temp):
+        os.remove(temp)
+    conn = sqlite3.connect(temp)
+    try:
+        # Nothing to protect until the file is moved into place
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.executescript(SCHEMA)
+        rows = parse_rows(lines)
+        count = 0
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                break
+            conn.executemany("INSERT OR REPLACE INTO puzzles VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+            conn.executemany("INSERT OR IGNORE INTO puzzle_themes VALUES (?, ?, ?)",
+                             [(theme, row[3], row[0]) for row in batch for theme in row[6].split()])
+            conn.commit()
+            count += len(batch)
+            if progress:
+                progress(count)
+        conn.executescript(INDEXES)
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(temp, db_path)
+    return count
+
+def to_puzzle(row):
+    """
+    Convert a database row to the shape of a Lichess API puzzle.
+
+    In the dump the FEN is the position before the opponent's last move,
+    which is the first of ``Moves``; the remaining moves are the solution.
+    """
+    pid, fen, moves, rating, popularity, plays, themes = row
+    moves = moves.split()
+    board = chess.Board(fen)
+    board.push_uci(moves[0])
+    return {
+        'game': {'id': None, 'fen': board.fen(), 'lastMove': moves[0]},
+        'puzzle': {
+            'id': pid,
+            'rating': rating,
+            'popularity': popularity,
+            'plays': plays,
+            'solution': moves[1:],
+            'themes': themes.split(),
+        },
+    }
+
+class PuzzleDatabase:
+    """
+    Read access to an imported puzzle database.  One connection is shared
+    between threads behind a lock; lookups are index seeks and take well
+    under a millisecond.
+    """
+
+    def __init__(self, db_path=DB_FILE):
+        self.path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+
+    @classmethod
+    def open_if_present(cls, db_path=DB_FILE):
+        if not os.path.exists(db_path):
+            return None
+        try:
+            return cls(db_path)
+        except sqlite3.Error as e:
+            logging.error(f"Could not open puzzle database {db_path}: {e}")
+            return None
+
+    def close(self):
+        self._conn.close()
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM puzzles").fetchone()[0]
+
+    def get(self, pid):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM puzzles WHERE id = ?", (pid,)).fetchone()
+        return to_puzzle(row) if row else None
+
+    def pick(self, rating, band=100, theme=None, min_popularity=0, skip=None, rng=random, batch=20):
+        """
+        A random puzzle rated within ``rating`` +- ``band``, optionally with
+        ``theme``.  ``skip(puzzle_id)`` rejects puzzles (e.g. ones already
+        played).  Each attempt seeks to a random rating in the band and
+        reads at most ``batch`` rows from there.  Returns None if nothing
+        matches.
+        """
+        low, high = rating - band, rating + band
+        if theme:
+            query = ("SELECT p.* FROM puzzle_themes t JOIN puzzles p ON p.id = t.id "
+                     "WHERE t.theme = ? AND t.rating >= ? AND t.rating <= ? AND p.popularity >= ? "
+                     "ORDER BY t.rating LIMIT ?")
+        else:
+            query = ("SELECT * FROM puzzles WHERE rating >= ? AND rating <= ? AND popularity >= ? "
+                     "ORDER BY rating LIMIT ?")
+        # The first seek starts anywhere in the band, the second from its bottom
+        for start in (rng.randint(low, high), low):
+            params = (start, high, min_popularity, batch)
+            with self._lock:
+                rows = self._conn.execute(query, ((theme,) + params) if theme else params).fetchall()
+            for row in rows:
+                if skip is None or not skip(row[0]):
+                    return to_puzzle(row)
+        return None
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) < 2:
+        sys.exit(f"usage: {sys.argv[0]} <lichess_db_puzzle.csv[.zst|.gz|.bz2] | -> [database]")
+    db_path = sys.argv[2] if len(sys.argv) > 2 else DB_FILE
+    started = time.monotonic()
+
+    def progress(count):
+        if count % 500000 < BATCH_SIZE:
+            logging.info(f"{count} puzzles imported")
+
+    with open_dump(sys.argv[1]) as lines:
+        count = import_csv(lines, db_path, progress=progress)
+    logging.info(f"Imported {count} puzzles into {db_path} in {time.monotonic() - started:.0f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Puzzle position and solution parsing, cached by puzzle id.
+
+A Lichess puzzle names its position as the source game's PGN plus
+``initialPly``.  The API sends the PGN as bare SAN moves ("e4 e5 Nf3 ..."),
+so the position is built by pushing the first ``initialPly + 1`` moves on
+a plain board, without the PGN tokenizer and game tree.  Anything that
+does not look like bare SAN (headers, comments, variations) goes through
+chess.pgn instead.  Puzzles from the offline database carry a FEN and need
+no replay at all.
+
+Parsed puzzles are kept in a small LRU keyed by puzzle id, and
+``PuzzleProvider`` parses prefetched puzzles on the Lichess worker, so
+showing a puzzle only costs building a board from a FEN.
+"""
+import io
+import re
+import threading
+from collections import OrderedDict, namedtuple
+import chess
+from move_index import IndexedBoard
+
+# Puzzle id, position to solve (FEN), solution moves, rating
+ParsedPuzzle = namedtuple("ParsedPuzzle", ["id", "fen", "solution", "rating"])
+
+MOVE_NUMBER = re.compile(r"^\d+\.+$")
+RESULTS = {"1-0", "0-1", "1/2-1/2", "*"}
+CACHE_SIZE = 64
+
+def _san_moves(pgn):
+    """The SAN moves of a bare movetext, or None if it needs the full PGN parser."""
+    if any(c in pgn for c in "[{(;$"):
+        return None
+    return [token for token in pgn.split() if not MOVE_NUMBER.match(token) and token not in RESULTS]
+
+def position_from_pgn(pgn, initial_ply=None):
+    """Board after ``initial_ply + 1`` moves of ``pgn`` (after all moves if None)."""
+    sans = _san_moves(pgn)
+    if sans is not None:
+        if initial_ply is not None:
+            sans = sans[:initial_ply + 1]
+        board = chess.Board()
+        try:
+            for san in sans:
+                board.push_san(san)
+            return board
+        except ValueError:
+            pass
+    import chess.pgn as chess_pgn  # only needed on the slow path
+    game = chess_pgn.read_game(io.StringIO(pgn))
+    node = game
+    while node.variations and (initial_ply is None or node.ply() <= initial_ply):
+        node = node.variations[0]
+    return node.board()
+
+def parse_puzzle(puzzle):
+    """Turn a Lichess API (or puzzle database) puzzle dict into a ParsedPuzzle."""
+    info = puzzle['puzzle']
+    fen = puzzle['game'].get('fen')
+    if not fen:
+        fen = position_from_pgn(puzzle['game']['pgn'], info.get('initialPly')).fen()
+    solution = tuple(chess.Move.from_uci(uci) for uci in info['solution'])
+    return ParsedPuzzle(info.get('id'), fen, solution, info.get('rating'))
+
+class PuzzleLoader:
+    """LRU of parsed puzzles; thread-safe so the worker can warm it up."""
+
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def parse(self, puzzle):
+        pid = puzzle['puzzle'].get('id')
+        with self._lock:
+            parsed = self._cache.get(pid) if pid is not None else None
+            if parsed is not None:
+                self._cache.move_to_end(pid)
+                self.hits += 1
+                return parsed
+            self.misses += 1
+        parsed = parse_puzzle(puzzle)
+        if pid is not None:
+            with self._lock:
+                self._cache[pid] = parsed
+                while len(self._cache) > self.size:
+                    self._cache.popitem(last=False)
+        return parsed
+
+    def load(self, puzzle):
+        """``(board, solution moves, rating)`` ready for puzzle mode."""
+        parsed = self.parse(puzzle)
+        return IndexedBoard(parsed.fen), list(parsed.solution), parsed.rating
+
+loader = PuzzleLoader()
@@ -0,0 +1,234 @@
+"""
+Prefetched Lichess puzzles with an on-disk store.
+
+``PuzzleProvider`` keeps a few unplayed puzzles in a ``PuzzleStore`` so that
+"Next Puzzle" is answered from memory, and tops the store up from Lichess in
+the background (on the Lichess worker thread).  The store is a small JSON
+file, so puzzles fetched earlier are still there offline.  Entries expire
+after a TTL; puzzles that were shown once are remembered and skipped when
+Lichess hands them out again.
+"""
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+from puzzle_loader import loader
+
+CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "szaszki-chess")
+STORE_FILE = os.path.join(CACHE_DIR, "puzzles.json")
+
+PUZZLE_TTL = 7 * 24 * 3600  # unplayed puzzles
+PLAYED_TTL = 90 * 24 * 3600  # how long a played puzzle is skipped
+MAX_PLAYED = 5000
+
+def puzzle_id(puzzle):
+    return puzzle['puzzle']['id']
+
+class PuzzleStore:
+    """
+    Puzzles waiting to be played, ids of played puzzles and the last daily
+    puzzle, kept in memory and written to a JSON file by ``save``.  All
+    methods are thread-safe.
+    """
+
+    def __init__(self, path=STORE_FILE, ttl=PUZZLE_TTL, played_ttl=PLAYED_TTL, clock=time.time):
+        self.path = path
+        self.ttl = ttl
+        self.played_ttl = played_ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._queued = []  # [fetched at, puzzle], oldest first
+        self._played = {}  # puzzle id -> played at
+        self._daily = None  # {'date', 'fetched', 'puzzle'}
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.debug(f"No puzzle store loaded from {self.path}: {e}")
+            return
+        with self._lock:
+            self._queued = [[entry['fetched'], entry['puzzle']] for entry in data.get('queued', [])]
+            self._played = dict(data.get('played', {}))
+            self._daily = data.get('daily')
+            self._evict()
+
+    def save(self):
+        """Write the store if it changed; a failed write only loses the cache."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                'queued': [{'fetched': fetched, 'puzzle': puzzle} for fetched, puzzle in self._queued],
+                'played': self._played,
+                'daily': self._daily,
+            }
+            self._dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            temp = self.path + ".tmp"
+            with open(temp, 'w') as f:
+                json.dump(data, f)
+            os.replace(temp, self.path)
+        except OSError as e:
+            logging.debug(f"Could not write puzzle store: {e}")
+
+    def _evict(self):
+        now = self.clock()
+        queued = [entry for entry in self._queued if now - entry[0] < self.ttl]
+        played = {pid: at for pid, at in self._played.items() if now - at < self.played_ttl}
+        if len(played) > MAX_PLAYED:
+            played = dict(sorted(played.items(), key=lambda item: item[1])[-MAX_PLAYED:])
+        if len(queued) != len(self._queued) or len(played) != len(self._played):
+            self._dirty = True
+        self._queued, self._played = queued, played
+
+    def count(self):
+        with self._lock:
+            self._evict()
+            return len(self._queued)
+
+    def known(self, pid):
+        """True if the puzzle was played or is already queued."""
+        with self._lock:
+            return pid in self._played or any(puzzle_id(p) == pid for _, p in self._queued)
+
+    def add(self, puzzle):
+        """Queue an unplayed puzzle; returns False if it was played or queued before."""
+        pid = puzzle_id(puzzle)
+        with self._lock:
+            if pid in self._played or any(puzzle_id(p) == pid for _, p in self._queued):
+                return False
+            self._queued.append([self.clock(), puzzle])
+            self._dirty = True
+            return True
+
+    def take(self):
+        """Remove and return the oldest queued puzzle, marking it played; None if empty."""
+        with self._lock:
+            self._evict()
+            if not self._queued:
+                return None
+            _, puzzle = self._queued.pop(0)
+            self._played[puzzle_id(puzzle)] = self.clock()
+            self._dirty = True
+            return puzzle
+
+    def mark_played(self, puzzle):
+        with self._lock:
+            self._played[puzzle_id(puzzle)] = self.clock()
+            self._dirty = True
+
+    def daily(self):
+        """The last daily puzzle as ``(date, puzzle)``, or ``(None, None)``."""
+        with self._lock:
+            if not self._daily:
+                return None, None
+            return self._daily['date'], self._daily['puzzle']
+
+    def set_daily(self, date, puzzle):
+        with self._lock:
+            self._daily = {'date': date, 'fetched': self.clock(), 'puzzle': puzzle}
+            self._dirty = True
+
+class PuzzleProvider:
+    """
+    Serves puzzles from a ``PuzzleStore`` and refills it from Lichess.
+
+    ``take`` never touches the network and is safe to call on the GUI
+    thread; ``fetch``, ``daily`` and ``refill`` block and belong on the
+    Lichess worker.  ``fetch_next``/``fetch_daily`` return a puzzle dict or
+    None on failure, like ``LichessHandler.get_next_puzzle``.  When Lichess
+    cannot be reached, ``fetch`` falls back to an offline ``PuzzleDatabase``
+    (see puzzle_db.py) and picks a puzzle near ``rating``.
+
+    Every puzzle that comes through the worker is parsed into the shared
+    ``puzzle_loader`` cache there, before the GUI asks for it.
+    """
+
+    def __init__(self, fetch_next, fetch_daily, store=None, size=5, database=None, rating=1500):
+        self.fetch_next = fetch_next
+        self.fetch_daily = fetch_daily
+        self.store = store if store is not None else PuzzleStore()
+        self.size = size
+        self.database = database
+        self.rating = rating
+
+    def take(self):
+        return self.store.take()
+
+    def fetch(self):
+        """Fetch one puzzle that was not played yet and mark it played."""
+        for _ in range(self.size * 2):
+            puzzle = self.fetch_next()
+            if not puzzle:
+                break
+            if not self.store.known(puzzle_id(puzzle)):
+                self.store.mark_played(puzzle)
+                self.store.save()
+                return self.prepare(puzzle)
+            logging.debug(f"Skipping already played puzzle {puzzle_id(puzzle)}")
+        return self.from_database()
+
+    def from_database(self):
+        """An unplayed puzzle near ``rating`` from the offline database, or None."""
+        if self.database is None:
+            return None
+        # Widen the rating band until something unplayed turns up
+        for band in (100, 200, 400, 800):
+            puzzle = self.database.pick(self.rating, band, skip=self.store.known)
+            if puzzle:
+                self.store.mark_played(puzzle)
+                self.store.save()
+                return self.prepare(puzzle)
+        return None
+
+    def prepare(self, puzzle):
+        """Parse ``puzzle`` into the loader cache; None if it cannot be parsed."""
+        try:
+            loader.parse(puzzle)
+        except (KeyError, ValueError) as e:
+            logging.error(f"Skipping unreadable puzzle {puzzle['puzzle'].get('id')}: {e}")
+            return None
+        return puzzle
+
+    def refill(self):
+        """Fetch until ``size`` unplayed puzzles are stored.  Returns how many were added."""
+        added = 0
+        misses = 0
+        # Lichess may keep returning the same puzzle; give up after a few repeats
+        while self.store.count() < self.size and misses < self.size * 2:
+            puzzle = self.fetch_next()
+            if not puzzle:
+                break
+            if self.prepare(puzzle) and self.store.add(puzzle):
+                added += 1
+                misses = 0
+            else:
+                misses += 1
+        self.store.save()
+        logging.debug(f"Prefetched {added} puzzles, {self.store.count()} stored")
+        return added
+
+    def daily(self, today=None):
+        """Today's puzzle, fetched at most once a day and kept for offline use."""
+        date = today or datetime.date.today().isoformat()
+        stored_date, stored = self.store.daily()
+        if stored_date == date:
+            return self.prepare(stored)
+        try:
+            puzzle = self.fetch_daily()
+        except Exception as e:
+            logging.error(f"Failed to fetch daily puzzle: {e}")
+            puzzle = None
+        if not puzzle:
+            # Offline: yesterday's puzzle is better than none
+            return stored and self.prepare(stored)
+        self.store.set_daily(date, puzzle)
+        self.store.save()
+        return self.prepare(puzzle)
@@ -1,85 +1,96 @@
 import sys
-import chess
-import chess.pgn
 import time
+
+# Reference point for the time-to-first-frame measurement
+STARTUP_TIME = time.perf_counter()
+
+import startup_profiler
+startup_profiler.enable_from_argv(sys.argv, STARTUP_TIME)
+
+import chess
 import os
-import io
 import logging
+import shutil
 from PyQt6.QtWidgets import QApplication, QWidget, QMainWindow, QPushButton, QMessageBox, QLabel  # Added QLabel
-from PyQt6.QtGui import QPixmap, QPainter, QColor, QScreen, QGuiApplication, QFont
-from PyQt6.QtCore import QUrl, QTimer, Qt, QMetaObject, QThread, QObject, pyqtSignal, pyqtSlot  # Added QTimer, Qt, and QMetaObject
-from PyQt6.QtQml import QQmlApplicationEngine
+from PyQt6.QtGui import QPainter, QColor, QScreen, QGuiApplication, QFont, QTextCursor
+from PyQt6.QtCore import QTimer, Qt, QMetaObject, QThread, QObject, pyqtSignal, pyqtSlot  # Added QTimer, Qt, and QMetaObject
 from lichess_handler import LichessHandler
+from lichess_worker import LichessWorker, PREFETCH
+from bot_directory import BotDirectory, describe
+from engine_pool import EnginePool
+from puzzle_provider import PuzzleProvider, CACHE_DIR
+from puzzle_loader import loader as puzzle_loader
+from game_sync import diff_moves, follows, normalize_fen
+from stream_manager import StreamManager
+from event_queue import GameEventQueue
+import config
 from config import lichess_token
 from layout_manager import LayoutManager
-from custom_widgets import ClockWidget
-from layout_selector import LayoutSelector
-from settings_menu import SettingsMenu
+from custom_widgets import ClockWidget, PromotionPicker
+from board_renderer import BoardRenderer
+from piece_atlas import PieceAtlas
+from frame_scheduler import FrameScheduler
+from move_index import IndexedBoard, index_for
+import analysis_cache
+from opening_book import BOOK_FILE, opening_names
+from tablebase import Tablebase, describe as describe_tablebase, directories as syzygy_directories
+from game_clock import GameClock
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 
+# Point the app at a local stand-in server (fake_lichess.py) for offline testing
+lichess_base_url = os.environ.get("LICHESS_BASE_URL") or getattr(config, "lichess_base_url", None)
+
+# Local UCI engine for hints outside puzzle mode
+engine_command = getattr(config, "engine_path", None) or shutil.which("stockfish")
+
 class ChessBoardWidget(QWidget):
     def __init__(self, board, main_window, parent=None):
         super().__init__(parent)
         self.board = board
         self.main_window = main_window
         self.selected_square = None
-        self.load_pieces()
+        self.flip_board = False
+        self.scheduler = None  # Optional FrameScheduler batching repaints
+        self.hint = None  # (fen, move) suggested by the engine for that position
+        self.atlas = PieceAtlas()
+        self.renderer = BoardRenderer(self, QColor(240, 217, 181), QColor(181, 136, 99), self.atlas)
         self.setEnabled(True)
 
-    def load_pieces(self):
-        import os
-        self.pieces = {}
-        piece_names = {
-            'p': 'pawn', 'r': 'rook', 'n': 'knight', 'b': 'bishop', 'q': 'queen', 'k': 'king',
-            'P': 'pawn', 'R': 'rook', 'N': 'knight', 'B': 'bishop', 'Q': 'queen', 'K': 'king'
-        }
-        # Get the absolute path to the pieces directory
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        pieces_dir = os.path.join(current_dir, "pieces")
-
-        for piece, name in piece_names.items():
-            color = 'white' if piece.isupper() else 'black'
-            piece_path = os.path.join(pieces_dir, f"{color}-{name}.png")
-            pixmap = QPixmap(piece_path)
-            if pixmap.isNull():
-                print(f"Failed to load piece image: {piece_path}")
-            self.pieces[piece] = pixmap
-
     def paintEvent(self, event):
         painter = QPainter(self)
-        square_size = self.width() // 8
+        self.renderer.paint(painter, self.board, event.region(), self.flip_board)
 
-        # Draw the board
-        for row in range(8):
-            for col in range(8):
-                color = QColor(240, 217, 181) if (row + col) % 2 == 0 else QColor(181, 136, 99)
-                painter.fillRect(col * square_size, row * square_size, square_size, square_size, color)
+    def refresh(self):
+        """Repaint only the squares that changed since the last refresh."""
+        dirty = self.renderer.sync(self.board, self.flip_board)
+        dirty |= self.renderer.set_overlay(self.highlight_overlay())
+        self.renderer.invalidate(dirty, self.flip_board)
 
-        # Draw the pieces
-        for square in chess.SQUARES:
-            piece = self.board.piece_at(square)
-            if piece:
-                x = chess.square_file(square) * square_size
-                y = (7 - chess.square_rank(square)) * square_size
-                painter.drawPixmap(x, y, square_size, square_size, self.pieces[piece.symbol()])
-
-        # Highlight selected square and legal moves
+    def highlight_overlay(self):
+        overlay = {}
         if self.selected_square is not None:
-            self.highlight_square(painter, self.selected_square, QColor(255, 255, 0, 100))
-            self.highlight_legal_moves(painter, self.selected_square)
-
-    def highlight_square(self, painter, square, color):
-        file = chess.square_file(square)
-        rank = 7 - chess.square_rank(square)
-        square_size = self.width() // 8
-        painter.fillRect(file * square_size, rank * square_size, square_size, square_size, color)
-
-    def highlight_legal_moves(self, painter, square):
-        for move in self.board.legal_moves:
-            if move.from_square == square:
-                self.highlight_square(painter, move.to_square, QColor(0, 255, 0, 100))
+            for to_square in index_for(self.board).destinations(self.selected_square):
+                overlay[to_square] = QColor(0, 255, 0, 100)
+            overlay[self.selected_square] = QColor(255, 255, 0, 100)
+        if self.hint is not None and self.hint[0] == self.board.fen():
+            # Shown only while the position it was computed for is on the board
+            for square in (self.hint[1].from_square, self.hint[1].to_square):
+                overlay.setdefault(square, QColor(0, 120, 255, 90))
+        return overlay
+
+    def resolve_move(self, from_square, to_square):
+        """Return the legal move between two squares, asking for the promotion piece if needed."""
+        moves = index_for(self.board).moves_between(from_square, to_square)
+        if len(moves) > 1:
+            return self.choose_promotion(moves)
+        return moves[0] if moves else None
+
+    def choose_promotion(self, moves):
+        picker = PromotionPicker(moves, self.board.turn, self.atlas, self)
+        picker.exec()
+        return picker.selected_move
 
     def mousePressEvent(self, event):
         if not self.isEnabled():
@@ -89,26 +100,25 @@ class ChessBoardWidget(QWidget):
         if self.main_window.playing_as_white != self.board.turn:
             return
 
-        square_size = self.width() // 8
-        file = int(event.position().x()) // square_size
-        rank = 7 - (int(event.position().y()) // square_size)
-        square = chess.square(file, rank)
+        square = self.renderer.square_at(event.position(), self.flip_board)
+        if square is None:
+            return
 
         if self.selected_square is None:
             piece = self.board.piece_at(square)
             if piece and piece.color == self.board.turn:
                 self.selected_square = square
         else:
-            move = chess.Move(self.selected_square, square)
+            move = self.resolve_move(self.selected_square, square)
             if self.main_window.solving_puzzle:
-                if move in self.board.legal_moves:
+                if move is not None:
                     if self.main_window.allowed_moves and move in self.main_window.allowed_moves:
                         # Valid move: update board and history
                         self.board.push(move)
                         self.main_window.move_list.append(f"Puzzle move: {move.uci()}")
                         self.main_window.game_states.append(self.board.fen())
                     else:
-                        self.main_window.chat_box.appendPlainText(
+                        self.main_window.append_chat(
                             f"Incorrect move. Puzzle rating: {self.main_window.puzzle_rating}. Please try again."
                         )
                         self.main_window.puzzle_failed = True
@@ -116,7 +126,7 @@ class ChessBoardWidget(QWidget):
                             self.main_window.layout_manager.next_puzzle_button.setVisible(True)
                 # else: ignore illegal move
             else:
-                if move in self.board.legal_moves and (not self.main_window.allowed_moves or move in self.main_window.allowed_moves):
+                if move is not None and (not self.main_window.allowed_moves or move in self.main_window.allowed_moves):
                     self.board.push(move)
                     logging.debug(f"Player move: {move.uci()}")
                     self.main_window.game_moves.append(move)
@@ -126,60 +136,152 @@ class ChessBoardWidget(QWidget):
                     self.main_window.check_game_result()
                     if self.main_window.playing_vs_bot and not self.main_window.solving_puzzle:
                         self.main_window.send_move_to_bot(move)
+                    elif self.main_window.playing_vs_computer:
+                        self.main_window.request_computer_move()
             self.selected_square = None
-        self.update()
+        self.refresh()
 
 class MainWindow(QMainWindow):
+    # Engine results, emitted on engine threads and delivered on the GUI thread
+    engineInfo = pyqtSignal(object)
+    engineDone = pyqtSignal(object)
+    computerMoved = pyqtSignal(str, object)  # FEN searched, future of the SearchResult
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Chess")
 
         # Remove layout selector and just initialize components
         self.playing_as_white = True  # Default value, will be updated when game starts
-        self.board = chess.Board()
-        self.board_widget = ChessBoardWidget(self.board, self)
-        self.lichess_handler = LichessHandler(lichess_token)
-        self.init_ui_elements()
-        self.init_game_state()
-
-        self.layout_manager = LayoutManager(self)
-        # Auto-detect screen resolution and apply scalable layout
-        self.auto_apply_layout()
-
-        # Setup orientation monitoring
-        self.orientation_timer = QTimer()
-        self.orientation_timer.timeout.connect(self.check_orientation)
-        self.orientation_timer.start(1000)  # Check every second
-        self.current_orientation = None
-
-        self.settings_menu = SettingsMenu(self)
-        self.settings_menu.settingsChanged.connect(self.apply_settings)
+        self.board = IndexedBoard()
+        # Batch repaints of the board, clocks and text panels into e-ink frames
+        self.frame_scheduler = FrameScheduler(max_fps=4, full_refresh_every=10, root=self)
+        with startup_profiler.phase("board widget"):
+            self.board_widget = ChessBoardWidget(self.board, self)
+            self.board_widget.scheduler = self.frame_scheduler
+        self.lichess_handler = LichessHandler(lichess_token, base_url=lichess_base_url)
+        with startup_profiler.phase("ui elements"):
+            self.init_ui_elements()
+            self.init_game_state()
+
+        with startup_profiler.phase("layout"):
+            self.layout_manager = LayoutManager(self)
+            # Auto-detect screen resolution and apply scalable layout
+            self.auto_apply_layout()
+
+        # Follow screen rotations and resolution changes through QScreen signals
+        self.watched_screen = None
+        self.watch_screen(QGuiApplication.primaryScreen())
+        QGuiApplication.instance().primaryScreenChanged.connect(self.watch_screen)
+        self.check_orientation()
+
+        self._settings_menu = None  # Built on first use
         self.is_fullscreen = False
         self.next_puzzle_button = None  # Add this
+        self.time_to_first_frame = None
+
+        # Show the window first; all Lichess I/O runs on one background worker
+        self.set_online_state("connecting")
+        # "Next Puzzle" is served from a prefetched on-disk store, or offline
+        # from the imported puzzle database when there is one (opened on the worker)
+        self.puzzles = PuzzleProvider(self.lichess_handler.get_next_puzzle, self.lichess_handler.fetch_daily_puzzle,
+                                      rating=getattr(config, "puzzle_rating", 1500))
+        self.lichess_worker = LichessWorker(self.lichess_handler, self, puzzles=self.puzzles)
+        self.lichess_worker.connected.connect(self.on_lichess_connected)
+        self.lichess_worker.gameCreated.connect(self.on_bot_game_created)
+        self.lichess_worker.moveSent.connect(self.on_move_sent)
+        self.lichess_worker.puzzleLoaded.connect(self.handle_puzzle_loaded)
+        self.lichess_worker.start()
+        self.lichess_worker.connect_account()
+        # Engine evaluations of earlier sessions, read off the GUI thread
+        if getattr(config, "persist_analysis", True):
+            analysis_file = os.path.join(CACHE_DIR, "analysis.json")
+            self.lichess_worker.submit(PREFETCH, lambda: analysis_cache.shared.persist_to(analysis_file))
+        self.lichess_worker.submit(PREFETCH, opening_names)
+        self.lichess_worker.submit(PREFETCH, self.open_puzzle_database)
+        self.book_path = getattr(config, "book_path", None) or BOOK_FILE
+        # Listing the table files is left to the worker; until then there is no tablebase
+        self.syzygy_paths = syzygy_directories(getattr(config, "syzygy_path", None))
+        self.tablebase = None
+        self.lichess_worker.submit(PREFETCH, self.open_tablebase)
+        # Engines start on the first hint, see ask_for_hint
+        self.engine_pool = None
+        if engine_command:
+            self.engine_pool = EnginePool(engine_command, size=getattr(config, "engine_pool_size", 2)).start()
+        self.engineInfo.connect(self.show_engine_info)
+        self.engineDone.connect(self.on_engine_done)
+        self.computerMoved.connect(self.on_computer_moved)
+        # Online bots, served from memory and refreshed on the worker when stale
+        self.bot_directory = BotDirectory(self.lichess_handler.stream_online_bots,
+                                          submit=lambda call: self.lichess_worker.submit(PREFETCH, call))
+        # Events of every open game arrive here; only the active one is on the board
+        self.active_game_id = None
+        self.stream_manager = StreamManager(self.lichess_handler, on_event=self.handle_game_event)
+        self.game_events = GameEventQueue(self)
+        self.game_events.ready.connect(
+            lambda: self.frame_scheduler.post(self.drain_game_events, key='game_events'))
         logging.debug("MainWindow initialized.")
 
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.time_to_first_frame is None:
+            self.time_to_first_frame = time.perf_counter() - STARTUP_TIME
+            logging.info(f"Time to first frame: {self.time_to_first_frame * 1000:.0f} ms")
+            startup_profiler.first_paint()
+
+    @property
+    def settings_menu(self):
+        if self._settings_menu is None:
+            from settings_menu import SettingsMenu
+            self._settings_menu = SettingsMenu(self)
+            self._settings_menu.settingsChanged.connect(self.apply_settings)
+        return self._settings_menu
+
+    def set_online_state(self, state):
+        """
+        Show the connection state.  Every button stays usable: offline,
+        puzzles come from the puzzle store and "Play vs Bot" starts a game
+        against the built-in engine.
+        """
+        self.online_state = state
+        if state == "connecting":
+            self.player_info.setText("Connecting to Lichess...")
+        elif state == "offline":
+            self.player_info.setText("Offline - Lichess unavailable")
+        else:
+            self.player_info.setText(f"Signed in as {self.lichess_handler.get_user_id()}")
+
+    def on_lichess_connected(self, connected):
+        self.set_online_state("online" if connected else "offline")
+        if connected:
+            self.stream_manager.start()
+            self.lichess_worker.prefetch_puzzles()
+            self.bot_directory.refresh_async()
+        else:
+            self.append_chat("Could not connect to Lichess. Local games and the built-in engine are still available.")
+
     # NEW: Add a method to debug-print the widget tree
     def debug_print_widget_tree(self, widget, indent=""):
         logging.debug(f"{indent}{widget.__class__.__name__}")
-        for child in widget.findChildren(QWidget):
+        # findChildren is recursive by default; walk one level at a time
+        for child in widget.findChildren(QWidget, options=Qt.FindChildOption.FindDirectChildrenOnly):
             self.debug_print_widget_tree(child, indent + "  ")
 
     def auto_apply_layout(self):
-        from PyQt6.QtGui import QGuiApplication
         screen = QGuiApplication.primaryScreen()
         if screen:
             geometry = screen.geometry()
-            # Always use the default layout and let it scale
-            self.layout_manager.apply_layout("layout_1920x1440_horizontal")
+            # Use the closest compiled profile and let it scale
+            self.layout_manager.apply_layout(self.layout_manager.layouts.nearest(geometry.width(), geometry.height()))
 
     def init_game_state(self):
         self.playing_vs_bot = False
+        self.playing_vs_computer = False  # offline game against search_engine
+        self.computer_search = None  # FEN the built-in engine is searching, if any
+        self.computer_failures = 0
+        self.computer = None  # ComputerPlayer, created for the first offline game
         self.manual_game = False
-        self.white_time = 300  # 5 minutes
-        self.black_time = 300
         self.current_turn = chess.WHITE
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_clock)
         self.move_list = []
         self.solving_puzzle = False  # Add this line
         self.allowed_moves = None  # Initialize allowed_moves
@@ -189,27 +291,26 @@ class MainWindow(QMainWindow):
         self.game_moves = []          # List of all moves in the game
         self.current_move_pointer = 0 # Pointer for current move position
         self.game_states = [self.board.fen()]  # NEW: Track board states
+        # Online games: position the Lichess move list starts from
+        self.game_initial_fen = chess.STARTING_FEN
+        self.game_resyncs = 0  # Full rebuilds of the board from a game event
+        self.confirmed_plies = 0  # Plies already matched against Lichess
+        self._history_appends = []  # (text, new_line) waiting for the next frame
 
-    def update_clock(self):
+    def on_time_expired(self, color):
         if self.manual_game:
-            if self.current_turn == chess.WHITE:
-                self.white_time = max(0, self.white_time - 1)
-                if self.white_time <= 0:
-                    self.game_over("Black wins on time!")
-                self.white_clock.seconds_remaining = self.white_time
-            else:
-                self.black_time = max(0, self.black_time - 1)
-                if self.black_time <= 0:
-                    self.game_over("White wins on time!")
-                self.black_clock.seconds_remaining = self.black_time
-
-            self.white_clock.update()
-            self.black_clock.update()
+            self.game_over("Black wins on time!" if color == chess.WHITE else "White wins on time!")
 
     def init_ui_elements(self):
-        # Create clocks
+        # Create clocks, both driven by one clock model
+        self.game_clock = GameClock()
+        self.game_clock.flagged.connect(self.on_time_expired)
         self.white_clock = ClockWidget(is_white=True)
         self.black_clock = ClockWidget(is_white=False)
+        self.white_clock.bind(self.game_clock, chess.WHITE)
+        self.black_clock.bind(self.game_clock, chess.BLACK)
+        self.white_clock.scheduler = self.frame_scheduler
+        self.black_clock.scheduler = self.frame_scheduler
 
         # Create navigation buttons with size policy for responsiveness.
         self.prev_button = QPushButton("Previous")
@@ -257,6 +358,38 @@ class MainWindow(QMainWindow):
         self.next_button.setStyleSheet("border: 2px dashed black; background-color: white;")
         self.next_button.clicked.connect(self.next_move)
 
+    def set_move_history(self, text, scroll_to_end=False):
+        """Replace the move history text in the next frame."""
+        self._history_appends = []  # Superseded by the new text
+        def apply():
+            self.move_history.setPlainText(text)
+            if scroll_to_end:
+                self.move_history.verticalScrollBar().setValue(
+                    self.move_history.verticalScrollBar().maximum()
+                )
+        self.frame_scheduler.post(apply, key='move_history')
+
+    def append_move_history(self, text, new_line=True):
+        """Add to the end of the move history in the next frame without rewriting it."""
+        self._history_appends.append((text, new_line))
+        self.frame_scheduler.post(self._apply_history_appends, key='move_history_append')
+
+    def _apply_history_appends(self):
+        appends, self._history_appends = self._history_appends, []
+        for text, new_line in appends:
+            if new_line:
+                self.move_history.appendPlainText(text)
+            else:
+                cursor = self.move_history.textCursor()
+                cursor.movePosition(QTextCursor.MoveOperation.End)
+                cursor.insertText(text)
+        scroll_bar = self.move_history.verticalScrollBar()
+        scroll_bar.setValue(scroll_bar.maximum())
+
+    def append_chat(self, message):
+        """Append a chat line in the next frame; every line is kept."""
+        self.frame_scheduler.post(lambda: self.chat_box.appendPlainText(message))
+
     def setup_timer_labels(self):
         for label in [self.white_timer_label, self.black_timer_label]:
             label.setFont(QFont("Palatino", 32))
@@ -275,119 +408,255 @@ class MainWindow(QMainWindow):
         self.board.reset()
         self.manual_game = True
         self.playing_vs_bot = False
-        self.white_time = self.clock_time
-        self.black_time = self.clock_time
+        self.playing_vs_computer = False
+        self.computer_search = None  # a reply still being searched is dropped
         self.current_turn = chess.WHITE
         self.move_list = []
         self.solving_puzzle = False
 
         # Reset and start clocks
-        self.white_clock.reset(self.clock_time)
-        self.black_clock.reset(self.clock_time)
-        self.white_clock.start()
-        self.black_clock.stop()
-
-        # Start main timer
-        self.timer.start(1000)
+        self.game_clock.reset(self.clock_time)
+        self.game_clock.start(chess.WHITE)
 
         self.board_widget.setEnabled(True)
-        self.board_widget.update()
-        self.move_history.setPlainText("New game started\nWhite to move")
+        self.board_widget.refresh()
+        self.set_move_history("New game started\nWhite to move")
         self.solving_puzzle = False  # Reset puzzle mode
         self.allowed_moves = None  # Reset allowed moves for new game
 
     def play_vs_bot(self):
-        bot_username = "chessosity"  # Example bot username
-        game_id = self.lichess_handler.create_bot_game(bot_username, time_control='5+0', rated=False)
+        if self.online_state != "online":
+            self.play_vs_computer()
+            return
+        time_control = '5+0'
+        bot = self.bot_directory.closest(time_control, getattr(config, "bot_rating", 1500))
+        if bot:
+            self.lichess_worker.challenge_bot(bot['username'], time_control=time_control, rated=False)
+            self.append_chat(f"Challenging {describe(bot)}...")
+        else:
+            # Bot directory not loaded (yet): play the Lichess AI instead
+            self.play_vs_ai(time_control)
+
+    def play_vs_ai(self, time_control='5+0'):
+        self.lichess_worker.create_bot_game("chessosity", time_control=time_control, rated=False,
+                                            level=getattr(config, "bot_level", 3))
+        self.append_chat("Creating bot game...")
+
+    def play_vs_computer(self):
+        """Offline game against the built-in engine; the player has white."""
+        if self.computer is None:
+            from search_engine import ComputerPlayer
+            self.computer = ComputerPlayer()
+        self.new_game()
+        self.playing_vs_computer = True
+        self.playing_as_white = True
+        # Start the search process while the player thinks about the first move
+        self.computer.warm_up()
+        self.append_chat(f"Playing the built-in engine at level {getattr(config, 'bot_level', 3)}.")
+
+    def request_computer_move(self):
+        if not self.playing_vs_computer or self.board.is_game_over():
+            return
+        fen = self.board.fen()
+        color = self.board.turn
+        self.computer_search = fen
+        self.board_widget.setEnabled(False)  # the player waits for the reply
+        future = self.computer.play(self.board, getattr(config, "bot_level", 3),
+                                    self.game_clock.remaining(color), self.game_clock.increment, book=self.book_path,
+                                    tablebase=self.syzygy_paths if self.tablebase is not None else None)
+        # Runs on the executor's thread; the signal hands the result to the GUI thread
+        future.add_done_callback(lambda done: self.computerMoved.emit(fen, done))
+
+    def on_computer_moved(self, fen, future):
+        if fen != self.computer_search or future.cancelled():
+            return  # superseded by a new game or a newer search
+        self.computer_search = None
+        if not self.playing_vs_computer:
+            return  # the game ended while the engine was thinking
+        self.board_widget.setEnabled(True)
+        try:
+            result = future.result()
+        except Exception as e:
+            logging.error(f"Built-in engine failed: {e}")
+            # A crashed worker process breaks the pool; the next search starts a new one
+            self.computer.shutdown()
+            self.computer_failures += 1
+            if self.computer_failures < 3:
+                self.request_computer_move()
+            else:
+                self.game_over("The built-in engine failed. Start a new game to try again.")
+            return
+        self.computer_failures = 0
+        if self.board.fen() != fen:
+            # The position changed during the search; answer the current one
+            if self.board.turn != self.playing_as_white:
+                self.request_computer_move()
+            return
+        if result.move is None:
+            return
+        logging.debug(f"Engine move {result.move.uci()}: depth {result.depth}, {result.nodes} nodes "
+                      f"in {result.seconds:.2f}s ({result.nodes / max(result.seconds, 1e-6):.0f} nps)")
+        self.board.push(result.move)
+        self.game_moves.append(result.move)
+        self.current_move_pointer = len(self.game_moves)
+        self.game_states.append(self.board.fen())
+        self.switch_turn()
+        self.check_game_result()
+        self.board_widget.refresh()
+
+    def on_bot_game_created(self, game_id):
         if game_id:
             # Set some initial game parameters
             self.playing_vs_bot = True
-            self.white_time = 300  # 5 minutes
-            self.black_time = 300  # 5 minutes
-            self.timer.start(1000)
+            self.playing_vs_computer = False
+            self.game_clock.reset(300)  # 5 minutes
             self.board_widget.setEnabled(True)
             self.allowed_moves = None  # Allow all legal moves in bot game
             logging.debug(f"Started bot game with ID: {game_id}")
             self.solving_puzzle = False  # Ensure puzzle mode is off
 
-            # Start streaming game events and processing them via handle_game_event()
-            self.lichess_handler.run_game_stream(self.handle_game_event)
+            # Start from a clean board; game events only add new moves to it
+            self.board.reset()
+            self.game_initial_fen = chess.STARTING_FEN
+            self.confirmed_plies = 0
+            self.set_move_history("")
+            # Follow the game's stream; its events reach handle_game_event()
+            self.active_game_id = game_id
+            self.stream_manager.open(game_id)
         else:
             self.show_result("Failed to create bot game.")
 
     def send_move_to_bot(self, move):
-        """Send move to bot in a separate thread"""
-        from PyQt6.QtCore import QThread, QObject, pyqtSignal
-
-        class BotWorker(QObject):
-            finished = pyqtSignal()
-
-            def __init__(self, handler, game_id, move):
-                super().__init__()
-                self.handler = handler
-                self.game_id = game_id
-                self.move = move
-
-            def run(self):
-                try:
-                    self.handler.make_move_bot(self.move)
-                except Exception as e:
-                    logging.error(f"Error sending move to bot: {e}")
-                finally:
-                    self.finished.emit()
-
-        self.bot_thread = QThread()
-        self.bot_worker = BotWorker(self.lichess_handler, self.lichess_handler.game_id, move)
-        self.bot_worker.moveToThread(self.bot_thread)
-        self.bot_thread.started.connect(self.bot_worker.run)
-        self.bot_worker.finished.connect(self.bot_thread.quit)
-        self.bot_worker.finished.connect(self.bot_worker.deleteLater)
-        self.bot_thread.finished.connect(self.bot_thread.deleteLater)
-        self.bot_thread.start()
-
-    def update_bot_move(self):
-        game_state = self.lichess_handler.get_game_state()
-        if game_state:
-            moves = game_state['moves'].split()
-            if len(moves) % 2 == 1:  # Bot's turn
-                bot_move = moves[-1]
-                self.board.push_uci(bot_move)
-                logging.debug(f"Bot move: {bot_move}")
-                self.switch_turn()
-                self.board_widget.update()
-                self.check_game_result()
+        """
+        Queue a move that is already on the board; moves are sent in order
+        and rolled back if Lichess rejects them.
+        """
+        ply = len(self.board.move_stack) - 1
+        self.lichess_worker.send_move(move, ply=ply)
+
+    def on_move_sent(self, uci, ply, accepted):
+        if not accepted:
+            self.append_chat(f"Lichess did not accept move {uci}.")
+            if 0 <= ply < len(self.board.move_stack) and self.board.move_stack[ply].uci() == uci:
+                self.rollback_to(ply)
+
+    def rollback_to(self, ply):
+        """Undo local moves from ``ply`` onwards (optimistic moves that did not stick)."""
+        undone = 0
+        while len(self.board.move_stack) > ply:
+            move = self.board.pop()
+            undone += 1
+            if self.game_moves and self.game_moves[-1] == move:
+                self.game_moves.pop()
+                self.game_states.pop()
+        if not undone:
+            return
+        self.current_move_pointer = len(self.game_moves)
+        self.current_turn = self.board.turn
+        if self.manual_game and not self.solving_puzzle:
+            self.game_clock.start(self.current_turn)
+        self.set_move_history(self.format_online_history(), scroll_to_end=True)
+        self.board_widget.setEnabled(self.board.turn == self.playing_as_white)
+        self.board_widget.refresh()
+        logging.debug(f"Rolled back to ply {ply}")
+
+    def sync_game(self, server_moves, initial_fen=None):
+        """
+        Bring the board up to date with the full move list of a Lichess
+        game event, pushing only the moves that are new.  The board is only
+        rebuilt when it does not follow the game or contradicts it.
+        """
+        if initial_fen is not None:
+            self.game_initial_fen = normalize_fen(initial_fen)
+            if not follows(self.board, initial_fen):
+                self.resync_game(server_moves)
+                return
+        ply, new_moves = diff_moves(self.board.move_stack, server_moves, self.confirmed_plies)
+        self.confirmed_plies = len(server_moves)
+        if ply is not None:
+            logging.warning(f"Local moves diverge from Lichess at ply {ply}, resyncing")
+            self.resync_game(server_moves, ply)
+            return
+        for uci in new_moves:
+            try:
+                move = self.board.push_uci(uci)
+            except ValueError as e:
+                logging.error(f"Invalid move {uci} from Lichess: {e}")
+                self.resync_game(server_moves)
+                return
+            self.record_online_move(move, len(self.board.move_stack) - 1)
+        if new_moves:
+            self.after_game_sync()
+
+    def resync_game(self, server_moves, from_ply=0):
+        """Rebuild the board from ``from_ply`` (from the initial position by default)."""
+        if from_ply:
+            while len(self.board.move_stack) > from_ply:
+                self.board.pop()
+        else:
+            self.board.set_fen(self.game_initial_fen)
+        for uci in server_moves[len(self.board.move_stack):]:
+            try:
+                self.board.push_uci(uci)
+            except ValueError as e:
+                logging.error(f"Invalid move {uci} from Lichess: {e}")
+                break
+        self.game_resyncs += 1
+        self.confirmed_plies = len(self.board.move_stack)
+        self.set_move_history(self.format_online_history(), scroll_to_end=True)
+        self.after_game_sync()
+
+    def after_game_sync(self):
+        self.current_turn = self.board.turn
+        # Enable board only if it's our turn
+        self.board_widget.setEnabled(self.board.turn == self.playing_as_white)
+        self.board_widget.refresh()
+
+    def record_online_move(self, move, ply):
+        """Add one move to the online game's history without rewriting it."""
+        if ply % 2 == 0:
+            self.append_move_history(f"{ply // 2 + 1}. {move.uci()}")
+        else:
+            self.append_move_history(f" {move.uci()}", new_line=False)
+
+    def opening_header(self):
+        """The ECO code and name of the opening so far as a first history line, if known."""
+        if self.solving_puzzle:
+            return ""
+        found = opening_names().name(self.board)
+        return f"{found[0]} {found[1]}\n" if found else ""
+
+    def format_online_history(self):
+        lines = []
+        for ply, move in enumerate(self.board.move_stack):
+            if ply % 2 == 0:
+                lines.append(f"{ply // 2 + 1}. {move.uci()}")
+            else:
+                lines[-1] += f" {move.uci()}"
+        return self.opening_header() + "\n".join(lines)
 
     def get_online_bots(self):
-        bots = self.lichess_handler.get_online_bots()
+        bots = self.bot_directory.find()
         if bots:
             msg_box = QMessageBox()
             msg_box.setWindowTitle("Online Bots")
-            msg_box.setText("Available bots:\n" + "\n".join(bots[:10]))  # Show first 10 bots
+            msg_box.setText("Available bots:\n" + "\n".join(describe(bot) for bot in bots[:10]))  # Show first 10 bots
             msg_box.exec()
         else:
-            self.show_result("Failed to fetch online bots.")
-
-    def update_timer(self):
-        # Update clock widgets instead of labels
-        if self.current_turn == chess.WHITE:
-            self.white_clock.time = self.format_time(self.white_time)
-        else:
-            self.black_clock.time = self.format_time(self.black_time)
-        self.white_clock.update()
-        self.black_clock.update()
+            self.show_result("No online bots known yet.")
 
     def switch_turn(self):
         self.current_turn = not self.current_turn
+        if self.engine_pool is not None:
+            # The position changed; a hint for the old one is useless
+            self.engine_pool.cancel('hint')
         if self.manual_game and not self.solving_puzzle:
-            if self.current_turn == chess.WHITE:
-                self.white_clock.start()
-                self.black_clock.stop()
-            else:
-                self.black_clock.start()
-                self.white_clock.stop()
+            self.game_clock.switch(self.current_turn)
 
         # Update move history
-        if self.board.move_stack:
+        if self.board.move_stack and self.playing_vs_bot and not self.solving_puzzle:
+            self.record_online_move(self.board.move_stack[-1], len(self.board.move_stack) - 1)
+        elif self.board.move_stack:
             last_move = self.board.move_stack[-1]
             move_text = f"{'White' if not self.current_turn else 'Black'}: {last_move.uci()}"
             self.move_list.append(move_text)
@@ -401,23 +670,31 @@ class MainWindow(QMainWindow):
     def undo_move(self):
         if self.board.move_stack:
             self.board.pop()
-        self.board_widget.update()
+        self.board_widget.refresh()
 
     def check_game_result(self):
-        if self.board.is_checkmate():
+        # Checkmate, stalemate and material are cached per position; counters and repetitions are not
+        outcome = analysis_cache.shared.outcome(self.board)
+        if outcome is not None and outcome.termination == chess.Termination.CHECKMATE:
             winner = "White" if self.board.turn == chess.BLACK else "Black"
             self.game_over(f"{winner} wins by checkmate!")
-        elif (self.board.is_stalemate() or self.board.is_insufficient_material() or
+        elif (outcome is not None or
               self.board.is_seventyfive_moves() or self.board.is_fivefold_repetition() or
               self.board.is_variant_draw()):
             self.game_over("Draw!")
+        elif (self.playing_vs_computer and self.tablebase is not None
+              and getattr(config, "tablebase_adjudicate", True)):
+            result = self.tablebase.probe(self.board)
+            if result is not None:
+                self.game_over(f"{describe_tablebase(self.board, result)}, adjudicated by the endgame tablebase.")
 
     def game_over(self, message):
-        self.timer.stop()
-        self.white_clock.stop()
-        self.black_clock.stop()
+        self.game_clock.stop()
+        self.playing_vs_computer = False
+        if self.lichess_handler.move_latency.total:
+            logging.info(f"Move round-trip latency: {self.lichess_handler.move_latency.summary()}")
         self.board_widget.setEnabled(False)
-        self.move_history.setPlainText(f"{message}\n\n" + "\n".join(self.move_list))
+        self.set_move_history(f"{message}\n\n" + "\n".join(self.move_list))
 
     def show_result(self, message):
         msg_box = QMessageBox()
@@ -425,25 +702,12 @@ class MainWindow(QMainWindow):
         msg_box.exec()
 
     def show_todays_puzzles(self):
-        puzzle = self.lichess_handler.fetch_daily_puzzle()
-        if not puzzle:
-            return
-
-        self.puzzle_rating = puzzle['puzzle']['rating']
-        pgn = puzzle['game']['pgn']
-        game = chess.pgn.read_game(io.StringIO(pgn))
-        self.board = game.end().board()
-        self.board_widget.board = self.board
-        self.solution_moves = [chess.Move.from_uci(move) for move in puzzle['puzzle']['solution']]
-        self.current_move_index = 0
-        self.allowed_moves = [self.solution_moves[self.current_move_index]]
-        self.solving_puzzle = True
-        self.puzzle_failed = False
-        self.board_widget.update()
-        self.move_history.setPlainText("Today's Puzzle\nMake your move!")
-        self.layout_manager.next_puzzle_button.setVisible(False)  # Reset visibility
+        # Loaded on the Lichess worker, shown by handle_puzzle_loaded
+        self.lichess_worker.fetch_puzzle(daily=True)
 
     def prev_move(self):
+        if self.computer_search is not None:
+            return  # the built-in engine is answering the current position
         if self.solving_puzzle and hasattr(self, "solution_moves") and self.solution_moves:
             if self.current_move_index > 0:
                 self.current_move_index -= 1
@@ -454,14 +718,16 @@ class MainWindow(QMainWindow):
                 self.current_move_pointer -= 1
                 # NEW: Revert to previous board state using saved FEN
                 fen = self.game_states[self.current_move_pointer]
-                self.board = chess.Board(fen)
+                self.board = IndexedBoard(fen)
                 self.board_widget.board = self.board
                 if self.move_list:
                     self.move_list.pop()
                 self.update_move_history()
-        self.board_widget.update()
+        self.board_widget.refresh()
 
     def next_move(self):
+        if self.computer_search is not None:
+            return
         if self.solving_puzzle and hasattr(self, "solution_moves") and self.solution_moves:
             if self.current_move_index < len(self.solution_moves):
                 move = self.solution_moves[self.current_move_index]
@@ -475,21 +741,76 @@ class MainWindow(QMainWindow):
             if self.current_move_pointer < len(self.game_states) - 1:
                 self.current_move_pointer += 1
                 fen = self.game_states[self.current_move_pointer]
-                self.board = chess.Board(fen)
+                self.board = IndexedBoard(fen)
                 self.board_widget.board = self.board
                 # Optionally update move_list here if desired.
                 self.update_move_history()
-        self.board_widget.update()
+        self.board_widget.refresh()
 
     def ask_for_hint(self):
         if self.solving_puzzle and hasattr(self, "solution_moves") and self.solution_moves:
             if self.current_move_index < len(self.solution_moves):
                 hint_move = self.solution_moves[self.current_move_index]
-                self.chat_box.appendPlainText(f"Hint: Try {hint_move.uci()}")
+                self.append_chat(f"Hint: Try {hint_move.uci()}")
             else:
-                self.chat_box.appendPlainText("No more hints available. Puzzle solved!")
+                self.append_chat("No more hints available. Puzzle solved!")
+        elif self.show_tablebase_hint():
+            pass  # exact answer from the endgame tables
+        elif self.show_cached_hint():
+            pass  # searched before, answered from analysis_cache
+        elif self.engine_pool is not None:
+            # Replaces (and cancels) any hint search still running
+            self.engine_pool.analyse(self.board, time=getattr(config, "hint_time", 1.0), key='hint',
+                                     on_info=lambda request, info: self.engineInfo.emit(request),
+                                     on_done=self.engineDone.emit)
+            self.append_chat("Thinking...")
         else:
-            self.chat_box.appendPlainText("Hints are only available in puzzle mode.")
+            self.append_chat("Hints need a UCI engine; set engine_path in config.py.")
+
+    def show_tablebase_hint(self):
+        """Answer a hint from the Syzygy tables when the position has few enough pieces."""
+        if self.tablebase is None:
+            return False
+        result = self.tablebase.probe(self.board)
+        move = self.tablebase.best_move(self.board) if result is not None else None
+        if move is None:
+            return False
+        if self.engine_pool is not None:
+            self.engine_pool.cancel('hint')
+        self.board_widget.hint = (self.board.fen(), move)
+        self.frame_scheduler.post(self.board_widget.refresh, key='engine_hint')
+        self.append_chat(f"Hint: {self.board.san(move)} ({describe_tablebase(self.board, result)})")
+        return True
+
+    def show_cached_hint(self):
+        """Answer a hint from an earlier search of this position, if it was deep enough."""
+        evaluation = analysis_cache.shared.evaluation(self.board, getattr(config, "hint_min_depth", 10))
+        if evaluation is None:
+            return False
+        if self.engine_pool is not None:
+            self.engine_pool.cancel('hint')
+        self.board_widget.hint = (self.board.fen(), chess.Move.from_uci(evaluation.pv[0]))
+        self.frame_scheduler.post(self.board_widget.refresh, key='engine_hint')
+        self.append_chat(f"Hint: {analysis_cache.describe(self.board, evaluation)}")
+        return True
+
+    def show_engine_info(self, request):
+        """Show the engine's current best move while it is still searching."""
+        if request.fen != self.board.fen():
+            request.cancel()
+            return
+        self.board_widget.hint = (request.fen, request.best_move())
+        self.frame_scheduler.post(self.board_widget.refresh, key='engine_hint')
+
+    def on_engine_done(self, request):
+        evaluation = request.evaluation()
+        if evaluation is not None:
+            # Kept even when cancelled; a deeper search of the position replaces it
+            analysis_cache.shared.store_evaluation(request.board, evaluation)
+        if request.error is not None:
+            self.append_chat(f"Engine failed: {request.error}")
+        elif not request.cancelled and request.fen == self.board.fen() and request.info:
+            self.append_chat(f"Hint: {request.line()}")
 
     def highlight_correct_move(self):
         pass  # No longer highlighting the correct move
@@ -518,10 +839,26 @@ class MainWindow(QMainWindow):
 
         # Handle resolution change
         if resolution:
-            width, height = map(int, resolution.split('x'))
-            orientation = "vertical" if height > width else "horizontal"
-            new_layout = f"layout_{width}x{height}_{orientation}"
-            self.layout_manager.apply_layout(new_layout)
+            self.layout_manager.apply_layout(resolution)
+
+    def open_puzzle_database(self):
+        """Runs on the worker: puzzle_db pulls in sqlite3 and the decompressors, so it is imported here."""
+        from puzzle_db import PuzzleDatabase
+        self.puzzles.database = PuzzleDatabase.open_if_present()
+
+    def open_tablebase(self):
+        """Runs on the worker; chess.syzygy maps each table file only when a position needs it."""
+        self.tablebase = Tablebase.open_if_present(self.syzygy_paths)
+
+    def closeEvent(self, event):
+        self.stream_manager.stop()
+        self.lichess_worker.stop()
+        if self.engine_pool is not None:
+            self.engine_pool.stop()
+        if self.computer is not None:
+            self.computer.shutdown()
+        analysis_cache.shared.save()
+        super().closeEvent(event)
 
     def keyPressEvent(self, event):
         logging.debug(f"Key pressed: {event.key()}")
@@ -532,14 +869,22 @@ class MainWindow(QMainWindow):
             self.settings_menu.fullscreen_check.setChecked(False)
         super().keyPressEvent(event)
 
-    def check_orientation(self):
-        from PyQt6.QtGui import QGuiApplication
+    def watch_screen(self, screen):
+        if self.watched_screen is not None:
+            self.watched_screen.geometryChanged.disconnect(self.check_orientation)
+            self.watched_screen.orientationChanged.disconnect(self.check_orientation)
+        self.watched_screen = screen
+        if screen is not None:
+            screen.geometryChanged.connect(self.check_orientation)
+            screen.orientationChanged.connect(self.check_orientation)
+            self.check_orientation()
+
+    def check_orientation(self, *args):
         screen = QGuiApplication.primaryScreen()
         if screen:
             geometry = screen.geometry()
-            orientation = "vertical" if geometry.height() > geometry.width() else "horizontal"
-            # Always generate a profile from current geometry.
-            profile = f"layout_{geometry.width()}x{geometry.height()}_{orientation}"
+            # Pick the closest profile for the current geometry
+            profile = self.layout_manager.layouts.nearest(geometry.width(), geometry.height())
             self.layout_manager.apply_layout(profile)
 
     def format_move_history(self):
@@ -552,11 +897,11 @@ class MainWindow(QMainWindow):
                 pgn += f"{move_num}. {white_move} {black_move} "
             else:
                 pgn += f"{move_num}. {white_move} "
-        return pgn.strip()
+        return self.opening_header() + pgn.strip()
 
     def update_move_history(self):
         # NEW: Update the move history display in PGN format
-        self.move_history.setPlainText(self.format_move_history())
+        self.set_move_history(self.format_move_history())
 
     def auto_play_next_move(self):
         """
@@ -575,57 +920,32 @@ class MainWindow(QMainWindow):
                     self.allowed_moves = [self.solution_moves[self.current_move_index]]
                 else:
                     self.allowed_moves = None
-                self.board_widget.update()
+                self.board_widget.refresh()
 
     def load_next_puzzle(self):
-        try:
-            # Run blocking network call in a thread
-            from PyQt6.QtCore import QThread, QObject, pyqtSignal, pyqtSlot
-
-            class PuzzleLoader(QObject):
-                loaded = pyqtSignal(object)
-                error = pyqtSignal(str)
-
-                @pyqtSlot()
-                def load(self):
-                    try:
-                        puzzle = self.handler.get_next_puzzle()
-                        self.loaded.emit(puzzle)
-                    except Exception as e:
-                        self.error.emit(str(e))
-
-            self.puzzle_loader = QThread()
-            self.loader_worker = PuzzleLoader()
-            self.loader_worker.handler = self.lichess_handler
-            self.loader_worker.moveToThread(self.puzzle_loader)
-            self.puzzle_loader.started.connect(self.loader_worker.load)
-            self.loader_worker.loaded.connect(self.handle_puzzle_loaded)
-            self.loader_worker.error.connect(lambda e: self.chat_box.appendPlainText(f"Error: {e}"))
-            self.loader_worker.loaded.connect(self.puzzle_loader.quit)
-            self.loader_worker.error.connect(self.puzzle_loader.quit)
-            self.puzzle_loader.start()
-
-        except Exception as e:
-            logging.error(f"Puzzle loading failed: {e}")
-            self.chat_box.appendPlainText("Error loading puzzle. Please try again.")
+        self.lichess_worker.fetch_puzzle()
 
     def handle_puzzle_loaded(self, puzzle):
         """Handle loaded puzzle data in main thread"""
         if not puzzle:
+            self.append_chat("Error loading puzzle. Please try again.")
             return
 
-        self.puzzle_rating = puzzle['puzzle']['rating']
-        pgn = puzzle['game']['pgn']
-        game = chess.pgn.read_game(io.StringIO(pgn))
-        self.board = game.end().board()
+        try:
+            # Usually parsed on the Lichess worker already, see puzzle_loader
+            self.board, self.solution_moves, self.puzzle_rating = puzzle_loader.load(puzzle)
+        except (KeyError, ValueError) as e:
+            logging.error(f"Could not read puzzle: {e}")
+            self.append_chat("Error loading puzzle. Please try again.")
+            return
         self.board_widget.board = self.board
-        self.solution_moves = [chess.Move.from_uci(move) for move in puzzle['puzzle']['solution']]
         self.current_move_index = 0
         self.allowed_moves = [self.solution_moves[self.current_move_index]]
         self.solving_puzzle = True
+        self.playing_vs_computer = False
         self.puzzle_failed = False
-        self.board_widget.update()
-        self.move_history.setPlainText("Today's Puzzle\nMake your move!")
+        self.board_widget.refresh()
+        self.set_move_history("Today's Puzzle\nMake your move!")
         self.layout_manager.next_puzzle_button.setVisible(False)  # Reset visibility
 
     def safe_timer_start(self, interval, callback):
@@ -637,13 +957,35 @@ class MainWindow(QMainWindow):
             QMetaObject.ArgumentList([interval, callback])
         )
 
-    def handle_game_event(self, event):
+    def handle_game_event(self, game_id, event):
         """
-        Thread-safe callback to handle each event from the game stream.
-        Uses QTimer.singleShot to post the event processing onto the main (GUI) thread.
+        Thread-safe callback for events from the StreamManager.  Events are
+        queued and handled on the main (GUI) thread once per frame.
         """
-        from PyQt6.QtCore import QTimer
-        QTimer.singleShot(0, lambda: self._handle_game_event(event))
+        self.game_events.put(game_id, event)
+
+    def drain_game_events(self):
+        events = self.game_events.drain()
+        for game_id, event in events:
+            self.route_game_event(game_id, event)
+        stats = self.game_events.stats()
+        logging.debug(f"Handled {len(events)} game events, lag {stats['last_lag_ms']:.0f}ms, "
+                      f"{stats['coalesced']} coalesced, max depth {stats['max_depth']}")
+
+    def route_game_event(self, game_id, event):
+        if event.get('type') == 'gameFinish' and game_id:
+            # On the worker, like every make_move_bot call that reads the accepted moves
+            self.lichess_worker.submit(PREFETCH, lambda: self.lichess_handler.forget_game(game_id))
+        if game_id is not None and game_id == self.active_game_id:
+            self._handle_game_event(event)
+        elif event.get('type') == 'gameStart' and game_id:
+            logging.debug(f"Game {game_id} opened in the background")
+        elif event.get('type') == 'challengeDeclined' and event['challenge'].get('id') == self.active_game_id:
+            self.append_chat(f"{event['challenge'].get('destUser', {}).get('name', 'The bot')} declined the challenge.")
+            self.active_game_id = None
+            self.play_vs_ai()
+        else:
+            logging.debug(f"Event for inactive game {game_id}: {event.get('type')}")
 
     def _handle_game_event(self, event):
         event_type = event.get('type')
@@ -670,82 +1012,25 @@ class MainWindow(QMainWindow):
                 f"Your rating: {player_rating or 'Unrated'}\n"
                 f"Opponent: {opponent_type} Level {ai_level}"
             )
-            self.chat_box.appendPlainText(game_info)
+            self.append_chat(game_info)
 
             # Set board orientation
             self.board_widget.flip_board = not self.playing_as_white
-            self.board_widget.update()
+            self.board_widget.refresh()
             logging.debug(f"Board orientation: {'Flipped' if self.board_widget.flip_board else 'Normal'}")
 
-            # Set the board FEN from the event
-            new_fen = event.get('state', {}).get('fen') or event.get('initialFen')
-            if new_fen == "startpos":
-                new_fen = chess.STARTING_FEN
-            if new_fen:
-                self.board.set_fen(new_fen)
-                self.board_widget.update()
-                logging.debug(f"Board updated with FEN: {new_fen}")
-
-            # Process any initial moves
+            # Apply the moves played so far; a reconnect only adds the new ones
             initial_state = event.get('state', {})
-            if 'moves' in initial_state and initial_state['moves']:
-                self._process_moves(initial_state['moves'])
-
-            # Enable board only if it's our turn
-            is_our_turn = (self.board.turn == self.playing_as_white)
-            self.board_widget.setEnabled(is_our_turn)
-            logging.debug(f"Board enabled: {is_our_turn}")
+            self.sync_game(initial_state.get('moves', '').split(), event.get('initialFen', 'startpos'))
+            self.after_game_sync()
+            logging.debug(f"Board enabled: {self.board_widget.isEnabled()}")
 
         elif event_type == 'gameState':
-            new_fen = event.get('fen')
-            if new_fen:
-                self.board.set_fen(new_fen)
-                self.board_widget.update()
-                logging.debug(f"Game state updated: {new_fen}")
             if 'moves' in event:
-                moves = event['moves'].split()
-                self.move_history.setPlainText("\n".join(moves))
+                self.sync_game(event['moves'].split())
         else:
             logging.debug(f"Unhandled game event: {event}")
 
-    def _process_moves(self, moves_str: str):
-        """
-        Process a space-separated string of moves, update the board and move history.
-        """
-        if not moves_str:
-            return
-
-        moves = moves_str.split()
-        logging.debug(f"Processing moves: {moves}")
-
-        # Reset board to starting position
-        self.board.reset()
-
-        # Apply all moves
-        formatted_moves = []
-        for i, move in enumerate(moves):
-            try:
-                chess_move = chess.Move.from_uci(move)
-                self.board.push(chess_move)
-                # Format move for move history (e.g. "1. e4 e5")
-                if i % 2 == 0:
-                    formatted_moves.append(f"{i//2 + 1}. {move}")
-                else:
-                    formatted_moves[-1] = f"{formatted_moves[-1]} {move}"
-            except ValueError as e:
-                logging.error(f"Invalid move {move}: {e}")
-
-        # Update UI
-        self.board_widget.update()
-        move_history_text = "\n".join(formatted_moves)
-        self.move_history.setPlainText(move_history_text)
-        # Scroll to bottom of move history
-        self.move_history.verticalScrollBar().setValue(
-            self.move_history.verticalScrollBar().maximum()
-        )
-        logging.debug(f"Board and move history updated with moves: {moves}")
-        logging.debug(f"Move history text:\n{move_history_text}")
-
 def main():
     import os
     # If running unit tests, set headless environment variables.
@@ -757,7 +1042,8 @@ def main():
     if "PYTEST_CURRENT_TEST" in os.environ:
         os.environ["QT_QPA_PLATFORM"] = "offscreen"
 
-    app = QApplication(sys.argv)
+    with startup_profiler.phase("QApplication"):
+        app = QApplication(sys.argv)
 
     # Set Ubuntu style
     app.setStyle("Ubuntu")
@@ -767,12 +1053,15 @@ def main():
     os.environ["UBUNTU_PLATFORM_API"] = "touch"
 
     # Initialize main window
-    window = MainWindow()
-    window.show()
+    with startup_profiler.phase("MainWindow"):
+        window = MainWindow()
+    with startup_profiler.phase("show"):
+        window.show()
     logging.debug("MainWindow shown.")
-    # NEW: Print the widget tree for debugging
-    window.debug_print_widget_tree(window)
-    logging.debug("Widget tree printed.")
+    # Print the widget tree for debugging, but not while measuring startup
+    if logging.getLogger().isEnabledFor(logging.DEBUG) and startup_profiler.active() is None:
+        window.debug_print_widget_tree(window)
+        logging.debug("Widget tree printed.")
 
     return app.exec()
 
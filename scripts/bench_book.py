@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Measure opening book and opening name lookups: microseconds per probe and
+resident memory before opening, after opening and after probing.
+
+    python3 scripts/bench_book.py ~/.cache/szaszki-chess/book.bin --probes 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import chess
+from opening_book import BOOK_FILE, NAMES_FILE, OpeningBook, OpeningNames
+
+def rss_kib():
+    """Resident set size of this process from /proc, in KiB (0 where unavailable)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+def sample_positions(book, count, rng):
+    """Positions along random book lines, so most probes hit."""
+    positions = []
+    board = chess.Board()
+    while len(positions) < count:
+        positions.append(board.copy(stack=False))
+        move = book.choose(board, rng)
+        if move is None or len(board.move_stack) >= 20:
+            board = chess.Board()
+        else:
+            board.push(move)
+    return positions
+
+def timed(probe, positions):
+    started = time.perf_counter()
+    found = sum(1 for board in positions if probe(board))
+    return (time.perf_counter() - started) / len(positions) * 1e6, found
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('book', nargs='?', default=BOOK_FILE)
+    parser.add_argument('--names', default=NAMES_FILE)
+    parser.add_argument('--probes', type=int, default=10000)
+    args = parser.parse_args()
+
+    before = rss_kib()
+    book = OpeningBook(args.book)
+    opened = rss_kib()
+    print(f"{args.book}: {len(book)} entries, {os.path.getsize(args.book) / 1024:.0f} KiB on disk")
+    positions = sample_positions(book, args.probes, random.Random(1))
+    sampled = rss_kib()  # the sample positions themselves are not the book's
+    micros, found = timed(book.moves, positions)
+    print(f"book: {micros:.1f} us per probe, {found}/{len(positions)} in book")
+    names = OpeningNames.open_if_present(args.names)
+    if names is not None:
+        micros, found = timed(names.lookup, positions)
+        print(f"names: {len(names)} positions, {micros:.1f} us per lookup, {found} named")
+    after = rss_kib()
+    print(f"RSS: {before} KiB before, +{opened - before} KiB after opening, +{after - sampled} KiB while probing")
+
+if __name__ == "__main__":
+    main()
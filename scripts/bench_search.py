@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Benchmark the built-in engine: search a fixed set of positions and print
+depth, nodes, time and nodes per second for each.
+
+    python3 scripts/bench_search.py --depth 4
+    python3 scripts/bench_search.py --time 2
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import chess
+from search_engine import Searcher
+
+POSITIONS = [
+    chess.STARTING_FEN,
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N1PN2/PP2BPPP/R2QKB1R w KQ - 0 8",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1",
+]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--time', type=float, help="seconds per position instead of a fixed depth")
+    args = parser.parse_args()
+
+    total_nodes = total_seconds = 0
+    for fen in POSITIONS:
+        searcher = Searcher()  # a fresh table per position, so runs compare
+        board = chess.Board(fen)
+        if args.time:
+            result = searcher.search(board, soft=args.time / 2, hard=args.time)
+        else:
+            result = searcher.search(board, depth=args.depth)
+        total_nodes += result.nodes
+        total_seconds += result.seconds
+        print(f"{board.san(result.move):>7} depth {result.depth:2} {result.nodes:9} nodes "
+              f"{result.seconds:6.2f}s {result.nodes / max(result.seconds, 1e-6):8.0f} nps  {fen}")
+    print(f"total {total_nodes} nodes in {total_seconds:.2f}s, {total_nodes / max(total_seconds, 1e-6):.0f} nps")
+
+if __name__ == "__main__":
+    main()
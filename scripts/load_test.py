@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Offline load test: play many concurrent bot games against fake_lichess.
+
+Each game is followed through one StreamManager and moves are sent with
+LichessHandler.make_move_bot, exactly as the app does: off the stream
+thread, which must never block.  Prints the move
+round-trip histogram and how many games finished.
+
+    python3 scripts/load_test.py --games 20 --moves 15 --latency 0.05 --error-rate 0.05
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import chess
+from fake_lichess import FakeLichess
+from lichess_handler import LichessHandler
+from move_submission import backoff_delays, is_transient
+from stream_manager import StreamManager
+
+def create_game(handler, attempts=8):
+    """Start a bot game, retrying the failures the server injects."""
+    for delay in list(backoff_delays(attempts)) + [None]:
+        try:
+            return handler.create_bot_game("chessosity")
+        except Exception as e:
+            if delay is None or not is_transient(e):
+                raise
+            time.sleep(delay)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--games', type=int, default=10)
+    parser.add_argument('--moves', type=int, default=10, help="moves per game for our side")
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--drop-stream-after', type=int, default=None)
+    parser.add_argument('--senders', type=int, default=8, help="threads sending moves")
+    parser.add_argument('--base-url', default=None, help="use a running server instead of starting one")
+    parser.add_argument('--verbose', action='store_true', help="log retried failures")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.DEBUG if args.verbose else logging.CRITICAL)
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server = FakeLichess(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                             drop_stream_after=args.drop_stream_after, opponent_delay=0.01, seed=1).start()
+        base_url = server.base_url
+
+    handler = LichessHandler("load-test", base_url=base_url)
+    handler.pool_size = args.senders + 4
+    senders = ThreadPoolExecutor(args.senders)
+    if not handler.connect():
+        sys.exit("Could not reach the server")
+
+    rng = random.Random(1)
+    sent = {}  # game id -> ply last sent
+    lock = threading.Lock()
+
+    def on_event(game_id, event):
+        state = manager.game(game_id)
+        if state is None or event.get('type') not in ('gameFull', 'gameState'):
+            return
+        board = chess.Board()
+        for uci in state.moves:
+            board.push_uci(uci)
+        ply = len(board.move_stack)
+        with lock:
+            our_turn = board.turn == chess.WHITE and sent.get(game_id) != ply
+            if our_turn:
+                sent[game_id] = ply
+        if state.finished or ply >= args.moves * 2:
+            manager.close(game_id)
+        elif our_turn:
+            move = rng.choice(list(board.legal_moves))
+            senders.submit(handler.make_move_bot, move, game_id, ply)
+
+    manager = StreamManager(handler, on_event=on_event)
+    started = time.monotonic()
+    for _ in range(args.games):
+        manager.open(create_game(handler))
+
+    deadline = started + 60
+    while manager.streaming() and time.monotonic() < deadline:
+        time.sleep(0.1)
+    elapsed = time.monotonic() - started
+    manager.stop()
+    senders.shutdown()
+
+    plies = sum(len(state.moves) for state in manager.games.values())
+    print(f"{args.games} games, {plies} plies in {elapsed:.1f}s")
+    print(f"Move round trip: {handler.move_latency.summary()}")
+    if server is not None:
+        print(f"Server requests: {server.requests}")
+        server.stop()
+
+if __name__ == "__main__":
+    main()
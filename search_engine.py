@@ -0,0 +1,492 @@
+"""
+Built-in chess engine for playing without Lichess.
+
+A negamax alpha-beta search over python-chess boards (bitboards
+underneath) with iterative deepening, a transposition table, quiescence
+search on captures and move ordering by hash move, MVV-LVA, killer moves
+and history counters.  The evaluation is material plus piece-square
+tables, summed over the piece bitboards.
+
+Time is managed from the game clock: ``time_budget`` turns the remaining
+time and increment into a soft limit (do not start another iteration)
+and a hard limit (abort the running one).  Strength levels 1-8 use the
+same scale as the Lichess AI ``level`` of ``create_bot_game``: low levels
+search shallowly and pick among near-best moves at random.
+
+``ComputerPlayer`` runs searches in a separate process, so the GUI never
+waits for the engine.  With a Polyglot book (opening_book.py), positions
+in the book are answered from it without searching, and so are endings
+covered by Syzygy tablebases (tablebase.py).  ``python3 scripts/bench_search.py`` measures
+nodes per second.
+"""
+import multiprocessing
+import random
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import chess
+
+MATE = 100000
+INFINITY = 1000000
+MAX_PLY = 64
+
+# Depth limit, random spread in centipawns among root moves, share of the time budget
+SearchLevel = namedtuple("SearchLevel", ["depth", "noise", "time_share"])
+LEVELS = {
+    1: SearchLevel(1, 300, 0.1),
+    2: SearchLevel(1, 150, 0.2),
+    3: SearchLevel(2, 80, 0.3),
+    4: SearchLevel(3, 40, 0.5),
+    5: SearchLevel(4, 20, 0.7),
+    6: SearchLevel(5, 0, 1.0),
+    7: SearchLevel(7, 0, 1.0),
+    8: SearchLevel(MAX_PLY, 0, 1.0),
+}
+
+# Result of a search: best move (None if there is no legal move), score in
+# centipawns for the side to move, completed depth, nodes, seconds, principal variation
+SearchResult = namedtuple("SearchResult", ["move", "score", "depth", "nodes", "seconds", "pv"])
+
+PIECE_VALUES = {chess.PAWN: 100, chess.KNIGHT: 320, chess.BISHOP: 330, chess.ROOK: 500, chess.QUEEN: 900, chess.KING: 0}
+
+# Piece-square tables from white's side, rank 8 first (as printed on a diagram)
+PST = {
+    chess.PAWN: [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        50, 50, 50, 50, 50, 50, 50, 50,
+        10, 10, 20, 30, 30, 20, 10, 10,
+        5, 5, 10, 25, 25, 10, 5, 5,
+        0, 0, 0, 20, 20, 0, 0, 0,
+        5, -5, -10, 0, 0, -10, -5, 5,
+        5, 10, 10, -20, -20, 10, 10, 5,
+        0, 0, 0, 0, 0, 0, 0, 0],
+    chess.KNIGHT: [
+        -50, -40, -30, -30, -30, -30, -40, -50,
+        -40, -20, 0, 0, 0, 0, -20, -40,
+        -30, 0, 10, 15, 15, 10, 0, -30,
+        -30, 5, 15, 20, 20, 15, 5, -30,
+        -30, 0, 15, 20, 20, 15, 0, -30,
+        -30, 5, 10, 15, 15, 10, 5, -30,
+        -40, -20, 0, 5, 5, 0, -20, -40,
+        -50, -40, -30, -30, -30, -30, -40, -50],
+    chess.BISHOP: [
+        -20, -10, -10, -10, -10, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 10, 10, 5, 0, -10,
+        -10, 5, 5, 10, 10, 5, 5, -10,
+        -10, 0, 10, 10, 10, 10, 0, -10,
+        -10, 10, 10, 10, 10, 10, 10, -10,
+        -10, 5, 0, 0, 0, 0, 5, -10,
+        -20, -10, -10, -10, -10, -10, -10, -20],
+    chess.ROOK: [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        5, 10, 10, 10, 10, 10, 10, 5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        0, 0, 0, 5, 5, 0, 0, 0],
+    chess.QUEEN: [
+        -20, -10, -10, -5, -5, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 5, 5, 5, 0, -10,
+        -5, 0, 5, 5, 5, 5, 0, -5,
+        0, 0, 5, 5, 5, 5, 0, -5,
+        -10, 5, 5, 5, 5, 5, 0, -10,
+        -10, 0, 5, 0, 0, 0, 0, -10,
+        -20, -10, -10, -5, -5, -10, -10, -20],
+    chess.KING: [
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -20, -30, -30, -40, -40, -30, -30, -20,
+        -10, -20, -20, -20, -20, -20, -20, -10,
+        20, 20, 0, 0, 0, 0, 20, 20,
+        20, 30, 10, 0, 0, 10, 30, 20],
+}
+KING_ENDGAME = [
+    -50, -40, -30, -20, -20, -30, -40, -50,
+    -30, -20, -10, 0, 0, -10, -20, -30,
+    -30, -10, 20, 30, 30, 20, -10, -30,
+    -30, -10, 30, 40, 40, 30, -10, -30,
+    -30, -10, 30, 40, 40, 30, -10, -30,
+    -30, -10, 20, 30, 30, 20, -10, -30,
+    -30, -30, 0, 0, 0, 0, -30, -30,
+    -50, -30, -30, -30, -30, -30, -30, -50]
+ENDGAME_MATERIAL = 1300  # non-pawn material of both sides at or below which kings centralize
+
+def _square_values(table, value):
+    """Per-square value for each color, indexed by chess square (a1 = 0)."""
+    white = [value + table[(7 - chess.square_rank(sq)) * 8 + chess.square_file(sq)] for sq in chess.SQUARES]
+    black = [value + table[chess.square_rank(sq) * 8 + chess.square_file(sq)] for sq in chess.SQUARES]
+    return {chess.WHITE: white, chess.BLACK: black}
+
+SQUARE_VALUES = {pt: _square_values(PST[pt], PIECE_VALUES[pt]) for pt in PST}
+KING_ENDGAME_VALUES = _square_values(KING_ENDGAME, 0)
+
+def _sum_squares(bb, values):
+    total = 0
+    while bb:
+        low = bb & -bb
+        total += values[low.bit_length() - 1]
+        bb ^= low
+    return total
+
+def evaluate(board):
+    """Static evaluation in centipawns from the side to move's point of view."""
+    occupied = board.occupied_co
+    pieces = ((chess.PAWN, board.pawns), (chess.KNIGHT, board.knights), (chess.BISHOP, board.bishops),
+              (chess.ROOK, board.rooks), (chess.QUEEN, board.queens))
+    heavy = ((board.knights | board.bishops).bit_count() * 325 + board.rooks.bit_count() * 500
+             + board.queens.bit_count() * 900)
+    king_values = KING_ENDGAME_VALUES if heavy <= ENDGAME_MATERIAL else SQUARE_VALUES[chess.KING]
+    score = 0
+    for color, sign in ((chess.WHITE, 1), (chess.BLACK, -1)):
+        mine = occupied[color]
+        side = _sum_squares(board.kings & mine, king_values[color])
+        for piece_type, bb in pieces:
+            side += _sum_squares(bb & mine, SQUARE_VALUES[piece_type][color])
+        score += sign * side
+    return score if board.turn == chess.WHITE else -score
+
+def time_budget(remaining, increment=0.0, moves_to_go=30):
+    """
+    ``(soft, hard)`` seconds for one move with ``remaining`` seconds on the
+    clock: no new iteration starts after ``soft``, the search stops at ``hard``.
+    """
+    if remaining is None:
+        return None, None
+    reserve = min(1.0, remaining * 0.1)  # never flag on latency
+    usable = max(0.01, remaining - reserve)
+    soft = min(usable, usable / moves_to_go + increment * 0.8)
+    hard = min(usable, soft * 4)
+    return soft, hard
+
+class SearchTimeout(Exception):
+    pass
+
+# Transposition table entry flags
+EXACT, LOWER, UPPER = 0, 1, 2
+
+class Searcher:
+    """
+    One search thread's state.  The transposition table and history counters
+    persist between searches, so a game's searches reuse each other's work.
+    """
+
+    def __init__(self, tt_size=1 << 18):
+        self.tt_size = tt_size
+        self.tt = {}  # transposition key -> (depth, flag, score, move)
+        self.history = {}
+        self.killers = [[None, None] for _ in range(MAX_PLY + 1)]
+        self.nodes = 0
+        self.deadline = None
+        self.node_limit = None
+
+    def clear(self):
+        self.tt.clear()
+        self.history.clear()
+        self.killers = [[None, None] for _ in range(MAX_PLY + 1)]
+
+    def search(self, board, depth=MAX_PLY, soft=None, hard=None, nodes=None, noise=0, rng=random):
+        """
+        Iteratively deepen up to ``depth``.  ``soft``/``hard`` are seconds
+        (see ``time_budget``), ``nodes`` a node budget.  With ``noise``, the
+        move is picked at random among root moves scoring within ``noise``
+        centipawns of the best.
+        """
+        started = time.monotonic()
+        self.deadline = started + hard if hard else None
+        self.node_limit = nodes
+        self.nodes = 0
+        self.killers = [[None, None] for _ in range(MAX_PLY + 1)]
+        if len(self.tt) > self.tt_size:
+            self.tt.clear()
+        # Earlier positions since the last irreversible move, for repetitions
+        probe = board.copy()
+        self.path = []
+        for _ in range(min(probe.halfmove_clock, len(probe.move_stack))):
+            probe.pop()
+            self.path.append(probe._transposition_key())
+        self.path.reverse()
+
+        root = board.copy(stack=False)
+        root_key = root._transposition_key()
+        root_moves = list(root.legal_moves)
+        if not root_moves:
+            return SearchResult(None, -MATE if root.is_check() else 0, 0, 0, 0.0, [])
+        best, score, completed = None, 0, 0
+        for d in range(1, depth + 1):
+            try:
+                score = self._negamax(root.copy(stack=False), d, -INFINITY, INFINITY, 0)
+            except SearchTimeout:
+                break
+            completed = d
+            best = self.tt[root_key][3]
+            if soft is not None and time.monotonic() - started >= soft:
+                break
+            if abs(score) >= MATE - MAX_PLY or len(root_moves) == 1:
+                break  # mate found or the move is forced
+        if best is None:
+            # Out of time before depth 1 finished: take the best-ordered move
+            best = self._ordered(root, None, 0)[0]
+        if noise and completed:
+            best = self._noisy_choice(root, completed, best, score, noise, rng)
+        return SearchResult(best, score, completed, self.nodes, time.monotonic() - started,
+                            self.principal_variation(root, best))
+
+    def _noisy_choice(self, root, depth, best, best_score, noise, rng):
+        """A random root move scoring within ``noise`` of the best (weaker levels)."""
+        candidates = [best]
+        # A timeout leaves moves pushed inside _negamax, so never search on root itself
+        board = root.copy(stack=False)
+        try:
+            for move in list(board.legal_moves):
+                if move == best:
+                    continue
+                board.push(move)
+                try:
+                    score = -self._negamax(board, depth - 1, -INFINITY, INFINITY, 1)
+                finally:
+                    board.pop()
+                if score >= best_score - noise:
+                    candidates.append(move)
+        except SearchTimeout:
+            pass
+        return rng.choice(candidates)
+
+    def principal_variation(self, board, first):
+        board = board.copy(stack=False)
+        pv = []
+        move = first
+        while move is not None and move in board.legal_moves and len(pv) < MAX_PLY:
+            pv.append(move)
+            board.push(move)
+            entry = self.tt.get(board._transposition_key())
+            move = entry[3] if entry else None
+            if board.is_repetition(2):
+                break
+        return pv
+
+    def _check_limits(self):
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise SearchTimeout()
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            raise SearchTimeout()
+
+    def _ordered(self, board, tt_move, ply):
+        killers = self.killers[min(ply, MAX_PLY)]
+        history = self.history
+        piece_type_at = board.piece_type_at
+        scored = []
+        for move in board.legal_moves:
+            if move == tt_move:
+                order = 10000000
+            elif board.is_capture(move):
+                # MVV-LVA; en passant leaves the target square empty
+                victim = piece_type_at(move.to_square) or chess.PAWN
+                order = 1000000 + 10 * victim - piece_type_at(move.from_square)
+            elif move.promotion:
+                order = 900000 + move.promotion
+            elif move == killers[0] or move == killers[1]:
+                order = 800000
+            else:
+                order = history.get((move.from_square, move.to_square), 0)
+            scored.append((order, move))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [move for _, move in scored]
+
+    def _negamax(self, board, depth, alpha, beta, ply):
+        self.nodes += 1
+        if not self.nodes & 1023:
+            self._check_limits()
+        key = board._transposition_key()
+        if ply and (key in self.path or board.halfmove_clock >= 100):
+            return 0
+        in_check = board.is_check()
+        if in_check and ply < MAX_PLY:
+            depth += 1
+        if depth <= 0 or ply >= MAX_PLY:
+            return self._quiesce(board, alpha, beta, ply)
+
+        original_alpha = alpha
+        tt_move = None
+        entry = self.tt.get(key)
+        if entry is not None:
+            entry_depth, flag, entry_score, tt_move = entry
+            if ply and entry_depth >= depth:
+                entry_score = _from_tt(entry_score, ply)
+                if flag == EXACT:
+                    return entry_score
+                if flag == LOWER and entry_score >= beta:
+                    return entry_score
+                if flag == UPPER and entry_score <= alpha:
+                    return entry_score
+
+        moves = self._ordered(board, tt_move, ply)
+        if not moves:
+            return -MATE + ply if in_check else 0
+
+        best_score, best_move = -INFINITY, None
+        self.path.append(key)
+        try:
+            for index, move in enumerate(moves):
+                board.push(move)
+                if index == 0:
+                    score = -self._negamax(board, depth - 1, -beta, -alpha, ply + 1)
+                else:
+                    # Principal variation search: prove the move is worse with a null window
+                    score = -self._negamax(board, depth - 1, -alpha - 1, -alpha, ply + 1)
+                    if alpha < score < beta:
+                        score = -self._negamax(board, depth - 1, -beta, -score, ply + 1)
+                board.pop()
+                if score > best_score:
+                    best_score, best_move = score, move
+                if score > alpha:
+                    alpha = score
+                if alpha >= beta:
+                    if not board.is_capture(move):
+                        killers = self.killers[ply]
+                        if killers[0] != move:
+                            killers[1], killers[0] = killers[0], move
+                        square_pair = (move.from_square, move.to_square)
+                        self.history[square_pair] = self.history.get(square_pair, 0) + depth * depth
+                    break
+        finally:
+            self.path.pop()
+
+        if best_score <= original_alpha:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt[key] = (depth, flag, _to_tt(best_score, ply), best_move)
+        return best_score
+
+    def _quiesce(self, board, alpha, beta, ply):
+        self.nodes += 1
+        if not self.nodes & 1023:
+            self._check_limits()
+        stand_pat = evaluate(board)
+        if stand_pat >= beta or ply >= MAX_PLY:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+        piece_type_at = board.piece_type_at
+        captures = sorted(board.generate_legal_captures(),
+                          key=lambda m: 10 * (piece_type_at(m.to_square) or chess.PAWN) - piece_type_at(m.from_square),
+                          reverse=True)
+        for move in captures:
+            board.push(move)
+            score = -self._quiesce(board, -beta, -alpha, ply + 1)
+            board.pop()
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+        return alpha
+
+def _to_tt(score, ply):
+    """Mate scores are stored relative to the node, not the root."""
+    if score >= MATE - MAX_PLY:
+        return score + ply
+    if score <= -MATE + MAX_PLY:
+        return score - ply
+    return score
+
+def _from_tt(score, ply):
+    if score >= MATE - MAX_PLY:
+        return score - ply
+    if score <= -MATE + MAX_PLY:
+        return score + ply
+    return score
+
+DEFAULT_MOVE_TIME = 2.0  # seconds per move without a clock
+
+_searcher = None  # one per worker process, kept between moves
+_books = {}  # path -> OpeningBook (or None if it cannot be opened), per worker process
+_tablebases = {}  # directories -> Tablebase (or None), per worker process
+
+TABLEBASE_SCORES = {2: 20000, 1: 0, 0: 0, -1: 0, -2: -20000}
+
+def _book_move(path, board, rng):
+    if path not in _books:
+        from opening_book import OpeningBook
+        _books[path] = OpeningBook.open_if_present(path)
+    book = _books[path]
+    return book.choose(board, rng) if book is not None else None
+
+def _tablebase_move(paths, board):
+    if paths not in _tablebases:
+        from tablebase import Tablebase
+        _tablebases[paths] = Tablebase.open_if_present(list(paths))
+    tablebase = _tablebases[paths]
+    if tablebase is None or not tablebase.covers(board):
+        return None, None
+    return tablebase.best_move(board), tablebase.probe(board)
+
+def choose_move(root_fen, moves, level=8, remaining=None, increment=0.0, seed=None, book=None, tablebase=None):
+    """
+    Pick a move for the position after ``moves`` (UCI) from ``root_fen``,
+    from the Polyglot ``book`` (a path) when the position is in it, or
+    from the Syzygy tables in the ``tablebase`` directories.
+    Runs in the worker process; returns a SearchResult.
+    """
+    global _searcher
+    if _searcher is None:
+        _searcher = Searcher()
+    started = time.monotonic()
+    board = chess.Board(root_fen)
+    for uci in moves:
+        board.push_uci(uci)
+    rng = random.Random(seed)
+    if book:
+        move = _book_move(book, board, rng)
+        if move is not None:
+            return SearchResult(move, 0, 0, 0, time.monotonic() - started, [move])
+    if tablebase:
+        move, result = _tablebase_move(tuple(tablebase), board)
+        if move is not None and result is not None:
+            return SearchResult(move, TABLEBASE_SCORES[result.wdl], 0, 0, time.monotonic() - started, [move])
+    settings = LEVELS[max(1, min(8, int(level)))]
+    if remaining is None:
+        soft, hard = DEFAULT_MOVE_TIME / 2, DEFAULT_MOVE_TIME
+    else:
+        soft, hard = time_budget(remaining, increment)
+    return _searcher.search(board, settings.depth, soft * settings.time_share, hard * settings.time_share,
+                            noise=settings.noise, rng=rng)
+
+class ComputerPlayer:
+    """
+    Runs ``choose_move`` in a separate process and hands back futures, so
+    a search never blocks the GUI.  The process starts on first use.
+    """
+
+    def __init__(self):
+        self._executor = None
+
+    def _pool(self):
+        if self._executor is None:
+            # spawn: forking the GUI process while its threads run is unsafe
+            self._executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def warm_up(self):
+        """Start the worker process ahead of the first move."""
+        self._pool().submit(int)
+
+    def play(self, board, level, remaining=None, increment=0.0, book=None, tablebase=None):
+        """
+        Future resolving to the SearchResult for ``board``; ``book`` is a
+        Polyglot file, ``tablebase`` a list of Syzygy directories.
+        """
+        return self._pool().submit(choose_move, board.root().fen(), [move.uci() for move in board.move_stack],
+                                   level, remaining, increment, book=book, tablebase=tablebase)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
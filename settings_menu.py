@@ -1,6 +1,7 @@
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QComboBox, QCheckBox, QPushButton, QLabel, QSpinBox
 from PyQt6.QtGui import QFont
 from PyQt6.QtCore import pyqtSignal
+from layout_compiler import default_store
 
 class SettingsMenu(QWidget):
     settingsChanged = pyqtSignal(str, bool, int)  # (layout, fullscreen, clock_time)
@@ -17,13 +18,7 @@ class SettingsMenu(QWidget):
 
         self.resolution_combo = QComboBox()
         self.resolution_combo.setFont(QFont("Palatino", 12))
-        self.resolutions = [
-            "layout_1920x1440_horizontal",
-            "layout_1920x1080_horizontal",
-            "layout_1440x1920_vertical",
-            "layout_2220x1080_horizontal",
-            "layout_1080x2220_vertical"
-        ]
+        self.resolutions = default_store().names()
         self.resolution_combo.addItems(self.resolutions)
         self.layout.addWidget(self.resolution_combo)
 
@@ -0,0 +1,109 @@
+"""
+Startup profiling for ``qt.py --profile-startup``.
+
+Records how long top-level imports take, how long each construction phase
+of the main window takes and when the first frame is painted, then prints
+a per-phase report.  When profiling is not enabled every hook is a no-op,
+so the instrumentation can stay in place on the normal startup path.
+"""
+import builtins
+import contextlib
+import sys
+import threading
+import time
+
+FLAG = "--profile-startup"
+
+_profiler = None
+
+class StartupProfiler:
+    def __init__(self, started=None):
+        self.started = started if started is not None else time.perf_counter()
+        self.imports = []  # (module, seconds), outermost imports only
+        self.phases = []  # (phase, seconds)
+        self.first_paint = None  # seconds since start
+        self._original_import = None
+        self._local = threading.local()  # import nesting depth per thread
+
+    def install_import_hook(self):
+        """Time every import of a module that is not loaded yet."""
+        if self._original_import is not None:
+            return
+        self._original_import = original = builtins.__import__
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level or name in sys.modules:
+                return original(name, globals, locals, fromlist, level)
+            depth = getattr(self._local, 'depth', 0)
+            self._local.depth = depth + 1
+            started = time.perf_counter()
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                self._local.depth = depth
+                # Nested imports are included in their importer's time
+                if depth == 0:
+                    self.imports.append((name, time.perf_counter() - started))
+
+        builtins.__import__ = timed_import
+
+    def remove_import_hook(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
+
+    def mark_first_paint(self):
+        if self.first_paint is None:
+            self.first_paint = time.perf_counter() - self.started
+            self.remove_import_hook()
+            return True
+        return False
+
+    def report(self):
+        lines = ["Startup profile:"]
+        import_total = sum(seconds for _, seconds in self.imports)
+        lines.append(f"  imports{import_total * 1000:>30.1f} ms")
+        for name, seconds in sorted(self.imports, key=lambda item: -item[1]):
+            lines.append(f"    {name:<30}{seconds * 1000:>7.1f} ms")
+        for name, seconds in self.phases:
+            lines.append(f"  {name:<35}{seconds * 1000:>7.1f} ms")
+        if self.first_paint is not None:
+            lines.append(f"  {'first paint (since start)':<35}{self.first_paint * 1000:>7.1f} ms")
+        return "\n".join(lines)
+
+
+def enable(started=None):
+    """Start profiling; call before the imports that should be measured."""
+    global _profiler
+    if _profiler is None:
+        _profiler = StartupProfiler(started)
+        _profiler.install_import_hook()
+    return _profiler
+
+def enable_from_argv(argv, started=None):
+    """Enable profiling when ``--profile-startup`` is on the command line."""
+    if FLAG in argv:
+        return enable(started)
+    return None
+
+def active():
+    return _profiler
+
+def phase(name):
+    """Context manager timing one startup phase (no-op unless profiling)."""
+    if _profiler is None:
+        return contextlib.nullcontext()
+    return _profiler.phase(name)
+
+def first_paint():
+    """Record the first painted frame and print the report once."""
+    if _profiler is not None and _profiler.mark_first_paint():
+        print(_profiler.report(), file=sys.stderr)
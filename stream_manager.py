@@ -0,0 +1,219 @@
+"""
+Event routing for any number of concurrent Lichess games.
+
+The account event stream is read once.  A ``gameStart`` opens that game's
+own stream, and each game event first updates the game's GameState and is
+then passed on together with its game id.  Nothing here is tied to a single
+"current" game, so bot and correspondence games can stay open side by side.
+
+Every stream is a task on one asyncio event loop, run by a single thread,
+so a game waiting days for a correspondence move costs an idle connection
+and no thread.
+"""
+import asyncio
+import logging
+import threading
+from move_submission import backoff_delays
+
+# Lichess game statuses while a game is still being played
+ACTIVE_STATUSES = {'created', 'started'}
+
+class GameState:
+    """Everything known about one game, kept current from its stream."""
+
+    def __init__(self, game_id):
+        self.game_id = game_id
+        self.white = {}
+        self.black = {}
+        self.initial_fen = 'startpos'
+        self.moves = []
+        self.status = 'created'
+        self.chat = []
+        self.events = 0
+
+    @property
+    def finished(self):
+        return self.status not in ACTIVE_STATUSES
+
+    def apply(self, event):
+        kind = event.get('type')
+        state = None
+        if kind == 'gameFull':
+            self.white = event.get('white', {})
+            self.black = event.get('black', {})
+            self.initial_fen = event.get('initialFen', 'startpos')
+            state = event.get('state', {})
+        elif kind == 'gameState':
+            state = event
+        elif kind == 'chatLine':
+            self.chat.append(event)
+        if state is not None:
+            self.moves = state.get('moves', '').split()
+            self.status = state.get('status', self.status)
+        self.events += 1
+
+
+class StreamManager:
+    """
+    Multiplexes the account stream and per-game streams onto callbacks.
+
+    ``on_event(game_id, event)`` is called on the stream thread for every
+    event, so it must not block; ``game_id`` is None for account events
+    that belong to no game (challenges).  Game streams are opened on
+    demand and all of them are read at the same time.  The handler's
+    ``stream_incoming_events`` and ``open_game_stream`` return async
+    iterators.
+    """
+
+    def __init__(self, handler, on_event=None, open_attempts=5, reopen_delay=1.0):
+        self.handler = handler
+        self.on_event = on_event
+        self.open_attempts = open_attempts
+        self.reopen_delay = reopen_delay  # after Lichess ends the account stream
+        self.games = {}  # game id -> GameState
+        self._lock = threading.Lock()
+        self._tasks = {}  # game id -> its reading task, None until the loop starts it
+        self._incoming = None
+        self._stopped = False
+        self._loop = None
+        self._thread = None
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._run, name="lichess-streams", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def _run(self):
+        self._loop.run_forever()
+        self._loop.close()
+
+    def start(self):
+        """Start reading the account event stream."""
+        self._ensure_loop().call_soon_threadsafe(self._start_incoming)
+
+    def _start_incoming(self):
+        if self._incoming is None and not self._stopped:
+            self._incoming = self._loop.create_task(self._read_incoming())
+
+    def open(self, game_id):
+        """Stream ``game_id`` unless it is streaming already; returns its GameState."""
+        loop = self._ensure_loop()
+        with self._lock:
+            state = self.games.setdefault(game_id, GameState(game_id))
+            if game_id in self._tasks or self._stopped:
+                return state
+            self._tasks[game_id] = None
+        loop.call_soon_threadsafe(self._start_game, state)
+        return state
+
+    def _start_game(self, state):
+        with self._lock:
+            # Closed again before the loop got here
+            if self._tasks.get(state.game_id, False) is not None:
+                return
+            self._tasks[state.game_id] = self._loop.create_task(self._read_game(state))
+
+    def close(self, game_id):
+        """Stop following a game; its stream is closed right away."""
+        with self._lock:
+            task = self._tasks.pop(game_id, None)
+        if task is not None:
+            self._loop.call_soon_threadsafe(task.cancel)
+
+    def stop(self):
+        """Close every stream; nothing is reopened or retried."""
+        with self._lock:
+            self._stopped = True
+            self._tasks.clear()
+            loop = self._loop
+        if loop is not None:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop)
+
+    async def _shutdown(self):
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop.stop()
+
+    def game(self, game_id):
+        return self.games.get(game_id)
+
+    def open_games(self):
+        with self._lock:
+            return [state for state in self.games.values() if not state.finished]
+
+    def streaming(self):
+        with self._lock:
+            return set(self._tasks)
+
+    def _dispatch(self, game_id, event):
+        if self.on_event is None:
+            return
+        try:
+            self.on_event(game_id, event)
+        except Exception as e:
+            logging.error(f"Game event handler failed for {game_id}: {e}")
+
+    def _route_incoming(self, event):
+        game = event.get('game') or {}
+        game_id = game.get('gameId') or game.get('id')
+        if event.get('type') == 'gameStart' and game_id:
+            self.open(game_id)
+        self._dispatch(game_id, event)
+
+    async def _read_incoming(self):
+        await self._follow(self.handler.stream_incoming_events, self._route_incoming, "account events", reopen=True)
+
+    async def _read_game(self, state):
+        game_id = state.game_id
+        task = asyncio.current_task()
+
+        def handle(event):
+            state.apply(event)
+            self._dispatch(game_id, event)
+            return state.finished
+
+        try:
+            await self._follow(lambda: self.handler.open_game_stream(game_id), handle, f"game {game_id}")
+        finally:
+            with self._lock:
+                if self._tasks.get(game_id) is task:
+                    del self._tasks[game_id]
+
+    async def _follow(self, open_stream, handle, name, reopen=False):
+        """
+        Read a stream until ``handle`` returns True or, unless ``reopen``,
+        until it ends.  Failures are retried with backoff, which also covers
+        a game stream requested before Lichess has finished creating the
+        game; every event read starts the backoff over, so only failures in
+        a row count against ``open_attempts``.  Cancelling the task closes
+        the stream at once.
+        """
+        delays = backoff_delays(self.open_attempts)
+        while True:
+            stream = None
+            try:
+                stream = open_stream()
+                async for event in stream:
+                    delays = backoff_delays(self.open_attempts)
+                    if handle(event):
+                        return
+                if not reopen:
+                    return
+                logging.debug(f"{name} stream ended, reopening")
+                await asyncio.sleep(self.reopen_delay)
+            except Exception as e:
+                delay = next(delays, None)
+                if delay is None:
+                    logging.error(f"Giving up on {name} stream: {e}")
+                    return
+                logging.warning(f"{name} stream failed, retrying in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+            finally:
+                aclose = getattr(stream, 'aclose', None)
+                if aclose is not None:
+                    await aclose()
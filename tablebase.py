@@ -0,0 +1,124 @@
+"""
+Syzygy endgame tablebases, when there are table files on disk.
+
+chess.syzygy opens a table file only when a position needs it,
+memory-maps it and keeps at most ``max_fds`` files open, closing the
+least recently used.  ``Tablebase`` adds what the app needs on top: the
+piece limit of the tables found, probe results cached per position in
+analysis_cache, and the best move picked from the DTZ of every reply.
+Positions with few pieces get exact answers this way, without a search.
+
+Tables come from https://tablebase.lichess.ovh/tables/standard/ (all
+positions with up to five pieces take about 1 GB).  Put them in
+``~/.cache/szaszki-chess/syzygy`` or list directories in ``syzygy_path``
+in config.py, separated by ``os.pathsep``.
+"""
+import logging
+import os
+from collections import namedtuple
+import chess
+import analysis_cache
+from puzzle_provider import CACHE_DIR
+
+SYZYGY_DIR = os.path.join(CACHE_DIR, "syzygy")
+MAX_FDS = 64
+
+# For the side to move: wdl 2 win, 1 win drawn by the 50-move rule, 0 draw,
+# -1 and -2 the same losses; dtz plies to the next capture or pawn move
+# (None without DTZ tables)
+TablebaseResult = namedtuple("TablebaseResult", ["wdl", "dtz"])
+
+def directories(setting=None):
+    """Tablebase directories from a ``syzygy_path`` setting, else the default one."""
+    if setting:
+        return [path for path in setting.split(os.pathsep) if path]
+    return [SYZYGY_DIR]
+
+def describe(board, result):
+    """Result for the players, e.g. "White wins (DTZ 13)"."""
+    mover, other = ("White", "Black") if board.turn == chess.WHITE else ("Black", "White")
+    text = {2: f"{mover} wins", -2: f"{other} wins"}.get(result.wdl, "Draw")
+    if result.wdl in (1, -1):
+        text += " (50-move rule)"
+    elif result.wdl and result.dtz is not None:
+        text += f" (DTZ {abs(result.dtz)})"
+    return text
+
+class Tablebase:
+    def __init__(self, paths, max_fds=MAX_FDS, cache=None):
+        import chess.syzygy  # only needed once there are tables, and slow to import
+        self._tables = chess.syzygy.Tablebase(max_fds=max_fds)
+        for path in paths:
+            self._tables.add_directory(path)
+        # "KRvKP" is a four-piece table
+        self.max_pieces = max((len(name) - 1 for name in self._tables.wdl), default=0)
+        self.cache = cache if cache is not None else analysis_cache.shared
+
+    @classmethod
+    def open_if_present(cls, paths=None, max_fds=MAX_FDS):
+        """A Tablebase over the existing ``paths`` with WDL tables, or None."""
+        paths = [path for path in (paths or directories()) if os.path.isdir(path)]
+        if not paths:
+            return None
+        try:
+            tablebase = cls(paths, max_fds)
+        except OSError as e:
+            logging.error(f"Could not read tablebases: {e}")
+            return None
+        if not tablebase.max_pieces:
+            return None
+        logging.debug(f"Syzygy tables up to {tablebase.max_pieces} pieces in {', '.join(paths)}")
+        return tablebase
+
+    def covers(self, board):
+        return chess.popcount(board.occupied) <= self.max_pieces and not board.castling_rights
+
+    def probe(self, board):
+        """TablebaseResult of ``board``, or None outside the tables."""
+        if not self.covers(board):
+            return None
+        return self.cache.get_or_compute(board, "tablebase", self._probe)
+
+    def _probe(self, board):
+        try:
+            wdl = self._tables.probe_wdl(board)
+        except KeyError as e:  # MissingTableError
+            logging.debug(f"No table for {board.fen()}: {e}")
+            return None
+        try:
+            dtz = self._tables.probe_dtz(board)
+        except KeyError:
+            dtz = None
+        return TablebaseResult(wdl, dtz)
+
+    def best_move(self, board):
+        """
+        The move that keeps the best result: a mate, else the fastest
+        capture or pawn move on the way to a win, the longest resistance
+        in a loss.  None outside the tables.
+        """
+        if not self.covers(board):
+            return None
+        board = board.copy(stack=False)
+        best, best_rank = None, None
+        for move in list(board.legal_moves):
+            zeroing = board.is_zeroing(move)
+            board.push(move)
+            try:
+                if board.is_checkmate():
+                    return move
+                reply = self.probe(board)
+            finally:
+                board.pop()
+            if reply is None:
+                return None
+            wdl = -reply.wdl
+            # The reply's dtz is negative when it loses: closer to zero is a faster win,
+            # and positive when it wins: further from zero is the longer defence
+            rank = (wdl, zeroing and wdl > 0, reply.dtz or 0)
+            if best_rank is None or rank > best_rank:
+                best, best_rank = move, rank
+        return best
+
+    def close(self):
+        self._tables.close()
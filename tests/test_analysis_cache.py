@@ -0,0 +1,86 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import chess
+import chess.engine
+from analysis_cache import AnalysisCache, Evaluation, describe, evaluation_from_info, position_key
+from move_index import IndexedBoard
+
+def board_after(*moves):
+    board = chess.Board()
+    for san in moves:
+        board.push_san(san)
+    return board
+
+def test_transpositions_share_an_entry():
+    cache = AnalysisCache()
+    cache.put(board_after("Nf3", "Nf6", "Nc3"), "eval", Evaluation(20, None, 12, ("d7d5",)))
+    assert cache.get(board_after("Nc3", "Nf6", "Nf3"), "eval").depth == 12
+    assert cache.get(board_after("Nc3", "Nf6", "Nf3"), "moves") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_least_recently_used_is_evicted():
+    cache = AnalysisCache(max_entries=2)
+    first, second, third = board_after("e4"), board_after("d4"), board_after("c4")
+    cache.put(first, "outcome", None)
+    cache.put(second, "outcome", None)
+    cache.get(first, "outcome")
+    cache.put(third, "outcome", None)
+    assert len(cache) == 2
+    assert cache.get(second, "outcome", "gone") == "gone"
+    assert cache.get(first, "outcome", "gone") is None
+
+def test_memory_bound():
+    cache = AnalysisCache(max_bytes=20000)
+    board = chess.Board()
+    for move in list(board.legal_moves):
+        board.push(move)
+        cache.get_or_compute(board, "moves", lambda b: list(b.legal_moves))
+        board.pop()
+    assert 0 < cache.bytes <= 20000
+    assert len(cache) < 20
+
+def test_keeps_the_deeper_evaluation():
+    cache = AnalysisCache()
+    board = chess.Board()
+    cache.store_evaluation(board, Evaluation(30, None, 18, ("e2e4",)))
+    cache.store_evaluation(board, Evaluation(10, None, 6, ("d2d4",)))
+    assert cache.evaluation(board).pv == ("e2e4",)
+    assert cache.evaluation(board, min_depth=20) is None
+
+def test_evaluations_persist(tmp_path):
+    path = str(tmp_path / "analysis.json")
+    cache = AnalysisCache(path=path)
+    cache.store_evaluation(board_after("e4"), Evaluation(None, -3, 22, ("c7c5", "g1f3")))
+    cache.get_or_compute(board_after("d4"), "moves", lambda b: list(b.legal_moves))
+    cache.save()
+    loaded = AnalysisCache(path=path)
+    assert len(loaded) == 1
+    assert loaded.evaluation(board_after("e4")) == Evaluation(None, -3, 22, ("c7c5", "g1f3"))
+
+def test_indexed_board_reuses_move_index():
+    board = IndexedBoard()
+    board.push_san("e4")
+    index = board.move_index
+    assert board.zobrist == position_key(chess.Board(board.fen()))
+    board.pop()
+    board.push_san("e4")
+    assert board.move_index is index
+
+def test_outcome_is_cached_per_position():
+    cache = AnalysisCache()
+    board = board_after("f3", "e5", "g4", "Qh4#")
+    assert cache.outcome(board).winner == chess.BLACK
+    assert cache.outcome(chess.Board()) is None
+    assert cache.get(chess.Board(), "outcome", "missing") is None
+
+def test_evaluation_from_engine_info():
+    board = board_after("e4")
+    info = {'score': chess.engine.PovScore(chess.engine.Cp(-35), chess.BLACK), 'depth': 14,
+            'pv': [chess.Move.from_uci("c7c5"), chess.Move.from_uci("g1f3")]}
+    evaluation = evaluation_from_info(info)
+    assert evaluation == Evaluation(35, None, 14, ("c7c5", "g1f3"))
+    assert describe(board, evaluation) == "1...c5 2. Nf3 (+0.35, depth 14)"
+    assert evaluation_from_info({'depth': 3}) is None
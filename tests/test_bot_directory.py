@@ -0,0 +1,86 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bot_directory import BotDirectory, BotIndex, describe, perf_for
+
+def make_bot(name, title='BOT', **ratings):
+    return {'id': name.lower(), 'username': name, 'title': title,
+            'perfs': {perf: {'games': 10, 'rating': rating} for perf, rating in ratings.items()}}
+
+BOTS = [
+    make_bot("Alpha", blitz=1200, rapid=1300),
+    make_bot("Beta", blitz=1800),
+    make_bot("Gamma", bullet=2200, blitz=2100),
+    make_bot("Human", title=None, blitz=1500),
+]
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_perf_for_time_controls():
+    assert perf_for('0.25+0') == 'ultraBullet'
+    assert perf_for('0+1') == 'bullet'
+    assert perf_for('1+0') == 'bullet'
+    assert perf_for('5+0') == 'blitz'
+    assert perf_for('3+2') == 'blitz'
+    assert perf_for('10+5') == 'rapid'
+    assert perf_for('30+20') == 'classical'
+
+def test_index_filters_by_rating_time_control_and_title():
+    index = BotIndex(BOTS)
+    names = lambda bots: [bot['username'] for bot in bots]
+    assert names(index.find()) == ["Alpha", "Beta", "Gamma", "Human"]
+    assert names(index.find(time_control='5+0', min_rating=1500)) == ["Human", "Beta", "Gamma"]
+    assert names(index.find(perf='blitz', max_rating=1800, title='BOT')) == ["Alpha", "Beta"]
+    assert names(index.find(time_control='10+0')) == ["Alpha"]
+    assert index.closest('5+0', 1700)['username'] == "Beta"
+    assert index.closest('1+0', 0)['username'] == "Gamma"
+    assert index.closest('30+0', 1500) is None
+    assert describe(BOTS[0]) == "Alpha (BOT): blitz 1200, rapid 1300"
+
+def test_directory_serves_cache_and_refreshes_when_stale():
+    clock = Clock()
+    fetches = []
+    scheduled = []
+
+    def fetch():
+        fetches.append(clock.now)
+        yield from BOTS[:len(fetches) + 1]
+
+    directory = BotDirectory(fetch, ttl=60, submit=scheduled.append, clock=clock)
+    assert directory.find() == []  # nothing yet: answered at once, refresh scheduled
+    directory.find()
+    assert len(scheduled) == 1
+    scheduled.pop()()
+    assert len(directory.find()) == 2
+    clock.now = 61
+    assert len(directory.find()) == 2  # stale copy still served
+    scheduled.pop()()
+    assert len(directory.find()) == 3
+    assert fetches == [0, 61]
+
+def test_failed_refresh_keeps_old_index_and_waits():
+    clock = Clock()
+    scheduled = []
+    results = [BOTS, ConnectionError("offline")]
+
+    def fetch():
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return iter(result)
+
+    directory = BotDirectory(fetch, ttl=10, submit=scheduled.append, clock=clock, retry_after=30)
+    directory.refresh()
+    clock.now = 11
+    directory.index()
+    assert not scheduled.pop()()
+    assert len(directory.find()) == 4
+    clock.now = 20
+    directory.index()
+    assert not scheduled  # still within retry_after
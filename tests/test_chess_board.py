@@ -16,6 +16,9 @@ class TestChessBoard(unittest.TestCase):
         
         class MockMainWindow:
             def __init__(self):
+                self.playing_as_white = True
+                self.playing_vs_bot = False
+                self.playing_vs_computer = False
                 self.solving_puzzle = False
                 self.allowed_moves = None
                 self.move_list = []
@@ -26,10 +29,15 @@ class TestChessBoard(unittest.TestCase):
             def switch_turn(self):
                 # Stub method to simulate switching turn.
                 pass
+
+            def check_game_result(self):
+                pass
         
         self.main_window = MockMainWindow()
         self.widget = ChessBoardWidget(self.board, self.main_window)
+        self.widget.setFixedSize(640, 640)
         self.widget.show()
+        QTest.qWaitForWindowExposed(self.widget)
 
     def test_square_selection(self):
         square_size = self.widget.width() // 8
@@ -52,6 +60,52 @@ class TestChessBoard(unittest.TestCase):
         QTest.mouseClick(self.widget, Qt.MouseButton.LeftButton, pos=QPoint(4 * square_size, 3 * square_size))
         self.assertEqual(self.board.fen(), initial_position)
 
+    def test_promotion_uses_picker(self):
+        self.board.set_fen("8/4P3/8/8/8/8/k7/4K3 w - - 0 1")
+        offered = []
+        def choose(moves):
+            offered.extend(moves)
+            return next(m for m in moves if m.promotion == chess.KNIGHT)
+        self.widget.choose_promotion = choose
+        square_size = self.widget.width() // 8
+        QTest.mouseClick(self.widget, Qt.MouseButton.LeftButton, pos=QPoint(4 * square_size, 1 * square_size))
+        QTest.mouseClick(self.widget, Qt.MouseButton.LeftButton, pos=QPoint(4 * square_size, 0))
+        self.assertEqual(len(offered), 4)
+        self.assertEqual(self.board.piece_at(chess.E8).symbol(), 'N')
+
+    def test_full_repaint_touches_all_squares(self):
+        self.widget.update()
+        QApplication.processEvents()
+        self.assertEqual(self.widget.renderer.last_repaint_squares, 64)
+
+    def test_selection_repaints_only_affected_squares(self):
+        QApplication.processEvents()
+        square_size = self.widget.width() // 8
+        QTest.mouseClick(self.widget, Qt.MouseButton.LeftButton, pos=QPoint(4 * square_size, 6 * square_size))
+        QApplication.processEvents()
+        # e2 plus its two destination squares e3 and e4
+        self.assertEqual(self.widget.renderer.last_repaint_squares, 3)
+
+    def test_move_repaints_only_changed_squares(self):
+        QApplication.processEvents()
+        self.board.push_uci("g1f3")
+        self.widget.refresh()
+        QApplication.processEvents()
+        self.assertEqual(self.widget.renderer.last_repaint_squares, 2)
+
+    def test_atlas_rebuilt_only_on_resize(self):
+        QApplication.processEvents()
+        builds = self.widget.atlas.rebuild_count
+        self.widget.update()
+        QApplication.processEvents()
+        self.assertEqual(self.widget.atlas.rebuild_count, builds)
+        self.widget.setFixedSize(480, 480)
+        self.widget.update()
+        QApplication.processEvents()
+        self.assertEqual(self.widget.atlas.rebuild_count, builds + 1)
+        sprite = self.widget.atlas.sprite(chess.Piece(chess.KING, chess.WHITE))
+        self.assertEqual(sprite.width(), round(60 * sprite.devicePixelRatio()))
+
     def tearDown(self):
         self.board.reset()
         self.widget.close()
@@ -0,0 +1,84 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import time
+import chess
+import pytest
+from engine_pool import EnginePool
+
+STUB = [sys.executable, os.path.join(os.path.dirname(__file__), "uci_stub.py")]
+
+class Recorder:
+    def __init__(self):
+        self.infos = []
+        self.done = threading.Event()
+
+    def on_info(self, request, info):
+        self.infos.append(info)
+
+    def on_done(self, request):
+        self.done.set()
+
+@pytest.fixture
+def pool():
+    pool = EnginePool(STUB, size=2).start()
+    yield pool
+    pool.stop()
+
+def test_streams_lines_until_depth(pool):
+    recorder = Recorder()
+    board = chess.Board()
+    board.push_san("e4")
+    request = pool.analyse(board, depth=3, on_info=recorder.on_info, on_done=recorder.on_done)
+    board.push_san("e5")  # the request works on its own copy
+    assert recorder.done.wait(10)
+    assert [info['depth'] for info in recorder.infos] == [1, 2, 3]
+    assert request.best_move() in request.board.legal_moves
+    # Scores are shown from white's side; the stub scores for the side to move
+    assert request.line() == "1...a5 2. a3 a4 (-0.30, depth 3)"
+    assert request.error is None and not request.cancelled
+
+def test_cancel_stops_search(pool):
+    recorder = Recorder()
+    request = pool.analyse(chess.Board(), on_info=recorder.on_info, on_done=recorder.on_done)
+    while not recorder.infos:
+        time.sleep(0.01)
+    started = time.monotonic()
+    request.cancel()
+    assert recorder.done.wait(5)
+    assert time.monotonic() - started < 1
+    assert request.cancelled
+
+def test_same_key_replaces_running_request(pool):
+    first, second = Recorder(), Recorder()
+    old = pool.analyse(chess.Board(), key='hint', on_info=first.on_info, on_done=first.on_done)
+    while not first.infos:
+        time.sleep(0.01)
+    new = pool.analyse(chess.Board(), depth=2, key='hint', on_info=second.on_info, on_done=second.on_done)
+    assert first.done.wait(5) and second.done.wait(5)
+    assert old.cancelled and not new.cancelled
+    assert second.infos[-1]['depth'] == 2
+
+def test_engines_search_in_parallel(pool):
+    recorders = [Recorder(), Recorder()]
+    requests = [pool.analyse(chess.Board(), on_info=r.on_info, on_done=r.on_done) for r in recorders]
+    deadline = time.monotonic() + 10
+    while not all(r.infos for r in recorders):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    for request in requests:
+        request.cancel()
+    assert all(r.done.wait(5) for r in recorders)
+
+def test_crashed_engine_reports_error_and_restarts():
+    pool = EnginePool(STUB + ["--crash-on-go"], size=1, timeout=5).start()
+    try:
+        for _ in range(2):
+            recorder = Recorder()
+            request = pool.analyse(chess.Board(), depth=1, on_done=recorder.on_done)
+            assert recorder.done.wait(10)
+            assert request.error is not None
+    finally:
+        pool.stop()
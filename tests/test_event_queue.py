@@ -0,0 +1,58 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+from event_queue import GameEventQueue
+
+def state(moves):
+    return {'type': 'gameState', 'moves': moves}
+
+def test_game_states_coalesce_per_game(qapp):
+    queue = GameEventQueue()
+    queue.put("g1", state("e2e4"))
+    queue.put("g2", state("d2d4"))
+    queue.put("g1", state("e2e4 e7e5"))
+    queue.put("g1", {'type': 'chatLine', 'text': 'hi'})
+    queue.put("g1", state("e2e4 e7e5 g1f3"))
+    assert queue.drain() == [
+        ("g1", state("e2e4 e7e5 g1f3")),
+        ("g2", state("d2d4")),
+        ("g1", {'type': 'chatLine', 'text': 'hi'}),
+    ]
+    assert queue.coalesced == 2
+    assert queue.drain() == []
+
+def test_game_full_is_never_overtaken(qapp):
+    queue = GameEventQueue()
+    full = {'type': 'gameFull', 'state': state("")}
+    queue.put("g1", state("e2e4"))
+    queue.put("g1", full)
+    queue.put("g1", state("e2e4 e7e5"))
+    queue.put("g1", state("e2e4 e7e5 g1f3"))
+    assert [event for _, event in queue.drain()] == [state("e2e4"), full, state("e2e4 e7e5 g1f3")]
+
+def test_ready_once_per_batch(qapp, qtbot):
+    queue = GameEventQueue()
+    wakeups = []
+    queue.ready.connect(lambda: wakeups.append(queue.depth()))
+
+    def burst():
+        for i in range(50):
+            queue.put("g1", state(str(i)))
+            queue.put(None, {'type': 'challenge', 'n': i})
+
+    thread = threading.Thread(target=burst)
+    thread.start()
+    thread.join()
+    qtbot.waitUntil(lambda: len(wakeups) == 1)
+    events = queue.drain()
+    assert len(wakeups) == 1
+    assert len(events) == 51
+    assert events[0] == ("g1", state("49"))
+    stats = queue.stats()
+    assert stats['received'] == 100
+    assert stats['delivered'] == 51
+    assert stats['max_depth'] == 51
+    assert stats['depth'] == 0
+    assert stats['last_lag_ms'] >= 0
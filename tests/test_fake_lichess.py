@@ -0,0 +1,81 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+import pytest
+import lichess_handler
+from fake_lichess import FakeLichess
+from lichess_handler import LichessHandler
+from stream_manager import StreamManager
+from bot_directory import BotDirectory
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+@pytest.fixture
+def server():
+    server = FakeLichess(opponent_moves=["e7e5", "b8c6"], opponent_delay=0.01).start()
+    yield server
+    server.stop()
+
+@pytest.fixture
+def handler(server, monkeypatch):
+    # Keep injected-failure retries fast
+    monkeypatch.setattr(lichess_handler, "backoff_delays", lambda attempts: iter([0.01] * (attempts - 1)))
+    return LichessHandler("token", base_url=server.base_url)
+
+def test_account_puzzles_and_bots(handler):
+    assert handler.connect()
+    assert handler.get_user_id() == "tester"
+    assert handler.fetch_daily_puzzle()['puzzle']['solution'][0] == 'e5f7'
+    assert handler.get_online_bots() == ["chessosity", "FakeBot"]
+
+def test_bot_game_through_stream_manager(handler, server):
+    handler.connect()
+    events = []
+    manager = StreamManager(handler, on_event=lambda game_id, event: events.append((game_id, event)))
+    manager.start()
+    game_id = handler.create_bot_game("chessosity")
+    wait_for(lambda: manager.game(game_id) and manager.game(game_id).events)
+
+    assert handler.make_move_bot("e2e4", ply=0)
+    wait_for(lambda: manager.game(game_id).moves == ["e2e4", "e7e5"])
+    assert not handler.make_move_bot("e2e5", ply=2)  # illegal: rejected, not retried
+    assert server.requests['move'] == 2
+    assert (game_id, {'type': 'gameStart', 'game': {'gameId': game_id, 'id': game_id}}) in events
+    manager.stop()
+
+def test_transient_errors_are_retried(handler, server):
+    handler.connect()
+    game_id = handler.create_bot_game("chessosity")
+    server.fail_next(429, 503)
+    assert handler.make_move_bot("d2d4", game_id, ply=0)
+    assert server.requests['move'] == 3
+    assert handler.move_latency.total == 1
+
+def test_dropped_stream_reconnects(handler, server):
+    handler.connect()
+    server.drop_stream_after = 1
+    manager = StreamManager(handler, open_attempts=3)
+    game_id = handler.create_bot_game("chessosity")
+    state = manager.open(game_id)
+    # Every reconnect works, so the stream outlives open_attempts drops
+    wait_for(lambda: state.events >= 5, timeout=10.0)  # one gameFull per connection
+    manager.close(game_id)
+    assert not manager.streaming()
+    assert server.requests['game_stream'] >= 5
+    manager.stop()
+
+def test_next_puzzle_cycles_through_pool(handler):
+    ids = [handler.get_next_puzzle()['puzzle']['id'] for _ in range(3)]
+    assert len(set(ids)) == 3
+
+def test_bot_directory_streams_online_bots(handler):
+    directory = BotDirectory(handler.stream_online_bots)
+    assert directory.refresh()
+    assert directory.closest('5+0', 1500)['username'] == "FakeBot"
+    assert [bot['username'] for bot in directory.find(perf='rapid')] == ["chessosity"]
@@ -0,0 +1,70 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtCore import QRect
+from frame_scheduler import FrameScheduler, PARTIAL, FULL
+
+@pytest.fixture
+def scheduler(qapp):
+    return FrameScheduler(max_fps=0, full_refresh_every=3)
+
+def test_invalidations_coalesce_into_one_frame(scheduler, qapp):
+    widget = QWidget()
+    scheduler.invalidate(widget, QRect(0, 0, 10, 10))
+    scheduler.invalidate(widget, QRect(10, 0, 10, 10))
+    scheduler.invalidate(QWidget())
+    stats = scheduler.flush()
+    assert stats.widgets == 2
+    assert stats.requests == 3
+    assert scheduler.flush() is None
+
+def test_keyed_callbacks_keep_only_latest(scheduler):
+    calls = []
+    scheduler.post(lambda: calls.append("first"), key="history")
+    scheduler.post(lambda: calls.append("chat 1"))
+    scheduler.post(lambda: calls.append("second"), key="history")
+    scheduler.post(lambda: calls.append("chat 2"))
+    scheduler.flush()
+    assert calls == ["chat 1", "second", "chat 2"]
+
+def test_reposted_key_runs_in_latest_position(scheduler):
+    calls = []
+    scheduler.post(lambda: calls.append("append 1"), key="append")
+    scheduler.post(lambda: calls.append("replace"), key="replace")
+    scheduler.post(lambda: calls.append("append 2"), key="append")
+    scheduler.flush()
+    assert calls == ["replace", "append 2"]
+
+def test_full_refresh_every_n_frames(scheduler):
+    widget = QWidget()
+    modes = []
+    for _ in range(6):
+        scheduler.invalidate(widget)
+        modes.append(scheduler.flush().mode)
+    assert modes == [PARTIAL, PARTIAL, FULL, PARTIAL, PARTIAL, FULL]
+
+def test_requested_full_refresh(scheduler):
+    scheduler.request_full_refresh()
+    assert scheduler.flush().mode == FULL
+    assert scheduler.stats()[-1].mode == FULL
+
+def test_frames_are_batched_by_timer(qapp, qtbot):
+    scheduler = FrameScheduler(max_fps=10)
+    widget = QWidget()
+    with qtbot.waitSignal(scheduler.frameCommitted, timeout=1000) as blocker:
+        scheduler.invalidate(widget)
+        scheduler.invalidate(widget)
+    assert blocker.args[0].requests == 2
+
+def test_callback_can_post_for_the_next_frame(scheduler):
+    calls = []
+    scheduler.post(lambda: scheduler.post(lambda: calls.append("later"), key="later"))
+    first = scheduler.flush()
+    assert calls == []
+    second = scheduler.flush()
+    assert calls == ["later"]
+    assert first.requests == 1
+    assert second.requests == 1
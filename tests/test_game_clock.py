@@ -0,0 +1,80 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import chess
+import pytest
+import game_clock
+from game_clock import GameClock, format_clock
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def fake_time(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(game_clock.time, "monotonic", fake)
+    return fake
+
+def test_format_clock():
+    assert format_clock(300) == "05:00"
+    assert format_clock(59.9) == "00:59"
+    assert format_clock(-1) == "00:00"
+
+def test_only_running_side_loses_time(qapp, fake_time):
+    clock = GameClock(60)
+    clock.start(chess.WHITE)
+    fake_time.now += 10.5
+    assert clock.remaining(chess.WHITE) == pytest.approx(49.5)
+    assert clock.remaining(chess.BLACK) == 60
+    assert clock.display(chess.WHITE) == "00:49"
+
+def test_switch_adds_increment(qapp, fake_time):
+    clock = GameClock(60, increment=2)
+    clock.start(chess.WHITE)
+    fake_time.now += 5
+    clock.switch(chess.BLACK)
+    assert clock.remaining(chess.WHITE) == pytest.approx(57)
+    assert clock.running == chess.BLACK
+    fake_time.now += 3
+    clock.stop()
+    fake_time.now += 100
+    assert clock.remaining(chess.BLACK) == pytest.approx(57)
+    assert clock.running is None
+
+def test_changed_emitted_only_when_text_changes(qapp, fake_time):
+    clock = GameClock(60)
+    changes = []
+    clock.changed.connect(changes.append)
+    clock.start(chess.WHITE)
+    fake_time.now += 0.3
+    clock._tick()
+    assert changes == [chess.WHITE]
+    fake_time.now += 0.3
+    clock._tick()
+    assert changes == [chess.WHITE]
+
+def test_each_second_is_shown_from_a_whole_minute(qapp, fake_time):
+    clock = GameClock(300)
+    clock.start(chess.WHITE)
+    shown = [clock.display(chess.WHITE)]
+    for _ in range(2):
+        fake_time.now += clock.ticker.interval() / 1000
+        clock._tick()
+        shown.append(clock.display(chess.WHITE))
+    assert shown == ["05:00", "04:59", "04:58"]
+
+def test_flag_fall(qapp, fake_time):
+    clock = GameClock(1)
+    flagged = []
+    clock.flagged.connect(flagged.append)
+    clock.start(chess.BLACK)
+    fake_time.now += 1.2
+    clock._tick()
+    assert flagged == [chess.BLACK]
+    assert clock.remaining(chess.BLACK) == 0
+    assert clock.running is None
@@ -0,0 +1,51 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import chess
+from game_sync import diff_moves, follows, normalize_fen
+
+def board_with(*moves):
+    board = chess.Board()
+    for uci in moves:
+        board.push_uci(uci)
+    return board
+
+def test_only_new_moves_are_returned():
+    board = board_with("e2e4", "e7e5")
+    assert diff_moves(board.move_stack, ["e2e4", "e7e5", "g1f3"]) == (None, ["g1f3"])
+    assert diff_moves(board.move_stack, ["e2e4", "e7e5"]) == (None, [])
+
+def test_unconfirmed_local_moves_are_kept():
+    board = board_with("e2e4", "e7e5", "g1f3")
+    assert diff_moves(board.move_stack, ["e2e4", "e7e5"]) == (None, [])
+
+def test_divergence_reports_first_differing_ply():
+    board = board_with("e2e4", "e7e5", "g1f3")
+    assert diff_moves(board.move_stack, ["e2e4", "c7c5", "g1f3", "d7d6"]) == (1, ["c7c5", "g1f3", "d7d6"])
+
+def test_confirmed_moves_are_not_compared_again():
+    class CountingMove:
+        compared = 0
+
+        def __init__(self, uci):
+            self._uci = uci
+
+        def uci(self):
+            CountingMove.compared += 1
+            return self._uci
+
+    applied = [CountingMove(uci) for uci in ["e2e4", "e7e5"] * 50]
+    diff_moves(applied, ["e2e4", "e7e5"] * 50 + ["g1f3"], confirmed=99)
+    assert CountingMove.compared == 1
+
+def test_takeback_is_a_divergence():
+    board = board_with("e2e4", "e7e5", "g1f3", "b8c6")
+    assert diff_moves(board.move_stack, ["e2e4", "e7e5"], confirmed=4) == (2, [])
+    assert diff_moves(board.move_stack, ["e2e4", "c7c5", "g1f3"], confirmed=4) == (1, ["c7c5", "g1f3"])
+
+def test_follows_initial_position():
+    board = board_with("e2e4")
+    assert follows(board, "startpos")
+    assert not follows(board, "8/8/8/8/8/8/8/K6k w - - 0 1")
+    assert normalize_fen("startpos") == chess.STARTING_FEN
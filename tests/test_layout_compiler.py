@@ -0,0 +1,111 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import shutil
+import pytest
+import layout_compiler
+from layout_compiler import ProfileStore, compile_svg, LayoutCompileError, LAYOUTS_DIR
+
+def test_compile_vertical_mockup():
+    profile = compile_svg(os.path.join(LAYOUTS_DIR, "layout_768x1024_vertical.svg"))
+    assert profile['window_size'] == (768, 1024)
+    assert profile['board_size'] == (500, 500)
+    assert profile['history_size'] == (350, 200)
+    assert profile['clock_size'] == (350, 60)
+    assert profile['button_size'] == (350, 60)
+    assert profile['orientation'] == 'vertical'
+    assert profile['top_bar_visible'] is True
+
+def test_placeholder_mockup_is_rejected():
+    # This mockup is still a copy of the 1920x1440 desktop layout
+    with pytest.raises(LayoutCompileError):
+        compile_svg(os.path.join(LAYOUTS_DIR, "layout_1920x1080_horizontal.svg"))
+
+def test_mislabelled_mockup_is_rejected():
+    # A portrait canvas named like a landscape screen would duplicate layout_1080x2220_vertical
+    with pytest.raises(LayoutCompileError):
+        compile_svg(os.path.join(LAYOUTS_DIR, "layout_2220x1080_vertical.svg"))
+
+def test_default_profile_matches_baseline():
+    assert ProfileStore()[layout_compiler.DEFAULT_PROFILE] == {
+        'window_size': (1920, 1440),
+        'board_size': (1300, 1300),
+        'history_size': (520, 1000),
+        'button_size': (250, 80),
+        'clock_size': (250, 120),
+        'margin': (20, 80, 20, 20),
+        'top_bar_visible': True,
+        'orientation': 'horizontal',
+    }
+
+def test_builtin_profiles_win_over_mockups():
+    store = ProfileStore()
+    for name, profile in layout_compiler.BUILTIN_PROFILES.items():
+        assert store[name] == profile
+
+def test_store_uses_cache_until_sources_change(tmp_path, monkeypatch):
+    layouts = tmp_path / "layouts"
+    shutil.copytree(LAYOUTS_DIR, layouts)
+    (layouts / "profiles.json").unlink(missing_ok=True)
+    assert "layout_768x1024_vertical" in ProfileStore(str(layouts))
+    assert (layouts / "profiles.json").exists()
+
+    def fail(*args):
+        raise AssertionError("SVGs should not be parsed when the cache is fresh")
+    monkeypatch.setattr(layout_compiler, "compile_all", fail)
+    store = ProfileStore(str(layouts))
+    assert store["layout_768x1024_vertical"]['board_size'] == (500, 500)
+
+def test_unchanged_stats_skip_hashing(tmp_path, monkeypatch):
+    layouts = tmp_path / "layouts"
+    shutil.copytree(LAYOUTS_DIR, layouts)
+    known = layout_compiler.fingerprint(str(layouts))
+    hashed = []
+    monkeypatch.setattr(layout_compiler, "_sha1", hashed.append)
+    assert layout_compiler.fingerprint(str(layouts), known) == known
+    assert hashed == []
+
+def test_touched_mockup_is_hashed_not_compiled(tmp_path, monkeypatch):
+    layouts = tmp_path / "layouts"
+    shutil.copytree(LAYOUTS_DIR, layouts)
+    (layouts / "profiles.json").unlink(missing_ok=True)
+    ProfileStore(str(layouts))["layout_768x1024_vertical"]
+    svg = layouts / "layout_768x1024_vertical.svg"
+    os.utime(svg, ns=(svg.stat().st_atime_ns, svg.stat().st_mtime_ns + 10 ** 9))
+
+    def fail(*args):
+        raise AssertionError("an unchanged mockup should not be parsed")
+    monkeypatch.setattr(layout_compiler, "compile_all", fail)
+    assert ProfileStore(str(layouts))["layout_768x1024_vertical"]['board_size'] == (500, 500)
+    with open(layouts / "profiles.json") as f:
+        assert json.load(f)['sources'][svg.name][1] == svg.stat().st_mtime_ns
+
+def test_same_size_edit_invalidates_cache(tmp_path):
+    layouts = tmp_path / "layouts"
+    shutil.copytree(LAYOUTS_DIR, layouts)
+    svg = layouts / "layout_768x1024_vertical.svg"
+    before = layout_compiler.fingerprint(str(layouts))
+    text = svg.read_text()
+    edited = text.replace('width="150"', 'width="140"', 1)
+    assert len(edited) == len(text) and edited != text
+    svg.write_text(edited)
+    os.utime(svg, ns=(svg.stat().st_atime_ns, before[svg.name][1] + 10 ** 9))
+    after = layout_compiler.fingerprint(str(layouts), before)
+    assert after[svg.name][2] != before[svg.name][2]
+
+def test_shipped_cache_is_fresh():
+    with open(os.path.join(LAYOUTS_DIR, "profiles.json")) as f:
+        data = json.load(f)
+    assert data['version'] == layout_compiler.CACHE_VERSION
+    shipped = {name: entry[2] for name, entry in data['sources'].items()}
+    assert shipped == {name: entry[2] for name, entry in layout_compiler.fingerprint().items()}
+
+def test_nearest_profile():
+    store = ProfileStore()
+    assert store.nearest(1920, 1440) == "layout_1920x1440_horizontal"
+    assert store.nearest(800, 1066) == "layout_768x1024_vertical"
+    assert store.nearest(1536, 2048) == "layout_1440x1920_vertical"
+    assert store.nearest(3840, 2160) == "layout_1920x1080_horizontal"
+    assert store.get(store.nearest(800, 1280))['orientation'] == 'vertical'
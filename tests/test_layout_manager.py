@@ -0,0 +1,58 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from PyQt6.QtWidgets import QMainWindow, QPushButton, QPlainTextEdit, QLabel, QWidget
+from custom_widgets import ClockWidget
+from layout_manager import LayoutManager
+
+class FakeMainWindow(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.board_widget = QWidget()
+        self.move_history = QPlainTextEdit()
+        self.chat_box = QPlainTextEdit()
+        self.player_info = QLabel()
+        self.white_clock = ClockWidget(is_white=True)
+        self.black_clock = ClockWidget(is_white=False)
+        self.prev_button = QPushButton("Previous")
+        self.next_button = QPushButton("Next")
+        self.hint_button = QPushButton("Ask for Hint")
+
+    def new_game(self): pass
+    def play_vs_bot(self): pass
+    def show_todays_puzzles(self): pass
+    def show_settings(self): pass
+    def load_next_puzzle(self): pass
+
+@pytest.fixture
+def manager(qapp):
+    window = FakeMainWindow()
+    return LayoutManager(window)
+
+def test_unchanged_layout_is_a_no_op(manager):
+    assert manager.apply_layout("layout_1920x1440_horizontal") is True
+    assert manager.apply_layout("layout_1920x1440_horizontal") is False
+
+def test_pages_are_built_once_and_reused(manager):
+    window = manager.main_window
+    manager.apply_layout("layout_1920x1440_horizontal")
+    stack = window.centralWidget()
+    horizontal = stack.currentWidget()
+    manager.apply_layout("layout_1440x1920_vertical")
+    vertical = stack.currentWidget()
+    assert vertical is not horizontal
+    assert window.board_widget.parent() is vertical
+    manager.apply_layout("layout_1920x1440_horizontal")
+    assert window.centralWidget() is stack
+    assert stack.count() == 2
+    assert stack.currentWidget() is horizontal
+    assert window.board_widget.parent() is horizontal
+    assert window.white_clock.parent() is not None
+
+def test_scaled_sizes_are_cached(manager):
+    key = ("layout_1920x1080_horizontal", 960, 540)
+    sizes = manager.scaled_sizes(key)
+    assert sizes['board_size'] == (500, 500)
+    assert manager.scaled_sizes(key) is sizes
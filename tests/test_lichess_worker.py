@@ -0,0 +1,87 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import chess
+import pytest
+from lichess_worker import LichessWorker
+
+class FakeHandler:
+    def __init__(self):
+        self.game_id = "game1"
+        self.calls = []
+        self.threads = set()
+        self.gate = threading.Event()
+
+    def _record(self, call):
+        self.gate.wait(1)
+        self.threads.add(threading.get_ident())
+        self.calls.append(call)
+
+    def connect(self):
+        self._record("connect")
+        return True
+
+    def make_move_bot(self, move, game_id=None, ply=None):
+        self._record(f"move {move} {game_id}")
+        return move != "a1a1"
+
+    def create_bot_game(self, bot_username, time_control='5+0', rated=False, level=3):
+        self._record(f"challenge {bot_username}")
+        return "game2"
+
+    def get_next_puzzle(self):
+        self._record("puzzle")
+        raise RuntimeError("offline")
+
+    def fetch_daily_puzzle(self):
+        self._record("daily")
+        return {"puzzle": {}}
+
+@pytest.fixture
+def worker(qapp):
+    handler = FakeHandler()
+    worker = LichessWorker(handler)
+    yield worker
+    handler.gate.set()
+    worker.stop()
+
+def test_moves_run_first_and_in_order(worker, qtbot):
+    handler = worker.handler
+    worker.fetch_puzzle(daily=True)
+    worker.create_bot_game("bot")
+    worker.send_move(chess.Move.from_uci("e2e4"))
+    worker.send_move("g1f3")
+    worker.start()
+    with qtbot.waitSignal(worker.puzzleLoaded, timeout=2000) as blocker:
+        handler.gate.set()
+    assert blocker.args == [{"puzzle": {}}]
+    assert handler.calls == ["move e2e4 game1", "move g1f3 game1", "challenge bot", "daily"]
+    # Everything ran on the one worker thread
+    assert len(handler.threads) == 1
+    assert threading.get_ident() not in handler.threads
+
+def test_results_come_back_as_signals(worker, qtbot):
+    worker.handler.gate.set()
+    worker.start()
+    with qtbot.waitSignal(worker.moveSent, timeout=2000) as blocker:
+        worker.send_move("a1a1", ply=4)
+    assert blocker.args == ["a1a1", 4, False]
+    with qtbot.waitSignal(worker.gameCreated, timeout=2000) as blocker:
+        worker.create_bot_game("bot")
+    assert blocker.args == ["game2"]
+
+def test_failed_request_reports_none(worker, qtbot):
+    worker.handler.gate.set()
+    worker.start()
+    with qtbot.waitSignals([worker.failed, worker.puzzleLoaded], timeout=2000):
+        worker.fetch_puzzle()
+
+def test_move_is_bound_to_game_when_queued(worker, qtbot):
+    worker.send_move("e2e4")
+    worker.handler.game_id = "game3"
+    worker.handler.gate.set()
+    with qtbot.waitSignal(worker.moveSent, timeout=2000):
+        worker.start()
+    assert worker.handler.calls == ["move e2e4 game1"]
@@ -0,0 +1,43 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import chess
+from move_index import MoveIndex, IndexedBoard, index_for
+
+def test_destinations_match_legal_moves():
+    board = chess.Board()
+    index = MoveIndex(board)
+    assert index.destinations(chess.E2) == {chess.E3, chess.E4}
+    assert index.destinations(chess.G1) == {chess.F3, chess.H3}
+    assert index.destinations(chess.E1) == set()
+    assert len(index) == board.legal_moves.count()
+
+def test_promotions_are_grouped():
+    board = chess.Board("8/4P3/8/8/8/8/k7/4K3 w - - 0 1")
+    index = MoveIndex(board)
+    assert len(index.moves_between(chess.E7, chess.E8)) == 4
+    assert set(index.promotions(chess.E7, chess.E8)) == {chess.QUEEN, chess.ROOK, chess.BISHOP, chess.KNIGHT}
+    assert index.is_legal(chess.Move.from_uci("e7e8n"))
+    assert not index.is_legal(chess.Move.from_uci("e7e8"))
+
+def test_indexed_board_invalidates_on_change():
+    board = IndexedBoard()
+    first = board.move_index
+    assert board.move_index is first
+    board.push_uci("e2e4")
+    assert board.move_index is not first
+    assert board.move_index.destinations(chess.E7) == {chess.E6, chess.E5}
+    board.pop()
+    assert board.move_index.destinations(chess.E2) == {chess.E3, chess.E4}
+    board.set_fen("8/8/8/8/8/8/k7/4K3 w - - 0 1")
+    assert board.move_index.destinations(chess.E1) == {chess.D1, chess.F1, chess.D2, chess.E2, chess.F2}
+
+def test_from_board_keeps_move_stack():
+    plain = chess.Board()
+    plain.push_uci("d2d4")
+    plain.push_uci("d7d5")
+    indexed = IndexedBoard.from_board(plain)
+    assert indexed.move_stack == plain.move_stack
+    assert indexed.fen() == plain.fen()
+    assert index_for(indexed) is indexed.move_index
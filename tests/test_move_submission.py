@@ -0,0 +1,91 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import random
+import pytest
+import lichess_handler
+from lichess_handler import LichessHandler
+from move_submission import LatencyHistogram, backoff_delays, is_transient
+
+class ResponseError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+class FakeBots:
+    def __init__(self, failures):
+        self.failures = list(failures)
+        self.sent = []
+
+    def make_move(self, game_id, uci):
+        self.sent.append((game_id, uci))
+        if self.failures:
+            raise self.failures.pop(0)
+
+class FakeClient:
+    def __init__(self, failures=()):
+        self.bots = FakeBots(failures)
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(lichess_handler.time, "sleep", sleeps.append)
+    return sleeps
+
+def handler_with(failures):
+    handler = LichessHandler("token")
+    handler._client = FakeClient(failures)
+    handler.game_id = "game1"
+    return handler
+
+def test_transient_errors():
+    assert is_transient(ResponseError(429))
+    assert is_transient(ResponseError(503))
+    assert is_transient(ConnectionResetError())
+    assert not is_transient(ResponseError(400))
+    assert not is_transient(ValueError())
+
+def test_backoff_is_exponential_with_jitter():
+    delays = list(backoff_delays(5, base=1, cap=3, rng=random.Random(1)))
+    assert len(delays) == 4
+    for delay, limit in zip(delays, [1, 2, 3, 3]):
+        assert 0 <= delay <= limit
+
+def test_transient_failures_are_retried(no_sleep):
+    handler = handler_with([ResponseError(502), ConnectionError()])
+    assert handler.make_move_bot("e2e4", ply=0)
+    assert len(handler.client.bots.sent) == 3
+    assert len(no_sleep) == 2
+    assert handler.move_latency.total == 1
+
+def test_rejected_move_is_not_retried(no_sleep):
+    handler = handler_with([ResponseError(400)])
+    assert not handler.make_move_bot("e2e5", ply=0)
+    assert len(handler.client.bots.sent) == 1
+    assert no_sleep == []
+
+def test_resend_of_same_ply_is_deduplicated(no_sleep):
+    handler = handler_with([])
+    assert handler.make_move_bot("e2e4", ply=0)
+    assert handler.make_move_bot("e2e4", ply=0)
+    assert handler.make_move_bot("d2d4", game_id="game2", ply=0)
+    assert handler.client.bots.sent == [("game1", "e2e4"), ("game2", "d2d4")]
+
+def test_finished_game_forgets_its_moves(no_sleep):
+    handler = handler_with([])
+    assert handler.make_move_bot("e2e4", ply=0)
+    assert handler.make_move_bot("d2d4", game_id="game2", ply=0)
+    handler.forget_game("game1")
+    assert list(handler._accepted_moves) == ["game2"]
+    assert handler.make_move_bot("e2e4", ply=0)
+    assert handler.client.bots.sent == [("game1", "e2e4"), ("game2", "d2d4"), ("game1", "e2e4")]
+
+def test_latency_histogram():
+    histogram = LatencyHistogram(bounds=(100, 200))
+    for ms in (50, 60, 150, 400):
+        histogram.record(ms)
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.percentile(50) == 100
+    assert histogram.percentile(100) == 400
+    assert "4 moves" in histogram.summary()
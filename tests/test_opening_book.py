@@ -0,0 +1,78 @@
+import os
+import random
+import struct
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import chess
+import chess.polyglot
+import pytest
+from opening_book import OpeningBook, OpeningNames
+from search_engine import choose_move
+
+def board_after(*moves):
+    board = chess.Board()
+    for san in moves:
+        board.push_san(san)
+    return board
+
+def write_book(path, entries):
+    """Write (board, uci, weight) entries as a Polyglot book."""
+    rows = []
+    for board, uci, weight in entries:
+        move = chess.Move.from_uci(uci)
+        raw = move.to_square | move.from_square << 6 | ((move.promotion - 1) if move.promotion else 0) << 12
+        rows.append(struct.pack(">QHHI", chess.polyglot.zobrist_hash(board), raw, weight, 0))
+    with open(path, "wb") as f:
+        f.write(b"".join(sorted(rows)))
+    return str(path)
+
+@pytest.fixture
+def book(tmp_path):
+    path = write_book(tmp_path / "book.bin", [
+        (chess.Board(), "e2e4", 10),
+        (chess.Board(), "d2d4", 5),
+        (board_after("e4"), "c7c5", 8),
+        (board_after("e4", "e5", "Nf3", "Nc6", "Bc4", "Nf6"), "e1h1", 3),
+    ])
+    book = OpeningBook(path)
+    yield book
+    book.close()
+
+def test_book_moves_by_weight(book):
+    assert len(book) == 4
+    assert book.moves(chess.Board()) == [(chess.Move.from_uci("e2e4"), 10), (chess.Move.from_uci("d2d4"), 5)]
+    assert book.moves(board_after("d4")) == []
+    assert book.choose(board_after("d4")) is None
+
+def test_castling_is_returned_as_a_legal_move(book):
+    board = board_after("e4", "e5", "Nf3", "Nc6", "Bc4", "Nf6")
+    assert book.choose(board, random.Random(1)) == chess.Move.from_uci("e1g1")
+
+def test_missing_book(tmp_path):
+    assert OpeningBook.open_if_present(str(tmp_path / "missing.bin")) is None
+
+def test_computer_plays_book_moves_without_searching(book):
+    result = choose_move(chess.STARTING_FEN, ["e2e4"], level=8, book=book.path)
+    assert result.move == chess.Move.from_uci("c7c5")
+    assert result.nodes == 0
+    assert choose_move(chess.STARTING_FEN, ["d2d4"], level=1, seed=1, book=book.path).nodes > 0
+
+def test_opening_names(tmp_path):
+    tsv = tmp_path / "c.tsv"
+    tsv.write_text("eco\tname\tpgn\n"
+                   "C20\tKing's Pawn Game\t1. e4 e5\n"
+                   "C60\tRuy Lopez\t1. e4 e5 2. Nf3 Nc6 3. Bb5\n"
+                   "C99\tBroken\t1. e4 Ke7 2. Kxe7\n")
+    names = OpeningNames.from_tsv([str(tsv)])
+    assert len(names) == 2
+    assert names.lookup(board_after("e4", "e5")) == ("C20", "King's Pawn Game")
+    assert names.name(board_after("e4", "e5", "Nf3", "Nc6", "Bb5", "a6", "Ba4")) == ("C60", "Ruy Lopez")
+    # Transposed into, and played on from a position set up without moves
+    assert names.name(board_after("Nf3", "Nc6", "e4", "e5", "Bb5")) == ("C60", "Ruy Lopez")
+    assert names.name(chess.Board(board_after("e4", "e5", "Nf3").fen())) is None
+
+    names.save(str(tmp_path / "openings.json"))
+    loaded = OpeningNames.open_if_present(str(tmp_path / "openings.json"))
+    assert loaded.lookup(board_after("e4", "e5")) == ("C20", "King's Pawn Game")
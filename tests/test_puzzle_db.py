@@ -0,0 +1,72 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import io
+import random
+import chess
+import pytest
+from puzzle_db import PuzzleDatabase, import_csv, open_dump
+from puzzle_provider import PuzzleProvider, PuzzleStore
+
+DUMP = """PuzzleId,FEN,Moves,Rating,RatingDeviation,Popularity,NbPlays,Themes,GameUrl,OpeningTags
+00008,r6k/pp2r2p/4Rp1Q/3p4/8/1N1P2R1/PqP2bPP/7K b - - 0 24,f2g3 e6e7 b2b1 b3c1 b1c1 h6c1,1913,75,94,6230,crushing hangingPiece long middlegame,https://lichess.org/787zsVup/black#48,
+0000D,5rk1/1p3ppp/pq3b2/8/8/1P1Q1N2/P4PPP/3R2K1 w - - 2 27,d3d6 f8d8 d6d8 f6d8,1517,74,96,27071,advantage endgame short,https://lichess.org/F8M8OS71#53,
+0009B,r2qr1k1/b1p2ppp/pp4n1/P1P1p3/4P1n1/B2P2Pb/3NBP1P/RN1QR1K1 b - - 1 16,b6c5 e2g4 h3g4 d1g4,1105,80,85,628,advantage middlegame short,https://lichess.org/4MWQCxQ6/black#32,Kings_Pawn_Game
+broken,row
+"""
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "puzzles.sqlite")
+    assert import_csv(io.StringIO(DUMP), path, batch_size=2) == 3
+    db = PuzzleDatabase(path)
+    yield db
+    db.close()
+
+def test_import_and_convert(db):
+    assert db.count() == 3
+    puzzle = db.get("0000D")
+    board = chess.Board(puzzle['game']['fen'])
+    # The opponent's move is already played; the solution starts with ours
+    assert board.turn == chess.BLACK
+    assert chess.Move.from_uci(puzzle['puzzle']['solution'][0]) in board.legal_moves
+    assert puzzle['puzzle']['solution'] == ["f8d8", "d6d8", "f6d8"]
+    assert puzzle['puzzle']['rating'] == 1517
+    assert db.get("nope") is None
+
+def test_pick_by_rating_theme_and_skip(db):
+    rng = random.Random(0)
+    assert db.pick(1500, band=50, rng=rng)['puzzle']['id'] == "0000D"
+    assert db.pick(1500, band=500, theme="hangingPiece", rng=rng)['puzzle']['id'] == "00008"
+    assert db.pick(1500, band=500, min_popularity=97, rng=rng) is None
+    assert db.pick(1100, band=10, skip=lambda pid: pid == "0009B", rng=rng) is None
+    assert db.pick(3000, rng=rng) is None
+
+def test_import_streams_in_batches(tmp_path):
+    header = DUMP.splitlines()[0]
+    fen = "5rk1/1p3ppp/pq3b2/8/8/1P1Q1N2/P4PPP/3R2K1 w - - 2 27"
+    lines = (f"p{i},{fen},d3d6 f8d8,{1000 + i % 1000},75,90,10,short," for i in range(5000))
+    seen = []
+    path = str(tmp_path / "big.sqlite")
+    assert import_csv(iter([header] + list(lines)), path, batch_size=1000, progress=seen.append) == 5000
+    assert seen == [1000, 2000, 3000, 4000, 5000]
+    db = PuzzleDatabase(path)
+    assert db.pick(1500, band=0)['puzzle']['rating'] == 1500
+    db.close()
+
+def test_gzip_dump(tmp_path):
+    import gzip
+    path = str(tmp_path / "dump.csv.gz")
+    with gzip.open(path, "wt") as f:
+        f.write(DUMP)
+    with open_dump(path) as lines:
+        assert import_csv(lines, str(tmp_path / "db.sqlite")) == 3
+
+def test_provider_falls_back_to_database_offline(db, tmp_path):
+    store = PuzzleStore(str(tmp_path / "puzzles.json"))
+    provider = PuzzleProvider(lambda: None, None, store, database=db, rating=1500)
+    first = provider.fetch()['puzzle']['id']
+    second = provider.fetch()['puzzle']['id']
+    assert first != second
+    assert store.known(first) and store.known(second)
@@ -0,0 +1,46 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import io
+import chess
+import chess.pgn
+from fake_lichess import DAILY_PUZZLE
+from puzzle_loader import PuzzleLoader, parse_puzzle, position_from_pgn
+
+GAME = "e4 e5 Nf3 Nc6 Bc4 Nd4 Nxe5 Qg5 Nxf7 Qxg2 Rf1 Qxe4+"
+
+def test_fast_path_matches_pgn_replay():
+    expected = chess.pgn.read_game(io.StringIO(GAME)).end().board()
+    assert position_from_pgn(GAME).fen() == expected.fen()
+    # initialPly counts the moves before the last one played
+    board = position_from_pgn(GAME, initial_ply=7)
+    assert len(board.move_stack) == 8
+    assert board.peek() == chess.Move.from_uci("d8g5")
+
+def test_full_pgn_falls_back_to_parser():
+    pgn = '[Event "Casual"]\n\n1. e4 {best by test} e5 (1... c5) 2. Nf3 Nc6 1-0'
+    assert position_from_pgn(pgn).fen() == position_from_pgn("e4 e5 Nf3 Nc6").fen()
+    assert position_from_pgn(pgn, initial_ply=1).fen() == position_from_pgn("e4 e5").fen()
+    assert position_from_pgn("1. e4 e5 2. Nf3 *").fen() == position_from_pgn("e4 e5 Nf3").fen()
+
+def test_parse_api_and_database_puzzles():
+    parsed = parse_puzzle(DAILY_PUZZLE)
+    assert parsed.id == "Fk001"
+    assert parsed.rating == 1400
+    board = chess.Board(parsed.fen)
+    assert board.is_legal(parsed.solution[0])
+    from_fen = parse_puzzle({'game': {'fen': parsed.fen}, 'puzzle': {'id': "x", 'solution': ["e5f7"], 'rating': 1}})
+    assert from_fen.fen == parsed.fen
+
+def test_loader_caches_by_id_and_returns_fresh_boards():
+    loader = PuzzleLoader(size=2)
+    board, solution, rating = loader.load(DAILY_PUZZLE)
+    board.push(solution[0])
+    again, _, _ = loader.load(DAILY_PUZZLE)
+    assert again.fen() == parse_puzzle(DAILY_PUZZLE).fen
+    assert (loader.hits, loader.misses) == (1, 1)
+    for pid in ("a", "b"):
+        loader.parse({'game': DAILY_PUZZLE['game'], 'puzzle': dict(DAILY_PUZZLE['puzzle'], id=pid)})
+    loader.load(DAILY_PUZZLE)
+    assert loader.misses == 4  # evicted by the two newer puzzles
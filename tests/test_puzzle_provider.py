@@ -0,0 +1,90 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from lichess_worker import LichessWorker
+from puzzle_provider import PuzzleProvider, PuzzleStore
+
+def make_puzzle(pid):
+    return {'game': {'pgn': "e4"}, 'puzzle': {'id': pid, 'solution': ['e7e5'], 'rating': 1500}}
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class Feed:
+    """Stands in for LichessHandler.get_next_puzzle."""
+    def __init__(self, ids):
+        self.ids = list(ids)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return make_puzzle(self.ids.pop(0)) if self.ids else None
+
+@pytest.fixture
+def store_path(tmp_path):
+    return str(tmp_path / "puzzles.json")
+
+def test_refill_keeps_size_puzzles_and_skips_played(store_path):
+    store = PuzzleStore(store_path)
+    store.mark_played(make_puzzle("p1"))
+    feed = Feed(["p1", "p2", "p3", "p2", "p4"])
+    provider = PuzzleProvider(feed, None, store, size=3)
+    assert provider.refill() == 3
+    assert [provider.take()['puzzle']['id'] for _ in range(3)] == ["p2", "p3", "p4"]
+    assert provider.take() is None
+
+def test_store_survives_restart_and_expires(store_path):
+    clock = Clock()
+    provider = PuzzleProvider(Feed(["p1", "p2"]), None, PuzzleStore(store_path, ttl=60, clock=clock), size=2)
+    provider.refill()
+    assert provider.take()['puzzle']['id'] == "p1"
+    provider.store.save()
+
+    # Offline after a restart: the stored puzzle is still there, p1 stays played
+    reopened = PuzzleStore(store_path, ttl=60, clock=clock)
+    assert reopened.known("p1")
+    assert reopened.count() == 1
+    clock.now += 61
+    assert reopened.take() is None
+
+def test_fetch_skips_played_puzzles(store_path):
+    provider = PuzzleProvider(Feed(["p1", "p1", "p2"]), None, PuzzleStore(store_path), size=2)
+    assert provider.fetch()['puzzle']['id'] == "p1"
+    assert provider.fetch()['puzzle']['id'] == "p2"
+    assert provider.fetch() is None
+
+def test_daily_is_fetched_once_per_day_and_kept_offline(store_path):
+    calls = []
+
+    def fetch_daily():
+        calls.append(1)
+        if len(calls) > 1:
+            raise ConnectionError("offline")
+        return make_puzzle("daily1")
+
+    provider = PuzzleProvider(None, fetch_daily, PuzzleStore(store_path))
+    assert provider.daily("2024-05-01")['puzzle']['id'] == "daily1"
+    assert provider.daily("2024-05-01")['puzzle']['id'] == "daily1"
+    assert len(calls) == 1
+    assert provider.daily("2024-05-02")['puzzle']['id'] == "daily1"
+    assert len(calls) == 2
+
+def test_worker_serves_stored_puzzle_without_waiting(qapp, qtbot, store_path):
+    feed = Feed(["p1", "p2", "p3"])
+    provider = PuzzleProvider(feed, None, PuzzleStore(store_path), size=1)
+    provider.refill()
+    worker = LichessWorker(handler=None, puzzles=provider)
+    # Not started: the stored puzzle must not need the worker thread
+    with qtbot.waitSignal(worker.puzzleLoaded, timeout=100) as blocker:
+        worker.fetch_puzzle()
+    assert blocker.args[0]['puzzle']['id'] == "p1"
+    assert feed.calls == 1
+    worker.start()
+    qtbot.waitUntil(lambda: provider.store.count() == 1)
+    worker.stop()
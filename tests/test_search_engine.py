@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import chess
+from search_engine import MATE, ComputerPlayer, Searcher, choose_move, evaluate, time_budget
+
+def test_finds_mate_in_one():
+    board = chess.Board("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+    result = Searcher().search(board, depth=3)
+    assert result.move == chess.Move.from_uci("a1a8")
+    assert result.score >= MATE - 10
+
+def test_captures_hanging_queen():
+    board = chess.Board("4k3/8/8/3q4/8/8/3R4/4K3 w - - 0 1")
+    result = Searcher().search(board, depth=2)
+    assert result.move == chess.Move.from_uci("d2d5")
+
+def test_evaluation_is_symmetric():
+    board = chess.Board("r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3")
+    mirrored = board.mirror()
+    assert evaluate(board) == evaluate(mirrored)
+    assert evaluate(chess.Board()) == 0
+
+def test_time_budget_keeps_a_reserve():
+    soft, hard = time_budget(60, 2)
+    assert 0 < soft < hard <= 59
+    soft, hard = time_budget(0.5)
+    assert hard < 0.5
+    assert time_budget(None) == (None, None)
+
+def test_hard_limit_stops_the_search():
+    started = time.monotonic()
+    result = Searcher().search(chess.Board(), depth=64, soft=0.1, hard=0.3)
+    assert time.monotonic() - started < 1.0
+    assert result.move in chess.Board().legal_moves
+    assert result.depth >= 1
+
+def test_noise_varies_weak_moves_but_stays_legal():
+    board = chess.Board()
+    moves = {choose_move(board.fen(), [], level=1, seed=seed).move for seed in range(8)}
+    assert len(moves) > 1
+    assert all(move in board.legal_moves for move in moves)
+
+def test_noise_cut_short_keeps_the_root_position():
+    result = Searcher().search(chess.Board(), depth=3, nodes=3000, noise=300)
+    assert result.pv and result.pv[0] == result.move
+
+def test_no_move_when_checkmated():
+    board = chess.Board("R5k1/5ppp/8/8/8/8/8/6K1 b - - 1 1")
+    assert Searcher().search(board, depth=2).move is None
+
+def test_computer_player_runs_in_another_process():
+    player = ComputerPlayer()
+    try:
+        board = chess.Board()
+        board.push_uci("e2e4")
+        result = player.play(board, level=2, remaining=5).result(timeout=60)
+        assert result.move in board.legal_moves
+    finally:
+        player.shutdown()
@@ -41,10 +41,12 @@ class TestSettingsMenu(unittest.TestCase):
     def test_layout_options(self):
         expected_layouts = [
             "layout_1920x1440_horizontal",
+            "layout_2220x1080_horizontal",
             "layout_1920x1080_horizontal",
             "layout_1440x1920_vertical",
-            "layout_2220x1080_horizontal",
-            "layout_1080x2220_vertical"
+            "layout_1080x2220_vertical",
+            "layout_1080x1920_vertical",
+            "layout_768x1024_vertical"
         ]
         assert self.menu.resolution_combo.count() == len(expected_layouts)
         for i, text in enumerate(expected_layouts):
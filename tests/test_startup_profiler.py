@@ -0,0 +1,42 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import subprocess
+import startup_profiler
+from startup_profiler import StartupProfiler
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def test_disabled_without_flag():
+    assert startup_profiler.enable_from_argv(["qt.py"]) is None
+    with startup_profiler.phase("anything"):
+        pass
+
+def test_import_hook_times_outermost_imports():
+    profiler = StartupProfiler()
+    sys.modules.pop("colorsys", None)
+    profiler.install_import_hook()
+    try:
+        import colorsys  # noqa: F401
+        import os.path  # already loaded, not recorded  # noqa: F401
+    finally:
+        profiler.remove_import_hook()
+    assert [name for name, _ in profiler.imports] == ["colorsys"]
+
+def test_report_lists_phases_and_first_paint():
+    profiler = StartupProfiler()
+    with profiler.phase("layout"):
+        pass
+    assert profiler.mark_first_paint()
+    assert not profiler.mark_first_paint()
+    report = profiler.report()
+    assert "layout" in report
+    assert "first paint" in report
+
+def test_lichess_handler_does_not_import_berserk():
+    code = ("import sys, lichess_handler; lichess_handler.LichessHandler('token'); "
+            "print('berserk' in sys.modules)")
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "False"
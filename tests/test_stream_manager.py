@@ -0,0 +1,170 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import threading
+import time
+from stream_manager import StreamManager, GameState
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+def game_events(game_id, moves, status='started'):
+    yield {'type': 'gameFull', 'id': game_id, 'white': {'id': 'me'}, 'black': {'aiLevel': 3},
+           'initialFen': 'startpos', 'state': {'type': 'gameState', 'moves': '', 'status': 'started'}}
+    for i in range(1, len(moves) + 1):
+        yield {'type': 'gameState', 'moves': ' '.join(moves[:i]), 'status': 'started'}
+    yield {'type': 'gameState', 'moves': ' '.join(moves), 'status': status}
+
+async def replay(events):
+    for event in events:
+        yield event
+
+class FakeHandler:
+    def __init__(self, incoming=(), games=None, hold=None):
+        self.incoming = list(incoming)
+        self.incoming_opens = 0
+        self.games = games or {}
+        self.hold = hold
+        self.opened = []
+        self.concurrent = 0
+        self.max_concurrent = 0
+        self.threads = set()
+        self.lock = threading.Lock()
+
+    def stream_incoming_events(self):
+        # Like Lichess, each connection only delivers what is new
+        self.incoming_opens += 1
+        events, self.incoming = self.incoming, []
+        return replay(events)
+
+    def open_game_stream(self, game_id):
+        self.opened.append(game_id)
+        return self._stream(game_id)
+
+    async def _stream(self, game_id):
+        with self.lock:
+            self.concurrent += 1
+            self.max_concurrent = max(self.max_concurrent, self.concurrent)
+            self.threads.add(threading.current_thread())
+        try:
+            while self.hold is not None and not self.hold.is_set():
+                await asyncio.sleep(0.01)
+            for event in self.games.get(game_id, ()):
+                yield event
+        finally:
+            with self.lock:
+                self.concurrent -= 1
+
+def test_game_state_follows_events():
+    state = GameState("g1")
+    for event in game_events("g1", ["e2e4", "e7e5"], status='mate'):
+        state.apply(event)
+    assert state.moves == ["e2e4", "e7e5"]
+    assert state.black == {'aiLevel': 3}
+    assert state.finished
+
+def test_events_are_routed_by_game_id():
+    handler = FakeHandler(games={
+        "g1": game_events("g1", ["e2e4"], status='resign'),
+        "g2": game_events("g2", ["d2d4", "d7d5"], status='draw'),
+    })
+    received = []
+    manager = StreamManager(handler, on_event=lambda game_id, event: received.append(game_id))
+    manager.open("g1")
+    manager.open("g2")
+    wait_for(lambda: not manager.streaming())
+    assert manager.game("g1").moves == ["e2e4"]
+    assert manager.game("g2").moves == ["d2d4", "d7d5"]
+    assert received.count("g1") == 3
+    assert received.count("g2") == 4
+    assert manager.open_games() == []
+    manager.stop()
+
+def test_incoming_game_start_opens_stream_once():
+    start = {'type': 'gameStart', 'game': {'gameId': 'g1'}}
+    hold = threading.Event()
+    handler = FakeHandler(incoming=[start, start, {'type': 'challenge', 'challenge': {}}],
+                          games={"g1": game_events("g1", [], status='aborted')}, hold=hold)
+    received = []
+    manager = StreamManager(handler, on_event=lambda game_id, event: received.append((game_id, event['type'])),
+                            reopen_delay=0.01)
+    manager.start()
+    wait_for(lambda: (None, 'challenge') in received)
+    hold.set()
+    wait_for(lambda: not manager.streaming())
+    assert handler.opened == ["g1"]
+    assert received[:2] == [("g1", 'gameStart'), ("g1", 'gameStart')]
+    manager.stop()
+
+def test_every_open_game_is_streamed_on_one_thread():
+    hold = threading.Event()
+    games = {f"g{i}": game_events(f"g{i}", [], status='resign') for i in range(50)}
+    handler = FakeHandler(games=games, hold=hold)
+    manager = StreamManager(handler)
+    for game_id in games:
+        manager.open(game_id)
+    wait_for(lambda: handler.concurrent == 50)
+    assert handler.threads == {manager._thread}
+    hold.set()
+    wait_for(lambda: not manager.streaming())
+    assert sorted(handler.opened) == sorted(games)
+    manager.stop()
+
+def test_close_ends_a_waiting_stream_at_once():
+    handler = FakeHandler(games={"g1": game_events("g1", [])}, hold=threading.Event())
+    manager = StreamManager(handler)
+    manager.open("g1")
+    wait_for(lambda: handler.concurrent == 1)
+    manager.close("g1")
+    assert manager.streaming() == set()
+    wait_for(lambda: handler.concurrent == 0, timeout=0.5)
+    assert manager.game("g1").events == 0
+    manager.stop()
+
+def test_account_stream_is_reopened_when_it_ends():
+    handler = FakeHandler(incoming=[{'type': 'challenge', 'challenge': {}}])
+    received = []
+    manager = StreamManager(handler, on_event=lambda game_id, event: received.append(event['type']),
+                            reopen_delay=0.01)
+    manager.start()
+    wait_for(lambda: handler.incoming_opens >= 2)
+    handler.incoming = [{'type': 'gameStart', 'game': {'gameId': 'g9'}}]
+    wait_for(lambda: 'gameStart' in received)
+    assert received[0] == 'challenge'
+    manager.stop()
+
+def test_backoff_starts_over_after_events():
+    """A stream that drops more than ``open_attempts`` times is kept while reconnects work."""
+    drops = 0
+
+    async def flaky(game_id):
+        nonlocal drops
+        drops += 1
+        if drops <= 6:
+            yield {'type': 'gameState', 'moves': '', 'status': 'started'}
+            raise ConnectionError("dropped")
+        for event in game_events(game_id, [], status='resign'):
+            yield event
+
+    handler = FakeHandler()
+    handler.open_game_stream = flaky
+    manager = StreamManager(handler, open_attempts=2)
+    manager.open("g1")
+    wait_for(lambda: not manager.streaming(), timeout=5.0)
+    assert drops == 7
+    assert manager.game("g1").status == 'resign'
+    manager.stop()
+
+def test_stop_ends_the_account_stream():
+    handler = FakeHandler()
+    manager = StreamManager(handler, reopen_delay=0.01)
+    manager.start()
+    wait_for(lambda: handler.incoming_opens >= 2)
+    manager.stop()
+    manager._thread.join(1)
+    assert not manager._thread.is_alive()
@@ -0,0 +1,81 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import chess
+import pytest
+from analysis_cache import AnalysisCache
+from search_engine import choose_move
+from tablebase import Tablebase, TablebaseResult, describe
+
+class FakeTables:
+    """Whoever has the queen wins; the defender is worse off the fewer moves its king has."""
+
+    def __init__(self):
+        self.probes = 0
+
+    def probe_wdl(self, board):
+        self.probes += 1
+        if not board.queens:
+            return 0
+        return 2 if board.queens & board.occupied_co[board.turn] else -2
+
+    def probe_dtz(self, board):
+        wdl = self.probe_wdl(board)
+        if wdl < 0:
+            return -(1 + board.legal_moves.count())
+        return 10 if wdl > 0 else 0
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def tablebase():
+    tablebase = Tablebase([], cache=AnalysisCache())
+    tablebase._tables = FakeTables()
+    tablebase.max_pieces = 3
+    return tablebase
+
+def test_covers_few_pieces_without_castling(tablebase):
+    assert tablebase.covers(chess.Board("k7/8/8/8/8/8/8/KQ6 w - - 0 1"))
+    assert not tablebase.covers(chess.Board("k7/8/8/8/8/8/8/KQR5 w - - 0 1"))
+    assert not tablebase.covers(chess.Board("4k3/8/8/8/8/8/8/4K2R w K - 0 1"))
+    assert tablebase.probe(chess.Board()) is None
+
+def test_probes_are_cached(tablebase):
+    board = chess.Board("k7/8/8/8/8/8/8/KQ6 b - - 0 1")
+    assert tablebase.probe(board) == TablebaseResult(-2, -2)
+    probes = tablebase._tables.probes
+    assert tablebase.probe(board.copy()) == TablebaseResult(-2, -2)
+    assert tablebase._tables.probes == probes
+
+def test_best_move_mates(tablebase):
+    board = chess.Board("k7/8/1K6/8/8/8/8/7Q w - - 0 1")
+    move = tablebase.best_move(board)
+    board.push(move)
+    assert board.is_checkmate()
+
+def test_best_move_takes_the_fastest_win(tablebase):
+    board = chess.Board("8/8/8/3k4/8/8/8/KQ6 w - - 0 1")
+    move = tablebase.best_move(board)
+
+    def defender_moves(candidate):
+        board.push(candidate)
+        count = board.legal_moves.count()
+        board.pop()
+        return count
+
+    assert defender_moves(move) == min(defender_moves(m) for m in board.legal_moves)
+
+def test_describe():
+    board = chess.Board("k7/8/8/8/8/8/8/KQ6 b - - 0 1")
+    assert describe(board, TablebaseResult(-2, -4)) == "White wins (DTZ 4)"
+    assert describe(board, TablebaseResult(0, 0)) == "Draw"
+    assert describe(board, TablebaseResult(1, 90)) == "Draw (50-move rule)"
+
+def test_without_tables(tmp_path):
+    assert Tablebase.open_if_present([str(tmp_path / "missing")]) is None
+    assert Tablebase.open_if_present([str(tmp_path)]) is None
+    result = choose_move("k7/8/8/8/8/8/8/KQ6 w - - 0 1", [], level=4, tablebase=[str(tmp_path)])
+    assert result.nodes > 0
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+A tiny UCI engine for tests.
+
+It "searches" by sorting the legal moves (captures first, then by UCI
+string) and reports one deeper principal variation every ``--step``
+seconds until the ``go`` limit is reached or ``stop`` arrives.  Depth d
+reports d plies of that line.  ``--crash-on-go`` exits on the first
+search, to test engine restarts.
+"""
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import chess
+
+def best_line(board, depth):
+    board = board.copy()
+    line = []
+    for _ in range(depth):
+        moves = sorted(board.legal_moves, key=lambda m: (not board.is_capture(m), m.uci()))
+        if not moves:
+            break
+        line.append(moves[0])
+        board.push(moves[0])
+    return line
+
+def search(board, tokens, step, out, commands):
+    """Emit info lines until the budget is spent or "stop" is received; return the best move."""
+    movetime = nodes = depth = None
+    infinite = "infinite" in tokens
+    for name in ("movetime", "nodes", "depth"):
+        if name in tokens:
+            value = int(tokens[tokens.index(name) + 1])
+            if name == "movetime":
+                movetime = value / 1000
+            elif name == "nodes":
+                nodes = value
+            else:
+                depth = value
+    started = time.monotonic()
+    line = []
+    d = 0
+    while True:
+        d += 1
+        line = best_line(board, d) or line
+        searched = d * 1000
+        out(f"info depth {d} score cp {10 * d} nodes {searched} time {int((time.monotonic() - started) * 1000)} "
+            f"pv {' '.join(m.uci() for m in line)}")
+        if (depth and d >= depth) or (nodes and searched >= nodes) or len(line) < d:
+            if not infinite:
+                break
+        try:
+            command = commands.get(timeout=step)
+        except queue.Empty:
+            command = None
+        if command in ("stop", "quit"):
+            if command == "quit":
+                commands.put(command)
+            break
+        if movetime is not None and time.monotonic() - started >= movetime and not infinite:
+            break
+    return line[0] if line else None
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--step', type=float, default=0.02)
+    parser.add_argument('--crash-on-go', action='store_true')
+    args = parser.parse_args()
+
+    lines = queue.Queue()
+
+    def read():
+        for line in sys.stdin:
+            lines.put(line.strip())
+        lines.put("quit")
+
+    threading.Thread(target=read, daemon=True).start()
+
+    def out(text):
+        sys.stdout.write(text + "\n")
+        sys.stdout.flush()
+
+    board = chess.Board()
+    while True:
+        command = lines.get()
+        tokens = command.split()
+        if not tokens:
+            continue
+        if tokens[0] == "uci":
+            out("id name UciStub")
+            out("option name Threads type spin default 1 min 1 max 8")
+            out("uciok")
+        elif tokens[0] == "isready":
+            out("readyok")
+        elif tokens[0] == "position":
+            if tokens[1] == "startpos":
+                board = chess.Board()
+                rest = tokens[2:]
+            else:
+                board = chess.Board(" ".join(tokens[2:8]))
+                rest = tokens[8:]
+            if rest and rest[0] == "moves":
+                for uci in rest[1:]:
+                    board.push_uci(uci)
+        elif tokens[0] == "go":
+            if args.crash_on_go:
+                sys.exit(1)
+            move = search(board, tokens, args.step, out, lines)
+            out(f"bestmove {move.uci() if move else '(none)'}")
+        elif tokens[0] == "quit":
+            break
+
+if __name__ == "__main__":
+    main()